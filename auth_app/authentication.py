@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import auth_version
+
+
+def claims_are_current(token):
+    return "ver" in token and token["ver"] == auth_version(token[api_settings.USER_ID_CLAIM])
+
+
+class ClaimsUser(TokenUser):
+    """
+    A user built from a current token's claims; no row behind it. Compare
+    and filter by `pk`/`id` — it is not a model instance.
+    """
+
+    @property
+    def role(self):
+        return self.token.get("role") or None
+
+    @property
+    def org_ids(self):
+        return self.token.get("orgs", [])
+
+    def __eq__(self, other):
+        if isinstance(other, TokenUser) or hasattr(other, "_meta"):
+            return self.pk == other.pk
+        return NotImplemented
+
+    __hash__ = TokenUser.__hash__
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that also takes the role from the token's claims while
+    they are current, so permission checks skip the profile lookups.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if claims_are_current(validated_token):
+            user.role = validated_token.get("role", "")
+        return user
+
+
+class StatelessJWTAuthentication(RoleJWTAuthentication):
+    """
+    For read-mostly views: safe requests carrying current claims get a
+    ClaimsUser without touching the database. Writes, and tokens that are
+    stale or predate the claims, load the user row as usual.
+    """
+
+    def authenticate(self, request):
+        self.stateless = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.stateless and claims_are_current(validated_token):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+
+async def aauthenticate(request):
+    """
+    RoleJWTAuthentication for plain async views: the user for the request's
+    Bearer token, or None, which the caller answers with a 401 as the sync
+    views do for a malformed header or a bad token. Token checks are
+    CPU-only; the user row comes from the async ORM.
+    """
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    try:
+        raw = auth.get_raw_token(header) if header else None
+        if raw is None:
+            return None
+        token = auth.get_validated_token(raw)
+    except AuthenticationFailed:   # includes InvalidToken
+        return None
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    try:
+        user = await get_user_model().objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    except get_user_model().DoesNotExist:
+        return None
+    if not api_settings.USER_AUTHENTICATION_RULE(user):
+        return None
+    if claims_are_current(token):
+        user.role = token.get("role", "")
+    return user
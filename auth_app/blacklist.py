@@ -0,0 +1,236 @@
+"""
+Refresh-token blacklist upkeep.
+
+With rotation on, every refresh blacklists the old token, so the
+OutstandingToken / BlacklistedToken tables grow by a row pair per refresh.
+Two things keep that from showing up in refresh latency:
+
+  • `prune_expired_tokens()` deletes expired rows in chunks (hourly, from
+    beat). An expired token is rejected before its blacklist entry is ever
+    read, so nothing is lost.
+  • A bloom filter of blacklisted JTIs answers "definitely not blacklisted"
+    for almost every check without a query. Only a possible hit goes to the
+    database.
+
+The filter is split into buckets by token expiry, TOKEN_BLOOM_BUCKET_SECONDS
+wide, and a check only looks at the bucket of its own `exp`, so buckets age
+out whole instead of needing a rebuild. A bucket is built from the database
+the first time it is checked. JTIs are added to the filter *before* their
+row is written, so a bucket built concurrently can't miss them; if the add
+fails the bucket is invalidated once the row is committed. The filter lives
+where TOKEN_BLOOM_BACKEND says:
+
+  • "redis"  – SETBIT / GETBIT on a shared key, for multi-process deployments
+  • "memory" – a per-process bit array, for tests and single-process dev
+               servers (other processes' blacklisting would not be seen)
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = "auth:blacklist:bloom:{bucket}"
+READY_KEY = "auth:blacklist:bloom:{bucket}:ready"
+
+
+def filter_shape(capacity, error_rate):
+    """(bits, hash count) for `capacity` entries at `error_rate` false positives."""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+def bit_positions(jti, bits, hashes):
+    # double hashing: k positions from one 128-bit digest
+    digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:], "big") | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class InMemoryBloom:
+    def __init__(self, bits):
+        self.bits = bits
+        self._lock = threading.Lock()
+        self._buckets = {}    # bucket -> [bytearray, ready, expires_at]
+
+    def _bucket(self, bucket, expires_at):
+        entry = self._buckets.get(bucket)
+        if entry is None:
+            now = time.time()
+            for stale in [b for b, e in self._buckets.items() if e[2] <= now]:
+                del self._buckets[stale]
+            entry = self._buckets[bucket] = [bytearray(self.bits // 8 + 1), False, expires_at]
+        return entry
+
+    def add(self, bucket, positions, expires_at):
+        with self._lock:
+            array = self._bucket(bucket, expires_at)[0]
+            for p in positions:
+                array[p >> 3] |= 1 << (p & 7)
+
+    def mark_ready(self, bucket, expires_at):
+        with self._lock:
+            self._bucket(bucket, expires_at)[1] = True
+
+    def invalidate(self, bucket):
+        with self._lock:
+            entry = self._buckets.get(bucket)
+            if entry is not None:
+                entry[1] = False
+
+    def contains(self, bucket, positions):
+        """True/False, or None if the bucket hasn't been built."""
+        with self._lock:
+            entry = self._buckets.get(bucket)
+            if entry is None or not entry[1]:
+                return None
+            array = entry[0]
+            return all(array[p >> 3] & (1 << (p & 7)) for p in positions)
+
+
+class RedisBloom:
+    def __init__(self, url, bits):
+        self.url = url
+        self.bits = bits
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def add(self, bucket, positions, expires_at):
+        key = BUCKET_KEY.format(bucket=bucket)
+        pipe = self.client().pipeline(transaction=False)
+        for p in positions:
+            pipe.setbit(key, p, 1)
+        pipe.expireat(key, int(expires_at))
+        pipe.execute()
+
+    def mark_ready(self, bucket, expires_at):
+        self.client().set(READY_KEY.format(bucket=bucket), 1, exat=int(expires_at))
+
+    def invalidate(self, bucket):
+        self.client().delete(READY_KEY.format(bucket=bucket))
+
+    def contains(self, bucket, positions):
+        key = BUCKET_KEY.format(bucket=bucket)
+        pipe = self.client().pipeline(transaction=False)
+        pipe.exists(READY_KEY.format(bucket=bucket))
+        for p in positions:
+            pipe.getbit(key, p)
+        ready, *bits = pipe.execute()
+        if not ready:
+            return None
+        return all(bits)
+
+
+_filter = None
+
+
+def get_filter():
+    global _filter
+    if _filter is None:
+        bits, _ = filter_shape(settings.TOKEN_BLOOM_CAPACITY, settings.TOKEN_BLOOM_ERROR_RATE)
+        if settings.TOKEN_BLOOM_BACKEND == "redis":
+            _filter = RedisBloom(settings.TOKEN_BLOOM_REDIS_URL, bits)
+        else:
+            _filter = InMemoryBloom(bits)
+    return _filter
+
+
+def _locate(jti, exp):
+    """(bucket, bit positions, time the bucket can be dropped) for a token."""
+    width = settings.TOKEN_BLOOM_BUCKET_SECONDS
+    bits, hashes = filter_shape(settings.TOKEN_BLOOM_CAPACITY, settings.TOKEN_BLOOM_ERROR_RATE)
+    bucket = int(exp) // width
+    return bucket, bit_positions(jti, bits, hashes), (bucket + 1) * width + 60
+
+
+def _build(bucket, expires_at):
+    width = settings.TOKEN_BLOOM_BUCKET_SECONDS
+    jtis = BlacklistedToken.objects.filter(
+        token__expires_at__gte=datetime_from_epoch(bucket * width),
+        token__expires_at__lt=datetime_from_epoch((bucket + 1) * width),
+    ).values_list("token__jti", flat=True)
+    bloom = get_filter()
+    bits, hashes = filter_shape(settings.TOKEN_BLOOM_CAPACITY, settings.TOKEN_BLOOM_ERROR_RATE)
+    for jti in jtis.iterator():
+        bloom.add(bucket, bit_positions(jti, bits, hashes), expires_at)
+    bloom.mark_ready(bucket, expires_at)
+
+
+def might_be_blacklisted(jti, exp):
+    """False only if the filter rules the token out; True means "ask the database"."""
+    bucket, positions, expires_at = _locate(jti, exp)
+    try:
+        answer = get_filter().contains(bucket, positions)
+        if answer is None:
+            _build(bucket, expires_at)
+            answer = get_filter().contains(bucket, positions)
+    except Exception:
+        logger.exception("Token blacklist filter unavailable")
+        return True
+    return answer is not False
+
+
+def is_blacklisted(jti, exp):
+    if not might_be_blacklisted(jti, exp):
+        return False
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def add_to_filter(jti, exp):
+    """
+    Record `jti` before its blacklist row is written. If that fails, the
+    bucket is invalidated once the row commits and rebuilt on the next check.
+    """
+    bucket, positions, expires_at = _locate(jti, exp)
+    try:
+        get_filter().add(bucket, positions, expires_at)
+    except Exception:
+        logger.exception("Could not add %s to the token blacklist filter", jti)
+        transaction.on_commit(lambda: _invalidate(bucket))
+
+
+def _invalidate(bucket):
+    try:
+        get_filter().invalidate(bucket)
+    except Exception:
+        logger.exception("Could not invalidate token blacklist filter bucket %s", bucket)
+
+
+def prune_expired_tokens(chunk_size=None):
+    """
+    Delete expired outstanding tokens, with their blacklist entries, in
+    chunks of `chunk_size`. Walks the primary key: tokens share one lifetime,
+    so the expired rows are the oldest ones and each chunk is found without
+    scanning the live ones. Returns the number of tokens deleted.
+    """
+    chunk_size = chunk_size or settings.TOKEN_PRUNE_CHUNK_SIZE
+    now = timezone.now()
+    pruned = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return pruned
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        pruned += len(ids)
+        if len(ids) < chunk_size:
+            return pruned
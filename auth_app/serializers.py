@@ -2,6 +2,7 @@ from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import UserDetailsSerializer
 from rest_framework import serializers
 from .models import StudentProfile, InstructorProfile
+from .tokens import role_of
 
 class CustomRegisterSerializer(RegisterSerializer):
     username = None                      # ④  suppress inherited field
@@ -41,8 +42,4 @@ class CustomUserDetailsSerializer(UserDetailsSerializer):
         fields = ("id", "email", "first_name", "last_name", "avatar", "role")
 
     def get_role(self, obj):
-        if hasattr(obj, "instructorprofile"):
-            return "instructor"
-        if hasattr(obj, "studentprofile"):
-            return "student"
-        return None
\ No newline at end of file
+        return role_of(obj)
\ No newline at end of file
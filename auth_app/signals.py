@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import InstructorProfile, StudentProfile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=InstructorProfile)
+@receiver(post_delete, sender=InstructorProfile)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_save, sender="teams.TeamMember")
+@receiver(post_delete, sender="teams.TeamMember")
+def role_claims_changed(sender, instance, **kwargs):
+    # deferred: auth_app.tokens pulls in simplejwt's serializers, which ready() doesn't need
+    from .tokens import bump_auth_version
+
+    bump_auth_version(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    # flags, password, deactivation… anything but the login timestamp
+    if not created and set(update_fields or ()) != {"last_login"}:
+        from .tokens import bump_auth_version
+
+        bump_auth_version(instance.pk)
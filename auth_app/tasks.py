@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .blacklist import prune_expired_tokens as prune
+
+
+@shared_task(bind=True, workload="bulk")
+def prune_expired_tokens(self, chunk_size=None):
+    """Delete expired outstanding/blacklisted token rows. Scheduled hourly."""
+    return prune(chunk_size)
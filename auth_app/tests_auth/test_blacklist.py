@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from auth_app import blacklist
+from auth_app.models import User
+
+BLACKLIST_LOOKUP = 'SELECT 1 AS "a" FROM "token_blacklist_blacklistedtoken"'
+
+
+class BlacklistFilterTest(APITestCase):
+    def setUp(self):
+        blacklist._filter = None
+        self.password = "TestPass123!"
+        self.user = User.objects.create_user(email="learner@example.com", password=self.password)
+
+    def _login(self):
+        return self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": self.user.email, "password": self.password},
+            format="json",
+        ).data["refresh"]
+
+    def _refresh(self, refresh):
+        return self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+
+    def test_clean_refresh_skips_the_blacklist_lookup(self):
+        first = self._refresh(self._login()).data["refresh"]   # builds the bucket
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self._refresh(first)
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith(BLACKLIST_LOOKUP)])
+
+    def test_rotated_token_is_rejected(self):
+        refresh = self._login()
+        self.assertEqual(self._refresh(refresh).status_code, 200)
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+
+    def test_logged_out_token_is_rejected(self):
+        refresh = self._login()
+        self.client.post(reverse("token_blacklist"), {"refresh": refresh}, format="json")
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+
+    def test_bucket_is_built_from_rows_the_filter_never_saw(self):
+        refresh = self._login()
+        RefreshToken(refresh).blacklist()   # plain simplejwt: bypasses the filter
+        blacklist._filter = None            # e.g. a fresh process
+
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+
+    def test_unavailable_filter_falls_back_to_the_database(self):
+        refresh = self._login()
+        RefreshToken(refresh).blacklist()
+
+        class Broken:
+            def contains(self, *args):
+                raise ConnectionError("down")
+
+        blacklist._filter = Broken()
+        with self.assertLogs("auth_app.blacklist", "ERROR"):
+            self.assertEqual(self._refresh(refresh).status_code, 401)
+
+
+class PruneExpiredTokensTest(APITestCase):
+    def _token(self, n, expires_in, blacklisted=False):
+        token = OutstandingToken.objects.create(
+            jti=f"jti-{n}", token="t", expires_at=timezone.now() + expires_in
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token)
+        return token
+
+    def test_expired_rows_are_deleted_in_chunks(self):
+        for n in range(5):
+            self._token(n, timedelta(hours=-1), blacklisted=n % 2 == 0)
+        live = self._token(9, timedelta(hours=1), blacklisted=True)
+
+        self.assertEqual(blacklist.prune_expired_tokens(chunk_size=2), 5)
+
+        self.assertEqual(list(OutstandingToken.objects.all()), [live])
+        self.assertEqual(BlacklistedToken.objects.get().token, live)
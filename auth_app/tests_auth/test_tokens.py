@@ -0,0 +1,112 @@
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from auth_app.models import User, StudentProfile, InstructorProfile
+from auth_app.tokens import auth_version, bump_auth_version
+from teams.models import Organization, TeamMember
+
+AUTH_TABLES = ('"auth_app_user"', '"auth_app_instructorprofile"', '"auth_app_studentprofile"')
+
+
+class RoleClaimsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.password = "TestPass123!"
+        self.user = User.objects.create_user(email="learner@example.com", password=self.password)
+        StudentProfile.objects.create(user=self.user)
+        self.org = Organization.objects.create(name="Org", admin=self.user)
+        TeamMember.objects.create(organization=self.org, user=self.user, status=TeamMember.ACTIVE)
+
+    def _login(self, user=None):
+        res = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": (user or self.user).email, "password": self.password},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def _auth_queries(self, method, url, access, **kwargs):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with CaptureQueriesContext(connection) as ctx:
+            res = getattr(self.client, method)(url, **kwargs)
+        touched = [q["sql"] for q in ctx.captured_queries if any(t in q["sql"] for t in AUTH_TABLES)]
+        return res, touched
+
+    def test_access_token_carries_role_orgs_and_version(self):
+        token = AccessToken(self._login()["access"])
+        self.assertEqual(token["role"], "student")
+        self.assertEqual(token["orgs"], [self.org.pk])
+        self.assertFalse(token["is_staff"])
+        self.assertEqual(token["ver"], auth_version(self.user.pk))
+
+    def test_read_endpoint_serves_without_auth_queries(self):
+        access = self._login()["access"]
+        res, touched = self._auth_queries("get", reverse("notifications:unread-count"), access)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(touched, [])
+
+    def test_role_change_makes_claims_stale(self):
+        access = self._login()["access"]
+        InstructorProfile.objects.create(user=self.user)
+
+        res, touched = self._auth_queries("get", reverse("notifications:unread-count"), access)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(touched)                       # fell back to the user row
+
+        token = AccessToken(self.client.post(
+            reverse("token_refresh"), {"refresh": self._login()["refresh"]}, format="json"
+        ).data["access"])
+        self.assertEqual(token["role"], "instructor")  # the refresh re-read it
+
+    def test_deactivated_user_is_rejected_despite_current_looking_claims(self):
+        access = self._login()["access"]
+        self.user.is_active = False
+        self.user.save()
+        res, _ = self._auth_queries("get", reverse("notifications:unread-count"), access)
+        self.assertEqual(res.status_code, 401)
+
+    def test_writes_load_the_user_but_take_the_role_from_claims(self):
+        instructor = User.objects.create_user(email="inst@example.com", password=self.password)
+        InstructorProfile.objects.create(user=instructor)
+        access = self._login(instructor)["access"]
+
+        res, touched = self._auth_queries(
+            "post", reverse("courses:courses-list"), access,
+            data={"title": "T", "description": "D", "price": 0}, format="json",
+        )
+        self.assertEqual(res.status_code, 201, res.data)
+        self.assertFalse(any("instructorprofile" in sql for sql in touched))
+        self.assertTrue(any('"auth_app_user"' in sql for sql in touched))
+
+    def test_user_details_role_comes_from_claims(self):
+        access = self._login()["access"]
+        res, touched = self._auth_queries("get", reverse("rest_user_details"), access)
+        self.assertEqual(res.data["role"], "student")
+        self.assertFalse(any("studentprofile" in sql for sql in touched))
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    "LOCATION": tempfile.mkdtemp(),
+}})
+class SharedAuthVersionTest(RoleClaimsTest):
+    """A shared cache backend, as production configures, seen from two processes."""
+
+    def test_bump_through_another_cache_client_makes_claims_stale(self):
+        access = self._login()["access"]
+        other_process = caches.create_connection("default")
+        with patch("auth_app.tokens.cache", other_process):
+            bump_auth_version(self.user.pk)
+
+        res, touched = self._auth_queries("get", reverse("notifications:unread-count"), access)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(touched)                       # fell back to the user row
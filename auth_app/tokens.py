@@ -0,0 +1,113 @@
+"""
+JWTs that carry the caller's role.
+
+Access tokens are stamped with `role`, the ids of the organisations the user
+is an active member of, the staff flags and `ver`, the user's auth version
+at issue time. The version lives in the cache, which every process must
+share (Redis in production), and is replaced whenever something the claims
+describe changes (see auth_app.signals). A token whose
+`ver` no longer matches is stale: authentication then falls back to the
+user row instead of trusting its claims (auth_app.authentication).
+Claims are re-read from the database on every refresh. Blacklist checks go
+through the filter in auth_app.blacklist before touching the database.
+"""
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer, TokenObtainPairSerializer, TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import add_to_filter, is_blacklisted
+
+AUTH_VERSION_KEY = "auth:version:{user_id}"
+
+INSTRUCTOR, STUDENT = "instructor", "student"
+
+
+def role_of(user):
+    """
+    "instructor", "student" or None. Uses the role the authenticator took
+    from the token when there is one; otherwise looks at the profiles.
+    """
+    if isinstance(user, TokenUser):   # claims only; its __getattr__ makes hasattr() lie
+        return user.token.get("role") or None
+    role = getattr(user, "role", None)
+    if role is not None:
+        return role or None
+    if hasattr(user, "instructorprofile"):
+        return INSTRUCTOR
+    if hasattr(user, "studentprofile"):
+        return STUDENT
+    return None
+
+
+def auth_version(user_id):
+    """The current version stamp; a fresh one if the cache lost it."""
+    key = AUTH_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_auth_version(user_id):
+    """Make every token issued so far for this user stale."""
+    cache.set(AUTH_VERSION_KEY.format(user_id=user_id), uuid4().hex, None)
+
+
+def stamp_claims(token, user_id):
+    """Write the role claims for `user_id` onto `token`."""
+    from teams.models import TeamMember
+
+    # read the version first: a change landing in between leaves the token stale
+    token["ver"] = auth_version(user_id)
+    user = get_user_model().objects.select_related("instructorprofile", "studentprofile").get(
+        **{api_settings.USER_ID_FIELD: user_id}
+    )
+    token["role"] = role_of(user) or ""
+    token["orgs"] = sorted(
+        TeamMember.objects.filter(user_id=user.pk, status=TeamMember.ACTIVE)
+        .values_list("organization_id", flat=True)
+    )
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    return token
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry freshly read role claims and
+    whose blacklist lookups are prechecked against the bloom filter.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload["exp"]):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        add_to_filter(self.payload[api_settings.JTI_CLAIM], self.payload["exp"])
+        return super().blacklist()
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        return stamp_claims(access, self.payload[api_settings.USER_ID_CLAIM])
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RoleRefreshToken
+
+
+class RoleTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = RoleRefreshToken
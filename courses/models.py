@@ -181,6 +181,7 @@ class Promotion(models.Model):
 
     class Meta:
         ordering = ["-start_date"]
+        indexes = [models.Index(fields=["course", "start_date", "end_date"])]
 
     def __str__(self):
         return f"{self.discount_percent}% off {self.course.title}"
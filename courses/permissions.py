@@ -1,14 +1,16 @@
 from rest_framework import permissions
+from auth_app.tokens import role_of, INSTRUCTOR
 
 class IsInstructor(permissions.BasePermission):
     """
-    Allows access only to users with an instructor profile.
+    Allows access only to users with an instructor profile (the token's
+    role claim when it is current).
     """
     def has_permission(self, request, view):
         return (
             request.user 
             and request.user.is_authenticated 
-            and hasattr(request.user, "instructorprofile")
+            and role_of(request.user) == INSTRUCTOR
         )
 
 
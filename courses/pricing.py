@@ -0,0 +1,125 @@
+"""
+Price quotes.
+
+A course's effective price on a given day is its list price less the best
+Promotion running that day. The catalog gets it as a queryset annotation
+(`with_effective_price`); checkout uses `quote_courses`, which reads per-day
+cached quotes and prices any misses with a single annotated query, so a cart
+of any size costs O(1) queries.
+
+Quote keys carry the course's pricing version, which a price or promotion
+change replaces (`invalidate_quotes`). The old quotes, for every day, become
+unreachable. A quote computed just before the change and written just after
+it lands under the old version and is never read.
+"""
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db.models import DecimalField, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .models import Course, Promotion
+
+QUOTE_KEY = "pricing:quote:{day}:{course_id}:{version}"
+VERSION_KEY = "pricing:version:{course_id}"
+QUOTE_TTL = 60 * 60 * 24
+
+CENT = Decimal("0.01")
+
+Quote = namedtuple("Quote", "course_id list_price discount_percent price amount_kobo")
+
+
+def _today():
+    return timezone.localdate()
+
+
+def best_discount(on=None):
+    """Subquery: the highest discount_percent of any promotion running on `on`."""
+    on = on or _today()
+    return Subquery(
+        Promotion.objects.filter(
+            course=OuterRef("pk"), start_date__lte=on, end_date__gte=on
+        )
+        .order_by("-discount_percent")
+        .values("discount_percent")[:1],
+        output_field=IntegerField(),
+    )
+
+
+def with_effective_price(queryset, on=None):
+    """
+    Annotate `active_discount` (percent, 0 if none) and `effective_price`.
+    """
+    queryset = queryset.annotate(active_discount=Coalesce(best_discount(on), Value(0)))
+    # 100.0 keeps SQLite (which stores whole-number decimals as integers) off
+    # integer division; the cast rounds back to the price's two places.
+    return queryset.annotate(
+        effective_price=Cast(
+            F("price") * (Value(100) - F("active_discount")) / Value(100.0),
+            output_field=DecimalField(max_digits=8, decimal_places=2),
+        )
+    )
+
+
+def discounted(list_price, discount_percent):
+    price = Decimal(list_price) * (100 - discount_percent) / 100
+    return price.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _quote(course_id, list_price, discount_percent):
+    price = discounted(list_price, discount_percent)
+    return Quote(course_id, Decimal(list_price), discount_percent, price, int(price * 100))
+
+
+def _versions(course_ids):
+    """{course_id: pricing version}; a fresh one for courses the cache lost."""
+    keys = {VERSION_KEY.format(course_id=cid): cid for cid in course_ids}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, uuid4().hex, None)
+        found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def quote_courses(course_ids, on=None):
+    """
+    {course_id: Quote} for the given courses; unknown ids are left out.
+    """
+    on = on or _today()
+    versions = _versions(set(course_ids))
+    keys = {
+        QUOTE_KEY.format(day=on.isoformat(), course_id=cid, version=version): cid
+        for cid, version in versions.items()
+    }
+    cached = cache.get_many(keys)
+    quotes = {keys[key]: Quote(*value) for key, value in cached.items()}
+
+    missing = [cid for key, cid in keys.items() if key not in cached]
+    if missing:
+        rows = (
+            Course.objects.filter(pk__in=missing)
+            .annotate(active_discount=Coalesce(best_discount(on), Value(0)))
+            .values_list("pk", "price", "active_discount")
+        )
+        fresh = {pk: _quote(pk, price, discount) for pk, price, discount in rows}
+        cache.set_many(
+            {
+                QUOTE_KEY.format(day=on.isoformat(), course_id=pk, version=versions[pk]): tuple(q)
+                for pk, q in fresh.items()
+            },
+            QUOTE_TTL,
+        )
+        quotes.update(fresh)
+    return quotes
+
+
+def quote_course(course_id, on=None):
+    return quote_courses([course_id], on).get(course_id)
+
+
+def invalidate_quotes(course_id):
+    """Retire every cached quote for the course after a price or promotion change."""
+    cache.set(VERSION_KEY.format(course_id=course_id), uuid4().hex, None)
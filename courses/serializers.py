@@ -1,8 +1,13 @@
+from operator import attrgetter
+
 from rest_framework import serializers
+
+from tem_backend.fieldsets import SparseFieldsMixin
 from .models import (
     Course, Lesson, Quiz, Question, Choice,
     Tag, Module, Review, Promotion, Category
     )
+from .pricing import quote_course, discounted
 
 # ─── Tag ────────────────────────────────────────────────────────────────
 
@@ -34,13 +39,15 @@ class PromotionSerializer(serializers.ModelSerializer):
 
 # ─── Module & Lesson ───────────────────────────────────────────────────
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = [
             "id", "module", "course",  # <— added
             "title", "content", "video_url", "order", "duration", "created_at"
         ]
+        # an outline; the body only comes with ?fields= or on a single lesson
+        default_list_fields = ["id", "module", "course", "title", "video_url", "order", "duration"]
         read_only_fields = ["created_at"]
 
 
@@ -65,9 +72,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
 
 
-class CourseSerializer(serializers.ModelSerializer):
-    # Show lessons nested (read‑only by default for listing)
-    lessons = LessonSerializer(many=True, read_only=True)
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # only with ?expand=lessons (outlines) or ?expand=lessons.content
+    lessons       = serializers.SerializerMethodField()
     instructor    = serializers.PrimaryKeyRelatedField(read_only=True)
     students      = serializers.SerializerMethodField()
     level         = serializers.ReadOnlyField(source="difficulty")
@@ -79,19 +86,43 @@ class CourseSerializer(serializers.ModelSerializer):
         required=False
     )
     expires_at = serializers.SerializerMethodField()
+    effective_price = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
         fields = [
             "id", "title", "subtitle", "description", "learn", "about",
-            "instructor", "students", "level", "language", "price",
+            "instructor", "students", "level", "language", "price", "effective_price",
             "imageUrl", "categorySlug",
             "categories", "featured", "created_at", "expires_at", "lessons"
         ]
+        # catalog card: no long-form text
+        default_list_fields = [
+            "id", "title", "subtitle", "instructor", "students", "level", "language",
+            "price", "effective_price", "imageUrl", "categorySlug", "categories",
+            "featured", "created_at", "expires_at",
+        ]
+        expandable_fields = {"lessons": LessonSerializer}
+        column_sources = {"imageUrl": ["promo_image"]}
         read_only_fields = ["instructor", "created_at"]
 
+    def get_lessons(self, obj):
+        """Lessons the view loaded for the page (`lesson_list`), else queried."""
+        lessons = getattr(obj, "lesson_list", None)
+        if lessons is None:
+            lessons = Lesson.objects.filter(course=obj)
+        return self.expanded("lessons", lessons, many=True)
+
+    def get_effective_price(self, obj):
+        """Today's price after promotions (annotated by list views, else quoted)."""
+        price = getattr(obj, "effective_price", None)
+        if price is None:
+            price = quote_course(obj.id).price
+        return str(discounted(price, 0))
+
     def get_students(self, obj):
-        return obj.enrollments.count()
+        count = getattr(obj, "students_count", None)
+        return obj.enrollments.count() if count is None else count
     
     def get_imageUrl(self, obj):
         req = self.context.get("request")
@@ -100,7 +131,8 @@ class CourseSerializer(serializers.ModelSerializer):
         return None
     
     def get_categorySlug(self, obj):
-        first = obj.categories.first()
+        # .all() + min rather than .first(), so a prefetched list is reused
+        first = min(obj.categories.all(), key=attrgetter("pk"), default=None)
         return first.slug if first else None
 
     def get_expires_at(self, obj):
@@ -108,7 +140,10 @@ class CourseSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return None
-        en = obj.enrollments.filter(user=request.user).first()
+        if hasattr(obj, "viewer_enrollments"):
+            en = min(obj.viewer_enrollments, key=attrgetter("pk"), default=None)
+        else:
+            en = obj.enrollments.filter(user_id=request.user.pk).first()
         if not en or not en.access_expires: 
             return None 
         # Always ISO-8601 string so tests & JS code can treat it uniformly 
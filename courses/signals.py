@@ -1,21 +1,24 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Course, Lesson, Review, Course
+from .models import Course, Lesson, Review, Course, Promotion
+from .pricing import invalidate_quotes
 from .tasks import rebuild_course_index, transcode_lesson_video
+from outbox.relay import publish
 from django.db.models import Avg
 
 
 @receiver(post_save, sender=Course)
 def on_course_saved(sender, instance, created, **kwargs):
     # whenever a course is created or updated, rebuild its search index & cache
-    rebuild_course_index.delay(instance.id)
+    publish(rebuild_course_index, (instance.id,))
+    invalidate_quotes(instance.id)   # price may have changed
     
 
 @receiver(post_save, sender=Lesson)
 def on_lesson_saved(sender, instance, created, **kwargs):
     # if a new video file was attached, kick off the transcode task
     if created and instance.video:
-        transcode_lesson_video.delay(instance.id)
+        publish(transcode_lesson_video, (instance.id,), dedupe_key=f"transcode:{instance.id}")
 
 
 @receiver(post_save, sender=Review)
@@ -25,3 +28,9 @@ def feature_on_high_rating(sender, instance, **kwargs):
     # feature if average ≥ 4.8
     if avg >= 4.8:
         Course.objects.filter(pk=course.pk).update(featured=True)
+
+
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def reprice_on_promotion_change(sender, instance, **kwargs):
+    invalidate_quotes(instance.course_id)
@@ -11,6 +11,7 @@ logger = logging.getLogger(__name__)
 
 @shared_task(
     bind=True,
+    workload="media",
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_backoff_max=600,
@@ -56,6 +57,7 @@ def transcode_lesson_video(self, lesson_id):
 
 @shared_task(
     bind=True,
+    workload="bulk",
     autoretry_for=(Exception,),
     retry_backoff=True,
     max_retries=3,
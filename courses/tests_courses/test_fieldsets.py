@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from courses.models import Course, Lesson
+from payments.models import Enrollment
+from tem_backend.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class SparseFieldsetTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(email="fs-inst@x.com", password="pass")
+        self.student = User.objects.create_user(email="fs-stud@x.com", password="pass")
+        self.client.force_authenticate(self.student)
+        self.course = self.add_course("C0")
+        self.list_url = reverse("courses:courses-list")
+        self.detail_url = reverse("courses:courses-detail", args=[self.course.pk])
+
+    def add_course(self, title):
+        course = Course.objects.create(
+            title=title, description="d", about="long form", price=10, instructor=self.instructor
+        )
+        for n in range(2):
+            Lesson.objects.create(course=course, title=f"L{n}", content="body", order=n)
+        Enrollment.objects.create(user=self.student, course=course)
+        return course
+
+    def test_list_sends_cards(self):
+        res = self.client.get(self.list_url)
+        card = res.data[0]
+        self.assertIn("effective_price", card)
+        self.assertEqual(card["students"], 1)
+        for name in ("description", "about", "learn", "lessons"):
+            self.assertNotIn(name, card)
+
+    def test_detail_sends_long_form_but_not_lessons(self):
+        res = self.client.get(self.detail_url)
+        self.assertEqual(res.data["about"], "long form")
+        self.assertNotIn("lessons", res.data)
+
+    def test_fields_limit_the_response_and_the_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.list_url, {"fields": "id,title"})
+        self.assertEqual(set(res.data[0]), {"id", "title"})
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn('"courses_course"."about"', sql)
+        self.assertNotIn("COUNT(", sql)                  # no students annotation
+        self.assertNotIn("courses_category", sql)        # no categories prefetch
+
+    def test_unknown_field_is_rejected(self):
+        self.assertEqual(self.client.get(self.list_url, {"fields": "id,nope"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.list_url, {"expand": "title"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.list_url, {"expand": "lessons.nope"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_expanded_lessons_are_outlines_unless_content_is_asked_for(self):
+        with CaptureQueriesContext(connection) as ctx:
+            lessons = self.client.get(self.detail_url, {"expand": "lessons"}).data["lessons"]
+        self.assertEqual([l["title"] for l in lessons], ["L0", "L1"])
+        self.assertNotIn("content", lessons[0])
+        self.assertNotIn('"courses_lesson"."content"', " ".join(q["sql"] for q in ctx.captured_queries))
+
+        res = self.client.get(self.detail_url, {"expand": "lessons.content"})
+        self.assertEqual(res.data["lessons"][0]["content"], "body")
+        self.assertWithinQueryBudget(res)
+
+    def test_expanding_lessons_on_a_list_costs_one_query(self):
+        small = self.assertWithinQueryBudget(self.client.get(self.list_url, {"expand": "lessons"}))
+        self.add_course("C1")
+        self.add_course("C2")
+        res = self.client.get(self.list_url, {"expand": "lessons"})
+        self.assertEqual([len(c["lessons"]) for c in res.data], [2, 2, 2])
+        self.assertEqual(self.assertWithinQueryBudget(res), small)
+
+    def test_lesson_list_leaves_out_bodies(self):
+        url = reverse("courses:lessons-list")
+        self.assertNotIn("content", self.client.get(url).data[0])
+        self.assertEqual(self.client.get(url, {"fields": "id,content"}).data[0]["content"], "body")
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Course, Promotion
+from courses.pricing import quote_course, quote_courses, with_effective_price
+
+User = get_user_model()
+
+
+class PricingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.user = User.objects.create_user(email="inst@test.com", password="pass")
+        self.course = Course.objects.create(
+            title="C", description="D", price=Decimal("10.00"), instructor=self.user
+        )
+        self.plain = Course.objects.create(
+            title="P", description="D", price=Decimal("20.00"), instructor=self.user
+        )
+
+    def _promo(self, percent, start=0, end=0, course=None):
+        return Promotion.objects.create(
+            course=course or self.course,
+            discount_percent=percent,
+            start_date=self.today + timedelta(days=start),
+            end_date=self.today + timedelta(days=end),
+        )
+
+    def test_annotation_uses_best_running_promotion(self):
+        self._promo(15, start=-1, end=1)
+        self._promo(10, start=-3, end=3)
+        self._promo(50, start=-10, end=-1)   # ended
+        self._promo(60, start=1, end=5)      # not started
+
+        prices = dict(
+            with_effective_price(Course.objects.all()).values_list("title", "effective_price")
+        )
+        self.assertEqual(prices, {"C": Decimal("8.50"), "P": Decimal("20.00")})
+
+    def test_quotes_are_priced_in_one_query_and_cached(self):
+        self._promo(25, start=-1, end=1)
+        extra = [
+            Course.objects.create(title=f"X{i}", description="D", price=5, instructor=self.user)
+            for i in range(5)
+        ]
+        ids = [self.course.id, self.plain.id] + [c.id for c in extra]
+
+        with self.assertNumQueries(1):
+            quotes = quote_courses(ids)
+        self.assertEqual(quotes[self.course.id].amount_kobo, 750)
+        self.assertEqual(quotes[self.plain.id].amount_kobo, 2000)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(quote_courses(ids), quotes)
+
+    def test_promotion_change_invalidates_quote(self):
+        self.assertEqual(quote_course(self.course.id).amount_kobo, 1000)
+        promo = self._promo(20, start=-1, end=1)
+        self.assertEqual(quote_course(self.course.id).amount_kobo, 800)
+        promo.delete()
+        self.assertEqual(quote_course(self.course.id).amount_kobo, 1000)
+
+    def test_promotion_change_invalidates_quotes_for_other_days(self):
+        next_week = self.today + timedelta(days=7)
+        self.assertEqual(quote_course(self.course.id, on=next_week).amount_kobo, 1000)
+        self._promo(20, start=6, end=8)
+        self.assertEqual(quote_course(self.course.id, on=next_week).amount_kobo, 800)
+
+    def test_quote_written_after_a_change_is_not_served(self):
+        with patch("courses.pricing.cache.set_many") as late_write:
+            quote_course(self.course.id)               # priced, write delayed
+        self._promo(20, start=-1, end=1)               # invalidates
+        cache.set_many(*late_write.call_args.args)     # the stale write lands
+        self.assertEqual(quote_course(self.course.id).amount_kobo, 800)
+
+    def test_catalog_exposes_effective_price(self):
+        self._promo(20, start=0, end=2)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.get(reverse("courses:courses-list"))
+        by_title = {c["title"]: c for c in res.json()}
+        self.assertEqual(by_title["C"]["price"], "10.00")
+        self.assertEqual(by_title["C"]["effective_price"], "8.00")
+        self.assertEqual(by_title["P"]["effective_price"], "20.00")
+
+    @patch("payments.views.paystack.initialize_transaction")
+    def test_checkout_charges_quoted_price(self, mock_init):
+        mock_init.return_value = {"data": {"authorization_url": "https://pay.test"}}
+        self._promo(30, start=-1, end=1)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.post("/api/v1/payments/init/", {"course_id": self.course.id}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(mock_init.call_args.kwargs["amount"], 700)
@@ -0,0 +1,71 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from auth_app.models import InstructorProfile
+from courses.models import Course, Category, Lesson, Quiz, Question, Choice
+from payments.models import Enrollment
+from tem_backend.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class CourseQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(email="qb-inst@x.com", password="pass")
+        InstructorProfile.objects.create(user=self.instructor)
+        self.student = User.objects.create_user(email="qb-stud@x.com", password="pass")
+        self.category = Category.objects.create(name="Data", slug="data")
+        self.client.force_authenticate(self.student)
+
+    def add_courses(self, n):
+        for i in range(n):
+            course = Course.objects.create(
+                title=f"C{i}", description="d", price=10, instructor=self.instructor,
+                featured=True,
+            )
+            course.categories.add(self.category)
+            Enrollment.objects.create(user=self.student, course=course)
+
+    def test_list_cost_does_not_grow_with_courses(self):
+        self.add_courses(1)
+        small = self.assertWithinQueryBudget(self.client.get(reverse("courses:courses-list")))
+        self.add_courses(5)
+        res = self.client.get(reverse("courses:courses-list"))
+        self.assertEqual(len(res.data), 6)
+        self.assertEqual(self.assertWithinQueryBudget(res), small)
+        self.assertEqual(res.data[0]["students"], 1)
+        self.assertEqual(res.data[0]["categorySlug"], "data")
+
+    def test_featured_within_budget(self):
+        self.add_courses(4)
+        res = self.client.get(reverse("courses:courses-featured"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertWithinQueryBudget(res)
+
+    def test_retrieve_within_budget(self):
+        self.add_courses(1)
+        course = Course.objects.get()
+        res = self.client.get(reverse("courses:courses-detail", args=[course.pk]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertWithinQueryBudget(res)
+
+    def test_quiz_submit_cost_does_not_grow_with_questions(self):
+        self.add_courses(1)
+        lesson = Lesson.objects.create(course=Course.objects.get(), title="L", content="c")
+        quiz = Quiz.objects.create(lesson=lesson, title="Q")
+        answers = {}
+        for i in range(6):
+            question = Question.objects.create(quiz=quiz, text=f"Q{i}", order=i)
+            right = Choice.objects.create(question=question, text="yes", is_correct=True)
+            Choice.objects.create(question=question, text="no", is_correct=False)
+            if i % 2:
+                answers[str(question.id)] = right.id
+
+        res = self.client.post(
+            reverse("courses:quizzesubmit-submit", args=[quiz.id]), {"answers": answers}, format="json"
+        )
+        self.assertEqual(res.data["correct"], 3)
+        self.assertEqual(res.data["total"], 6)
+        self.assertWithinQueryBudget(res)
@@ -4,10 +4,14 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import IntegrityError
+from django.db.models import Count, Prefetch
+from payments.models import Enrollment
 from payments.permissions import IsEnrolled
+from auth_app.authentication import StatelessJWTAuthentication
+from tem_backend.fieldsets import SparseFieldsViewMixin, fieldset_columns, nested_fields
 from .models import (
     Course, Module, Lesson, Quiz,
-    Review, Promotion, WishlistItem, Category
+    Review, Promotion, WishlistItem, Category, Choice
 )
 from .serializers import (
     CourseSerializer, ModuleSerializer,
@@ -15,6 +19,7 @@ from .serializers import (
     ReviewSerializer, PromotionSerializer, CategorySerializer
 )
 from .permissions import IsInstructor, IsOwnerInstructor
+from .pricing import with_effective_price
 
 from django_filters import rest_framework as filters
 
@@ -85,19 +90,67 @@ class PromotionViewSet(viewsets.ModelViewSet):
 
 # ─── Courses ──────────────────────────────────────────────────────────
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset         = Course.objects.all()
     serializer_class = CourseSerializer
     filterset_class = CourseFilter
+    query_budget     = {"list": 6, "retrieve": 6, "featured": 6}
+    authentication_classes = [StatelessJWTAuthentication]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
             return [IsInstructor(), IsOwnerInstructor()]
         return [permissions.IsAuthenticated()]
 
+    def get_queryset(self):
+        # everything the response reads per course, fetched per page; ?fields=
+        # (see tem_backend.fieldsets) drops what isn't sent
+        qs = super().get_queryset()
+        if self.sends("effective_price"):
+            qs = with_effective_price(qs)
+        if self.sends("students"):
+            qs = qs.annotate(students_count=Count("enrollments", distinct=True))
+        if self.sends("categories", "categorySlug"):
+            qs = qs.prefetch_related("categories")
+        user = self.request.user
+        if user.is_authenticated and self.sends("expires_at"):
+            qs = qs.prefetch_related(Prefetch(
+                "enrollments",
+                queryset=Enrollment.objects.filter(user_id=user.pk),
+                to_attr="viewer_enrollments",
+            ))
+        return self.only_sent_columns(qs)
+
+    def get_serializer(self, *args, **kwargs):
+        if args and "lessons" in self.get_fieldset().expand:
+            args = (self.with_lessons(args[0]), *args[1:])
+        return super().get_serializer(*args, **kwargs)
+
+    def with_lessons(self, instance):
+        """
+        Load ?expand=lessons for a course or a page of them in one query, as
+        `lesson_list`. Lesson bodies stay deferred unless `lessons.content`.
+        """
+        courses = [instance] if isinstance(instance, Course) else list(instance)
+        fields = nested_fields(LessonSerializer, self.get_fieldset().expand["lessons"])
+        lessons = Lesson.objects.filter(course__in=courses).only(
+            "course", *fieldset_columns(LessonSerializer(fields=fields))
+        )
+        by_course = {}
+        for lesson in lessons:
+            by_course.setdefault(lesson.course_id, []).append(lesson)
+        for course in courses:
+            course.lesson_list = by_course.get(course.pk, [])
+        return instance if isinstance(instance, Course) else courses
+
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
 
+    def perform_update(self, serializer):
+        course = serializer.save()
+        # the annotation predates the edit; let the serializer re-quote
+        course.__dict__.pop("effective_price", None)
+
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def wishlist(self, request, pk=None):
         course, user = self.get_object(), request.user
@@ -123,10 +176,16 @@ class CourseViewSet(viewsets.ModelViewSet):
         ser = self.get_serializer(qs, many=True)
         return Response(ser.data)
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     parser_classes = (MultiPartParser, FormParser)
+    query_budget = {"list": 3, "retrieve": 5}
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get_queryset(self):
+        # IsEnrolled reads the course whatever the response sends
+        return self.only_sent_columns(super().get_queryset(), "course")
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy", "upload_video"]:
@@ -174,8 +233,10 @@ class LessonViewSet(viewsets.ModelViewSet):
         return Response({"video_url": lesson.video.url})
 
 class QuizViewSet(viewsets.ModelViewSet):
-    queryset = Quiz.objects.all()
+    queryset = Quiz.objects.prefetch_related("questions__choices")
     serializer_class = QuizSerializer
+    query_budget = {"list": 4, "retrieve": 6}
+    authentication_classes = [StatelessJWTAuthentication]
 
     def get_permissions(self):
         if self.action in ["create","update","partial_update","destroy"]:
@@ -186,16 +247,20 @@ class QuizViewSet(viewsets.ModelViewSet):
 
 class QuizSubmissionView(viewsets.ViewSet):
     permission_classes = (permissions.IsAuthenticated, IsEnrolled)
+    query_budget = {"submit": 4}
 
     @action(detail=True, methods=["post"], url_path="submit")
     def submit(self, request, pk=None):
         quiz = get_object_or_404(Quiz, pk=pk)
         answers = request.data.get("answers", {})
         total = quiz.questions.count()
-        correct = 0
-        for q in quiz.questions.all():
-            selected = answers.get(str(q.id))
-            if selected and q.choices.filter(id=selected, is_correct=True).exists():
-                correct += 1
+        # every (question, correct choice) pair in one query, not one per question
+        right = Choice.objects.filter(question__quiz=quiz, is_correct=True).values_list(
+            "question_id", "id"
+        )
+        correct = sum(
+            1 for question_id, choice_id in right
+            if str(answers.get(str(question_id), "")) == str(choice_id)
+        )
         score = (correct/total)*100 if total else 0
         return Response({"score": score, "total": total, "correct": correct})
@@ -6,7 +6,8 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tem_backend.settings.development')
+    default = 'test' if sys.argv[1:2] == ['test'] else 'development'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', f'tem_backend.settings.{default}')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
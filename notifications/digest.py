@@ -0,0 +1,94 @@
+"""
+Lesson-milestone digests.
+
+Completing lessons in quick succession used to produce one notification and
+one email per lesson. Instead, milestones for the same user and course within
+NOTIFICATION_DIGEST_WINDOW update a single notification in place, and at most
+one digest email goes out per NOTIFICATION_DIGEST_EMAIL_PERIOD. Counts come
+from the CourseProgress counters kept by recalc_course_progress.
+
+The cache gate only saves scheduling a task per milestone. The once-per-period
+guarantee is the email's dedupe key, unique in the OutboundEmail table, so a
+gate lost to eviction or a cache another process can't see costs a no-op task,
+not a second email.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from progress.models import CourseProgress
+from .models import Notification
+from .services import adjust_unread_count
+
+MILESTONE_GROUP = "lesson-milestone:{course_id}"
+EMAIL_GATE_KEY = "notifications:digest-email:{user_id}:{course_id}"
+EMAIL_DEDUPE_KEY = "lesson-milestone:{user_id}:{course_id}:{period}"
+
+
+def milestone_verb(done, total, course_title):
+    return f"You’ve completed {done}/{total} lessons in “{course_title}”"
+
+
+def get_milestone_counters(user_id, course_id):
+    return (
+        CourseProgress.objects.filter(user_id=user_id, course_id=course_id)
+        .values_list("completed_lessons", "total_lessons")
+        .first()
+    )
+
+
+def record_lesson_milestone(user_id, course):
+    """
+    Create or refresh the milestone digest for (user, course), and make sure a
+    digest email is scheduled for this period. Returns the notification id.
+    """
+    counters = get_milestone_counters(user_id, course.id)
+    if counters is None:
+        return None
+    done, total = counters
+
+    now = timezone.now()
+    group_key = MILESTONE_GROUP.format(course_id=course.id)
+    verb = milestone_verb(done, total, course.title)
+    data = {"course_id": course.id, "completed": done, "total": total}
+
+    with transaction.atomic():
+        digest = (
+            Notification.objects.select_for_update()
+            .filter(
+                recipient_id=user_id,
+                group_key=group_key,
+                timestamp__gte=now - timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW),
+            )
+            .order_by("-timestamp")
+            .first()
+        )
+        if digest is None:
+            digest = Notification.objects.create(
+                recipient_id=user_id, verb=verb, data=data, group_key=group_key
+            )
+        else:
+            Notification.objects.filter(pk=digest.pk).update(
+                verb=verb, data=data, unread=True, timestamp=now
+            )
+            if not digest.unread:
+                transaction.on_commit(lambda: adjust_unread_count(user_id, 1))
+
+    _schedule_digest_email(user_id, course.id)
+    return digest.pk
+
+
+def _schedule_digest_email(user_id, course_id):
+    from .tasks import send_lesson_milestone_digest
+
+    gate = EMAIL_GATE_KEY.format(user_id=user_id, course_id=course_id)
+    if cache.add(gate, True, settings.NOTIFICATION_DIGEST_EMAIL_PERIOD):
+        period = int(time.time()) // settings.NOTIFICATION_DIGEST_EMAIL_PERIOD
+        # sent at the end of the window, so it summarises the whole burst
+        send_lesson_milestone_digest.apply_async(
+            (user_id, course_id, period), countdown=settings.NOTIFICATION_DIGEST_WINDOW
+        )
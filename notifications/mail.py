@@ -0,0 +1,231 @@
+"""
+Outbound mail queue.
+
+Callers `enqueue_email()` instead of calling `send_mail()`; rows land in
+`OutboundEmail` and are sent by `drain_outbound_queue()`, which opens one
+connection per batch, throttles per recipient domain and retries transient
+SMTP failures with exponential backoff.
+
+Each row is marked sent as soon as its message is accepted, so a drain that
+dies partway never hands delivered mail to the next one. The per-domain
+limits (OUTBOUND_EMAIL_DOMAIN_LIMITS) count sends per
+OUTBOUND_EMAIL_DOMAIN_WINDOW seconds in the shared cache, across every
+drain and process, because a drain starts after every enqueue. Rows a
+domain's limit turns away wait for the next window, so a backlog for one
+domain doesn't fill every drain's scan and hold up mail to the others.
+"""
+import logging
+import smtplib
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_SENDS_KEY = "mail:domain-sends:{domain}:{window}"
+
+# Connection drops, timeouts and 4xx replies are worth another try; anything
+# else (bad address, 5xx) is permanent.
+TRANSIENT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+def _domain(email):
+    return email.rsplit("@", 1)[-1].lower()
+
+
+def _is_transient(exc):
+    if isinstance(exc, TRANSIENT_ERRORS):
+        return True
+    code = getattr(exc, "smtp_code", None)
+    return code is not None and 400 <= code < 500
+
+
+def _schedule_drain():
+    from .tasks import drain_outbound_email
+    transaction.on_commit(drain_outbound_email.delay)
+
+
+def enqueue_email(recipient_email, subject, message, dedupe_key=None):
+    """
+    Queue one email. Returns the new row, or None if `dedupe_key` was already used.
+    """
+    created = enqueue_emails([(recipient_email, subject, message, dedupe_key)])
+    return created[0] if created else None
+
+
+def enqueue_emails(messages):
+    """
+    Queue many emails with a single INSERT.
+
+    `messages` is an iterable of (recipient_email, subject, message) or
+    (recipient_email, subject, message, dedupe_key). Rows whose dedupe_key
+    already exists are skipped.
+    """
+    rows, seen = [], set()
+    for recipient_email, subject, message, *rest in messages:
+        dedupe_key = rest[0] if rest else None
+        if dedupe_key:
+            if dedupe_key in seen:
+                continue
+            seen.add(dedupe_key)
+        rows.append(OutboundEmail(
+            dedupe_key=dedupe_key,
+            to_email=recipient_email,
+            domain=_domain(recipient_email),
+            subject=subject,
+            body=message,
+        ))
+    if not rows:
+        return []
+
+    keys = [r.dedupe_key for r in rows if r.dedupe_key]
+    if keys:
+        taken = set(
+            OutboundEmail.objects.filter(dedupe_key__in=keys)
+            .values_list("dedupe_key", flat=True)
+        )
+        rows = [r for r in rows if r.dedupe_key not in taken]
+
+    created = OutboundEmail.objects.bulk_create(rows, ignore_conflicts=True)
+    if created:
+        _schedule_drain()
+    return created
+
+
+def _reserve_sends(domain, wanted):
+    """
+    Take up to `wanted` sends from `domain`'s allowance for the current
+    window; returns how many were granted.
+    """
+    limits = settings.OUTBOUND_EMAIL_DOMAIN_LIMITS
+    limit = limits.get(domain, limits.get("default", wanted))
+    window = settings.OUTBOUND_EMAIL_DOMAIN_WINDOW
+    key = DOMAIN_SENDS_KEY.format(domain=domain, window=int(time.time()) // window)
+    cache.add(key, 0, window * 2)
+    used = cache.incr(key, wanted)
+    granted = max(0, min(wanted, limit - (used - wanted)))
+    if granted < wanted:
+        cache.decr(key, wanted - granted)
+    return granted
+
+
+def _next_window():
+    """When the current per-domain send window ends."""
+    window = settings.OUTBOUND_EMAIL_DOMAIN_WINDOW
+    return datetime.fromtimestamp((int(time.time()) // window + 1) * window, tz=dt_timezone.utc)
+
+
+def _claim_batch(batch_size):
+    """
+    Lock the next due rows, apply per-domain limits and lease them to this worker
+    so a concurrent drain doesn't pick them up. Rows over their domain's limit
+    are put off until the next window.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.OUTBOUND_EMAIL_LEASE_SECONDS)
+
+    with transaction.atomic():
+        candidates = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[: batch_size * 2]
+        )
+        by_domain = defaultdict(list)
+        for row in candidates:
+            by_domain[row.domain].append(row)
+        batch, throttled = [], []
+        for domain, rows in by_domain.items():   # domains in order of their oldest row
+            room = batch_size - len(batch)
+            if room <= 0:
+                break
+            wanted = min(len(rows), room)
+            granted = _reserve_sends(domain, wanted)
+            batch += rows[:granted]
+            if granted < wanted:
+                throttled += rows[granted:]
+        batch.sort(key=lambda row: (row.next_attempt_at, row.pk))
+
+        OutboundEmail.objects.filter(pk__in=[r.pk for r in batch]).update(
+            next_attempt_at=lease_until
+        )
+        if throttled:
+            OutboundEmail.objects.filter(pk__in=[r.pk for r in throttled]).update(
+                next_attempt_at=_next_window()
+            )
+    return batch
+
+
+def _retry_or_fail(row, exc):
+    row.attempts += 1
+    row.last_error = str(exc)[:2000]
+    if _is_transient(exc) and row.attempts < settings.OUTBOUND_EMAIL_MAX_ATTEMPTS:
+        delay = min(
+            settings.OUTBOUND_EMAIL_RETRY_BACKOFF * 2 ** (row.attempts - 1),
+            settings.OUTBOUND_EMAIL_RETRY_BACKOFF_MAX,
+        )
+        row.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    else:
+        row.status = OutboundEmail.FAILED
+    row.save(update_fields=["attempts", "last_error", "next_attempt_at", "status"])
+
+
+def drain_outbound_queue(batch_size=None):
+    """
+    Send one batch of due emails over a single connection.
+    Returns {"sent": n, "retried": n, "failed": n}.
+    """
+    batch = _claim_batch(batch_size or settings.OUTBOUND_EMAIL_BATCH_SIZE)
+    stats = Counter(sent=0, retried=0, failed=0)
+    if not batch:
+        return dict(stats)
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Could not open mail connection: %s", exc)
+        for row in batch:
+            _retry_or_fail(row, exc)
+            stats["failed" if row.status == OutboundEmail.FAILED else "retried"] += 1
+        return dict(stats)
+
+    try:
+        for row in batch:
+            msg = EmailMessage(
+                row.subject,
+                row.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [row.to_email],
+                connection=connection,
+            )
+            try:
+                connection.send_messages([msg])
+            except SoftTimeLimitExceeded:
+                # out of time: stop here; this row and the rest wait out their lease
+                raise
+            except Exception as exc:
+                logger.warning("Email %s to %s failed: %s", row.pk, row.to_email, exc)
+                _retry_or_fail(row, exc)
+                stats["failed" if row.status == OutboundEmail.FAILED else "retried"] += 1
+            else:
+                OutboundEmail.objects.filter(pk=row.pk).update(
+                    status=OutboundEmail.SENT, sent_at=timezone.now()
+                )
+                stats["sent"] += 1
+    finally:
+        connection.close()
+    return dict(stats)
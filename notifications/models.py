@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Notification(models.Model):
     recipient = models.ForeignKey(
@@ -12,9 +13,81 @@ class Notification(models.Model):
     link = models.URLField(blank=True, null=True)
     unread = models.BooleanField(default=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    # notifications sharing a key collapse into one (see notifications.digest)
+    group_key = models.CharField(max_length=255, blank=True, null=True)
 
     class Meta:
-        ordering = ["-timestamp"]
+        ordering = ["-timestamp", "-id"]
+        indexes = [
+            # feed: WHERE recipient = ? ORDER BY timestamp DESC, id DESC (keyset pagination)
+            models.Index(fields=["recipient", "-timestamp", "-id"]),
+            # unread counter / mark-read UPDATEs
+            models.Index(fields=["recipient", "unread"]),
+            # digest lookup: latest notification in a group
+            models.Index(fields=["recipient", "group_key", "-timestamp"]),
+            # retention sweep: WHERE unread = false AND timestamp < cutoff
+            models.Index(fields=["unread", "timestamp"]),
+        ]
 
     def __str__(self):
         return f"{self.recipient.email}: {self.verb}"
+
+
+
+class ArchivedNotification(models.Model):
+    """
+    Cold storage for notifications moved out of the hot table by
+    `notifications.retention`. Never read by the feed.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    recipient   = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+    )
+    verb        = models.CharField(max_length=255)
+    data        = models.JSONField(blank=True, null=True)
+    link        = models.URLField(blank=True, null=True)
+    unread      = models.BooleanField(default=False)
+    timestamp   = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-timestamp"]
+        indexes = [models.Index(fields=["recipient", "-timestamp"])]
+
+    def __str__(self):
+        return f"[archived] {self.recipient_id}: {self.verb}"
+
+
+class OutboundEmail(models.Model):
+    """
+    One queued email. Rows are drained in batches by `notifications.mail`,
+    which reuses a single SMTP connection per batch.
+    """
+    PENDING, SENT, FAILED = "pending", "sent", "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT,    "Sent"),
+        (FAILED,  "Failed"),
+    ]
+
+    dedupe_key      = models.CharField(max_length=255, unique=True, null=True, blank=True,
+                                       help_text="Same key is only ever queued (and sent) once")
+    to_email        = models.EmailField()
+    domain          = models.CharField(max_length=255)
+    subject         = models.CharField(max_length=255)
+    body            = models.TextField()
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.TextField(blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.to_email}: {self.subject} [{self.status}]"
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (timestamp, id) — backed by the
+    (recipient, -timestamp, -id) index, so page N costs the same as page 1.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-timestamp", "-id")
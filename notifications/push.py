@@ -0,0 +1,139 @@
+"""
+Pub/sub layer behind the notification SSE stream.
+
+`publish_notification()` is called after a Notification commits; every open
+stream for that recipient gets the event. Two brokers are available, picked by
+NOTIFICATIONS_PUSH_BACKEND:
+
+  • "redis"  – Redis PUBLISH / SUBSCRIBE, for multi-process deployments
+  • "memory" – in-process fan-out, for tests and single-process dev servers
+
+Each connection owns a bounded `Subscription`; when a slow client lets it fill
+up, further events are dropped and the stream tells the client to resync.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifications:user:{user_id}"
+
+
+class Subscription:
+    """
+    Per-connection bounded buffer (backpressure lives here).
+    """
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        return await self.queue.get()
+
+    def clear(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, user_id, event):
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, sub in targets:
+            loop.call_soon_threadsafe(sub.offer, event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        sub = Subscription(settings.NOTIFICATIONS_PUSH_QUEUE_SIZE)
+        entry = (asyncio.get_running_loop(), sub)
+        with self._lock:
+            self._subscribers[user_id].add(entry)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(entry)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+
+class RedisBroker:
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+
+    def _sync_client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def publish(self, user_id, event):
+        self._sync_client().publish(CHANNEL.format(user_id=user_id), json.dumps(event))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        import redis.asyncio as aioredis
+
+        sub = Subscription(settings.NOTIFICATIONS_PUSH_QUEUE_SIZE)
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(CHANNEL.format(user_id=user_id))
+
+        async def reader():
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    sub.offer(json.loads(message["data"]))
+
+        task = asyncio.create_task(reader())
+        try:
+            yield sub
+        finally:
+            task.cancel()
+            await pubsub.unsubscribe()
+            await pubsub.close()
+            await client.close()
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        if settings.NOTIFICATIONS_PUSH_BACKEND == "redis":
+            _broker = RedisBroker(settings.NOTIFICATIONS_PUSH_REDIS_URL)
+        else:
+            _broker = InMemoryBroker()
+    return _broker
+
+
+def notification_event(notification):
+    return NotificationSerializer(notification).data
+
+
+def publish_notification(notification):
+    # push is best-effort: clients fall back to the REST feed on resync
+    try:
+        get_broker().publish(notification.recipient_id, dict(notification_event(notification)))
+    except Exception:
+        logger.exception("Could not publish notification %s", notification.pk)
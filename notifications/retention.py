@@ -0,0 +1,98 @@
+"""
+Keeps the hot Notification table bounded.
+
+Two rules, both applied in small chunks (one short transaction each) so the
+job never holds long locks on the feed table:
+
+  • read notifications older than NOTIFICATION_RETENTION_DAYS are archived
+  • each user keeps at most NOTIFICATION_MAX_PER_USER notifications; older
+    ones beyond the cap are archived
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Notification, ArchivedNotification
+from .services import invalidate_unread_counts
+
+ARCHIVED_FIELDS = ("id", "recipient_id", "verb", "data", "link", "unread", "timestamp")
+
+
+def archive_chunk(ids):
+    """
+    Copy the given notifications into the archive and delete them, atomically.
+    Returns the number moved.
+    """
+    with transaction.atomic():
+        rows = list(
+            Notification.objects.select_for_update()
+            .filter(pk__in=ids)
+            .values(*ARCHIVED_FIELDS)
+        )
+        if not rows:
+            return 0
+        ArchivedNotification.objects.bulk_create(
+            [
+                ArchivedNotification(
+                    original_id=row["id"],
+                    recipient_id=row["recipient_id"],
+                    verb=row["verb"],
+                    data=row["data"],
+                    link=row["link"],
+                    unread=row["unread"],
+                    timestamp=row["timestamp"],
+                )
+                for row in rows
+            ],
+            ignore_conflicts=True,
+        )
+        Notification.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+
+        touched = {row["recipient_id"] for row in rows if row["unread"]}
+        if touched:
+            transaction.on_commit(lambda: invalidate_unread_counts(touched))
+    return len(rows)
+
+
+def archive_read_older_than(days=None, chunk_size=None):
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    chunk_size = chunk_size or settings.NOTIFICATION_ARCHIVE_CHUNK_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    moved = 0
+    while True:
+        ids = list(
+            Notification.objects.filter(unread=False, timestamp__lt=cutoff)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return moved
+        moved += archive_chunk(ids)
+
+
+def enforce_per_user_cap(cap=None, chunk_size=None):
+    cap = settings.NOTIFICATION_MAX_PER_USER if cap is None else cap
+    chunk_size = chunk_size or settings.NOTIFICATION_ARCHIVE_CHUNK_SIZE
+
+    over_cap = (
+        Notification.objects.values("recipient_id")
+        .annotate(total=Count("id"))
+        .filter(total__gt=cap)
+        .values_list("recipient_id", flat=True)
+    )
+    moved = 0
+    for user_id in over_cap.iterator():
+        while True:
+            ids = list(
+                Notification.objects.filter(recipient_id=user_id)
+                .order_by("-timestamp", "-id")
+                .values_list("pk", flat=True)[cap:cap + chunk_size]
+            )
+            if not ids:
+                break
+            moved += archive_chunk(ids)
+    return moved
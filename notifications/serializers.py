@@ -12,3 +12,9 @@ class NotificationSerializer(serializers.ModelSerializer):
             "unread",
             "timestamp",
         ]
+
+
+class MarkReadSerializer(serializers.Serializer):
+    up_to = serializers.IntegerField(
+        help_text="Mark this notification and every older one as read"
+    )
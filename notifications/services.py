@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notification
+from .push import publish_notification
+
+UNREAD_KEY = "notifications:unread:{user_id}"
+UNREAD_TTL = 60 * 60 * 24
+
+
+def _unread_key(user_id):
+    return UNREAD_KEY.format(user_id=user_id)
+
+
+def get_unread_count(user_id):
+    """
+    Cached per-user unread counter; falls back to an indexed COUNT on a miss.
+    """
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, unread=True).count()
+        cache.set(key, count, UNREAD_TTL)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Shift a cached counter by `delta`. A cold counter is left alone — the next
+    read recomputes it.
+    """
+    if not delta:
+        return
+    try:
+        value = cache.incr(_unread_key(user_id), delta)
+    except ValueError:
+        return
+    if value < 0:
+        cache.delete(_unread_key(user_id))
+
+
+def reset_unread_count(user_id, value=0):
+    cache.set(_unread_key(user_id), value, UNREAD_TTL)
+
+
+def invalidate_unread_counts(user_ids):
+    cache.delete_many([_unread_key(uid) for uid in set(user_ids)])
+
+
+def bulk_notify(notifications):
+    """
+    Insert many notifications with one INSERT and keep the unread counters
+    consistent and push them to open streams. Use this instead of calling bulk_create() directly, which
+    bypasses post_save.
+    """
+    created = Notification.objects.bulk_create(notifications)
+    user_ids = {n.recipient_id for n in created}
+
+    def after_commit():
+        invalidate_unread_counts(user_ids)
+        for notification in created:
+            if notification.pk is not None:
+                publish_notification(notification)
+
+    transaction.on_commit(after_commit)
+    return created
@@ -1,18 +1,34 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from allauth.account.signals import user_signed_up
 
-from payments.models import Enrollment
-from progress.models import LessonProgress, CourseProgress
-from courses.models import Lesson
-from teams.models import Organization
+from outbox.relay import publish
+from progress.signals import PROGRESS_ORDERING_KEY
 
 from .models import Notification
-from .tasks import send_notification_email
+from .tasks import fan_out_new_lesson, update_lesson_milestone
+from .services import adjust_unread_count
+from .push import publish_notification
+from .mail import enqueue_email
 
 User = get_user_model()
 
+# Other apps' models are named by label, not imported: Django connects the
+# receivers once those models are registered.
+
+@receiver(post_save, sender=Notification)
+def on_notification_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    # keep the cached unread counter in step with inserts
+    if instance.unread:
+        recipient_id = instance.recipient_id
+        transaction.on_commit(lambda: adjust_unread_count(recipient_id, 1))
+    # and push it to any open SSE streams
+    transaction.on_commit(lambda: publish_notification(instance))
+
 @receiver(user_signed_up)
 def welcome_user(sender, request, user, **kwargs):
     # In-app notification
@@ -20,82 +36,64 @@ def welcome_user(sender, request, user, **kwargs):
         recipient=user,
         verb="Welcome to Acadamier! Please verify your email to get started."
     )
-    # Email
-    send_notification_email.delay(
+    # Email, queued in the same transaction
+    enqueue_email(
         user.email,
         "Welcome to Acadamier!",
         f"Hi {user.first_name}, welcome aboard!"
     )
 
-@receiver(post_save, sender=Enrollment)
+@receiver(post_save, sender="payments.Enrollment")
 def enrollment_notification(sender, instance, created, **kwargs):
     if created:
         user = instance.user
         course = instance.course
         verb = f"You’re now enrolled in “{course.title}”"
         Notification.objects.create(recipient=user, verb=verb)
-        send_notification_email.delay(
+        enqueue_email(
             user.email,
             f"Enrollment confirmed: {course.title}",
             f"Congrats {user.first_name}! You’ve been enrolled in {course.title}."
         )
 
-@receiver(post_save, sender=LessonProgress)
+@receiver(post_save, sender="progress.LessonProgress")
 def lesson_progress_notification(sender, instance, **kwargs):
     if instance.is_completed:
-        user = instance.user
-        course = instance.lesson.course
-        total = Lesson.objects.filter(course=course).count()
-        done  = LessonProgress.objects.filter(
-            user=user, is_completed=True, lesson__course=course
-        ).count()
-        verb = f"You’ve completed {done}/{total} lessons in “{course.title}”"
-        Notification.objects.create(recipient=user, verb=verb)
-        send_notification_email.delay(
-            user.email,
-            f"Lesson milestone: {course.title}",
-            verb
+        # collapses into one digest notification/email per course and window;
+        # shares the recalc's ordering key, so it reads the updated counters
+        course_id = instance.lesson.course_id
+        publish(
+            update_lesson_milestone, (instance.user_id, course_id),
+            ordering_key=PROGRESS_ORDERING_KEY.format(user_id=instance.user_id, course_id=course_id),
         )
 
-@receiver(post_save, sender=CourseProgress)
+@receiver(post_save, sender="progress.CourseProgress")
 def course_completion_notification(sender, instance, **kwargs):
     if instance.percent == 100:
         user = instance.user
         course = instance.course
         verb = f"Congratulations! You’ve completed “{course.title}”"
         Notification.objects.create(recipient=user, verb=verb)
-        send_notification_email.delay(
+        enqueue_email(
             user.email,
             f"Course completed: {course.title}",
             f"Well done {user.first_name}! Download your certificate at /api/v1/progress/certificates/"
         )
 
-@receiver(post_save, sender=Lesson)
+@receiver(post_save, sender="courses.Lesson")
 def new_lesson_published(sender, instance, created, **kwargs):
-    if created:
-        course = instance.course
+    if not created:
+        return
+    # lesson.course for view/tests, or else fallback to module.course
+    if not (instance.course_id or instance.module_id):
+        return
+
+    # fan out after commit, in the background — never inside the instructor's request
+    publish(fan_out_new_lesson, (instance.id,))
+
 
-        # lesson.course for view/tests, or else fallback to module.course
-        if instance.course:
-            course = instance.course
-        elif instance.module:
-            course = instance.module.course
-        else:
-            return
-
-        for enrollment in course.enrollments.all():
-            user = enrollment.user
-            verb = f"New lesson available: “{instance.title}” in {course.title}"
-            Notification.objects.create(recipient=user, verb=verb)
-            send_notification_email.delay(
-                user.email,
-                f"New lesson in {course.title}",
-                f"Hi {user.first_name}, a new lesson “{instance.title}” has just been published."
-            )
-
-
-@receiver(post_save, sender=Organization)
-def org_created_notification(sender, instance: Organization, created, **kwargs):
+@receiver(post_save, sender="teams.Organization")
+def org_created_notification(sender, instance, created, **kwargs):
     if not created:
         return
 
@@ -120,7 +118,7 @@ def org_created_notification(sender, instance: Organization, created, **kwargs):
         "Cheers,\n"
         "The Academier Team"
     )
-    send_notification_email.delay(
+    enqueue_email(
         user.email,
         subject,
         message
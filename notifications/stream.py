@@ -0,0 +1,104 @@
+"""
+GET /api/v1/notifications/stream/ — Server-Sent Events feed of new notifications.
+
+Async view, served natively by the ASGI application (tem_backend.asgi).
+Authenticates with the usual JWT, either in the Authorization header or as
+?token=… (EventSource can't set headers). Honors Last-Event-ID: anything the
+client missed while disconnected is replayed from the database first.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+from .models import Notification
+from .push import get_broker, notification_event
+
+
+def _format_event(event, event_type=None):
+    lines = []
+    if event_type:
+        lines.append(f"event: {event_type}")
+    if "id" in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _authenticate(request):
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw = auth.get_raw_token(header) if header else request.GET.get("token")
+    if not raw:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _missed_since(user_id, last_event_id):
+    qs = (
+        Notification.objects.filter(recipient_id=user_id, pk__gt=last_event_id)
+        .order_by("pk")[: settings.NOTIFICATIONS_PUSH_REPLAY_LIMIT]
+    )
+    return [dict(notification_event(n)) for n in qs]
+
+
+async def event_stream(user_id, last_event_id=None, broker=None):
+    broker = broker or get_broker()
+    heartbeat = settings.NOTIFICATIONS_PUSH_HEARTBEAT
+
+    # subscribe first, then replay, so nothing falls into the gap between them
+    async with broker.subscribe(user_id) as sub:
+        yield f"retry: {heartbeat * 1000}\n\n"
+
+        seen = last_event_id or 0
+        if last_event_id is not None:
+            for event in await sync_to_async(_missed_since)(user_id, last_event_id):
+                seen = max(seen, event["id"])
+                yield _format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            if sub.overflowed:
+                # this client fell behind: drop the backlog and have it refetch
+                sub.clear()
+                yield _format_event({"last_event_id": seen}, event_type="resync")
+                continue
+
+            if event["id"] <= seen:
+                continue
+            seen = event["id"]
+            yield _format_event(event)
+
+
+async def notification_stream(request):
+    if request.method != "GET":
+        return HttpResponse(status=405)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return HttpResponse(status=401)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        event_stream(user.id, last_event_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,16 +1,161 @@
+import time
+from itertools import islice
+
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.cache import cache
 from django.conf import settings
 
-@shared_task(bind=True)
-def send_notification_email(self, recipient_email, subject, message):
+from django.contrib.auth import get_user_model
+
+from courses.models import Course, Lesson
+from payments.models import Enrollment
+from .models import Notification
+from .mail import enqueue_email, enqueue_emails, drain_outbound_queue
+from .services import bulk_notify
+from .retention import archive_read_older_than, enforce_per_user_cap
+
+FANOUT_PROGRESS_KEY = "notifications:fanout:{lesson_id}"
+FANOUT_PROGRESS_TTL = 60 * 60 * 24
+
+
+def get_fanout_progress(lesson_id):
+    """
+    Return the last progress snapshot written by `fan_out_new_lesson`, or None.
+    """
+    return cache.get(FANOUT_PROGRESS_KEY.format(lesson_id=lesson_id))
+
+
+def _set_fanout_progress(lesson_id, **progress):
+    cache.set(
+        FANOUT_PROGRESS_KEY.format(lesson_id=lesson_id),
+        {"lesson_id": lesson_id, **progress},
+        FANOUT_PROGRESS_TTL,
+    )
+
+
+@shared_task(bind=True, workload="interactive")
+def send_notification_email(self, recipient_email, subject, message, dedupe_key=None):
+    """
+    Generic email sender for notifications (queued, see notifications.mail).
+    """
+    enqueue_email(recipient_email, subject, message, dedupe_key)
+
+
+@shared_task(bind=True, workload="bulk", rate_limit=settings.NOTIFICATION_EMAIL_BATCH_RATE_LIMIT)
+def send_notification_email_batch(self, messages):
+    """
+    Queue a chunk of [recipient_email, subject, message] triples with one INSERT.
+    Rate-limited so a large fan-out can't flood the mail queue.
+    """
+    enqueue_emails(messages)
+
+
+@shared_task(bind=True, workload="bulk")
+def fan_out_new_lesson(self, lesson_id):
+    """
+    Notify every enrollee of a course that a new lesson was published.
+
+    Enrollees are streamed in chunks of NOTIFICATION_FANOUT_CHUNK_SIZE; each chunk
+    is written with one bulk INSERT and handed to one email batch task.
+    Progress is published to the cache (see `get_fanout_progress`).
+    """
+    lesson = Lesson.objects.select_related("course", "module__course").get(pk=lesson_id)
+    course = lesson.course or (lesson.module.course if lesson.module else None)
+    if course is None:
+        return
+
+    verb = f"New lesson available: “{lesson.title}” in {course.title}"
+    subject = f"New lesson in {course.title}"
+    chunk_size = settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+
+    enrollments = Enrollment.objects.filter(course=course)
+    total = enrollments.count()
+    processed = 0
+    _set_fanout_progress(lesson_id, total=total, processed=0, status="running")
+
+    enrollees = (
+        enrollments.order_by("pk")
+        .values_list("user_id", "user__email", "user__first_name")
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(enrollees, chunk_size))
+        if not chunk:
+            break
+
+        bulk_notify(
+            [Notification(recipient_id=user_id, verb=verb) for user_id, _, _ in chunk]
+        )
+        send_notification_email_batch.delay([
+            [
+                email,
+                subject,
+                f"Hi {first_name}, a new lesson “{lesson.title}” has just been published.",
+            ]
+            for _, email, first_name in chunk
+        ])
+
+        processed += len(chunk)
+        _set_fanout_progress(lesson_id, total=total, processed=processed, status="running")
+
+    _set_fanout_progress(lesson_id, total=total, processed=processed, status="done")
+    return processed
+
+
+@shared_task(bind=True, workload="default")
+def drain_outbound_email(self, batch_size=None):
     """
-    Generic email sender for notifications.
+    Send the next batch of queued emails. Kicked after every enqueue and
+    scheduled every minute so retries with backoff get picked up. A full
+    batch over SMTP can take minutes, more than the interactive limits allow.
+    """
+    return drain_outbound_queue(batch_size)
+
+
+@shared_task(bind=True, workload="bulk")
+def archive_old_notifications(self):
     """
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [recipient_email],
-        fail_silently=False,
+    Move stale read notifications and anything over the per-user cap into
+    ArchivedNotification. Scheduled nightly.
+    """
+    return {
+        "expired": archive_read_older_than(),
+        "over_cap": enforce_per_user_cap(),
+    }
+
+
+@shared_task(bind=True, workload="interactive")
+def update_lesson_milestone(self, user_id, course_id):
+    """
+    Refresh the milestone digest once the course counters are recalculated
+    (published behind recalc_course_progress under the same ordering key).
+    """
+    from .digest import record_lesson_milestone
+
+    course = Course.objects.filter(pk=course_id).first()
+    if course is not None:
+        return record_lesson_milestone(user_id, course)
+
+
+@shared_task(bind=True, workload="bulk")
+def send_lesson_milestone_digest(self, user_id, course_id, period=None):
+    """
+    The one milestone email for this period, built from the progress counters
+    at send time. Queued under the period's dedupe key, so a second task for
+    the same period queues nothing.
+    """
+    from .digest import EMAIL_DEDUPE_KEY, get_milestone_counters, milestone_verb
+
+    if period is None:
+        period = int(time.time()) // settings.NOTIFICATION_DIGEST_EMAIL_PERIOD
+    counters = get_milestone_counters(user_id, course_id)
+    if counters is None:
+        return
+    email = get_user_model().objects.values_list("email", flat=True).get(pk=user_id)
+    title = Course.objects.values_list("title", flat=True).get(pk=course_id)
+    send_notification_email.delay(
+        email,
+        f"Lesson milestone: {title}",
+        milestone_verb(*counters, title),
+        EMAIL_DEDUPE_KEY.format(user_id=user_id, course_id=course_id, period=period),
     )
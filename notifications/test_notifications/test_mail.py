@@ -0,0 +1,147 @@
+import smtplib
+from datetime import timedelta
+from unittest.mock import patch
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notifications import mail as outbound
+from notifications.models import OutboundEmail
+from notifications.tasks import drain_outbound_email
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class OutboundQueueTest(TestCase):
+    def setUp(self):
+        cache.clear()   # per-domain send counts
+
+    def test_enqueue_then_drain_sends_over_one_connection(self):
+        outbound.enqueue_emails([
+            ("a@example.com", "S", "A"),
+            ("b@example.com", "S", "B"),
+            ("c@example.org", "S", "C"),
+        ])
+        self.assertEqual(len(mail.outbox), 0)
+
+        with patch.object(outbound, "get_connection", wraps=outbound.get_connection) as get_conn:
+            stats = outbound.drain_outbound_queue()
+
+        get_conn.assert_called_once()
+        self.assertEqual(stats["sent"], 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboundEmail.objects.filter(status=OutboundEmail.PENDING).exists())
+
+    def test_dedupe_key_is_only_sent_once(self):
+        first = outbound.enqueue_email("a@example.com", "Receipt", "Body", dedupe_key="receipt:1")
+        again = outbound.enqueue_email("a@example.com", "Receipt", "Body", dedupe_key="receipt:1")
+        self.assertIsNotNone(first)
+        self.assertIsNone(again)
+
+        outbound.drain_outbound_queue()
+        outbound.enqueue_email("a@example.com", "Receipt", "Body", dedupe_key="receipt:1")
+        outbound.drain_outbound_queue()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(OUTBOUND_EMAIL_DOMAIN_LIMITS={"default": 100, "example.com": 1})
+    def test_per_domain_throttle_defers_the_rest(self):
+        outbound.enqueue_emails([
+            ("a@example.com", "S", "A"),
+            ("b@example.com", "S", "B"),
+            ("c@example.org", "S", "C"),
+        ])
+        stats = outbound.drain_outbound_queue()
+        self.assertEqual(stats["sent"], 2)
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.PENDING, domain="example.com").count(), 1
+        )
+
+    @override_settings(OUTBOUND_EMAIL_DOMAIN_LIMITS={"default": 100, "example.com": 1},
+                       OUTBOUND_EMAIL_DOMAIN_WINDOW=60)
+    def test_per_domain_throttle_holds_across_drains_until_the_window_ends(self):
+        outbound.enqueue_emails([("a@example.com", "S", "A"), ("b@example.com", "S", "B")])
+        with patch("notifications.mail.time.time", return_value=6000):
+            self.assertEqual(outbound.drain_outbound_queue()["sent"], 1)
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())   # drop the leases
+            self.assertEqual(outbound.drain_outbound_queue()["sent"], 0)
+        with patch("notifications.mail.time.time", return_value=6060):
+            self.assertEqual(outbound.drain_outbound_queue()["sent"], 1)
+
+    @override_settings(OUTBOUND_EMAIL_DOMAIN_LIMITS={"default": 100, "example.com": 1},
+                       OUTBOUND_EMAIL_DOMAIN_WINDOW=60)
+    def test_throttled_domain_does_not_hold_up_other_domains(self):
+        outbound.enqueue_emails([(f"{n}@example.com", "S", "Bulk") for n in range(6)])
+        outbound.enqueue_email("c@example.org", "S", "Other")
+
+        self.assertEqual(outbound.drain_outbound_queue(batch_size=2)["sent"], 1)
+        # the scanned example.com rows wait for the next window, out of the way
+        self.assertEqual(
+            OutboundEmail.objects.filter(
+                domain="example.com", status=OutboundEmail.PENDING,
+                next_attempt_at__gt=timezone.now(),
+            ).count(), 3,
+        )
+        self.assertEqual(outbound.drain_outbound_queue(batch_size=2)["sent"], 1)
+        self.assertEqual(mail.outbox[-1].to, ["c@example.org"])
+
+    def test_rows_are_marked_sent_as_they_go(self):
+        outbound.enqueue_emails([("a@example.com", "S", "A"), ("b@example.com", "S", "B")])
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=[1, SystemExit()],   # the worker is killed mid-batch
+        ):
+            with self.assertRaises(SystemExit):
+                outbound.drain_outbound_queue()
+        self.assertEqual(
+            list(OutboundEmail.objects.order_by("id").values_list("status", flat=True)),
+            [OutboundEmail.SENT, OutboundEmail.PENDING],
+        )
+
+    def test_transient_failure_is_retried_with_backoff(self):
+        outbound.enqueue_email("a@example.com", "S", "A")
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=smtplib.SMTPServerDisconnected("gone"),
+        ):
+            stats = outbound.drain_outbound_queue()
+
+        self.assertEqual(stats["retried"], 1)
+        row = OutboundEmail.objects.get()
+        self.assertEqual(row.status, OutboundEmail.PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, timezone.now() + timedelta(seconds=30))
+
+        # not due yet → nothing sent
+        self.assertEqual(outbound.drain_outbound_queue()["sent"], 0)
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbound.drain_outbound_queue()["sent"], 1)
+
+    def test_permanent_failure_is_not_retried(self):
+        outbound.enqueue_email("a@example.com", "S", "A")
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no such user")}),
+        ):
+            stats = outbound.drain_outbound_queue()
+
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.FAILED)
+
+    def test_soft_time_limit_stops_the_drain(self):
+        outbound.enqueue_emails([("a@example.com", "S", "A"), ("b@example.com", "S", "B")])
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=[1, SoftTimeLimitExceeded()],
+        ):
+            with self.assertRaises(SoftTimeLimitExceeded):
+                outbound.drain_outbound_queue()
+
+        first, second = OutboundEmail.objects.order_by("id")
+        self.assertEqual(first.status, OutboundEmail.SENT)
+        self.assertEqual((second.status, second.attempts), (OutboundEmail.PENDING, 0))
+
+    def test_lease_outlasts_the_drain(self):
+        self.assertGreater(settings.OUTBOUND_EMAIL_LEASE_SECONDS, drain_outbound_email.time_limit)
@@ -0,0 +1,89 @@
+import asyncio
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from notifications import push
+from notifications.models import Notification
+from notifications.stream import event_stream
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATIONS_PUSH_QUEUE_SIZE=2, NOTIFICATIONS_PUSH_HEARTBEAT=1)
+class PushChannelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="p@example.com", password="pass")
+        self.broker = push.InMemoryBroker()
+
+    async def test_in_memory_broker_delivers_to_subscriber(self):
+        async with self.broker.subscribe(self.user.id) as sub:
+            self.broker.publish(self.user.id, {"id": 1, "verb": "hi"})
+            self.broker.publish(self.user.id + 1, {"id": 2, "verb": "not yours"})
+            event = await asyncio.wait_for(sub.get(), timeout=1)
+        self.assertEqual(event["verb"], "hi")
+        self.assertTrue(sub.queue.empty())
+
+    async def test_slow_subscriber_overflows_instead_of_blocking(self):
+        async with self.broker.subscribe(self.user.id) as sub:
+            for i in range(5):
+                self.broker.publish(self.user.id, {"id": i, "verb": "x"})
+            await asyncio.sleep(0)
+            self.assertTrue(sub.overflowed)
+            self.assertEqual(sub.queue.qsize(), 2)
+
+    async def test_stream_pushes_new_notifications(self):
+        stream = event_stream(self.user.id, broker=self.broker)
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+
+        with patch.object(push, "get_broker", return_value=self.broker):
+            def create():
+                with self.captureOnCommitCallbacks(execute=True):
+                    return Notification.objects.create(recipient=self.user, verb="Live")
+            n = await sync_to_async(create)()
+
+        chunk = await asyncio.wait_for(anext(stream), timeout=2)
+        await stream.aclose()
+        self.assertIn(f"id: {n.id}", chunk)
+        self.assertIn("Live", chunk)
+
+    async def test_stream_replays_after_last_event_id(self):
+        def seed():
+            return [
+                Notification.objects.create(recipient=self.user, verb=f"N{i}")
+                for i in range(3)
+            ]
+        first, second, third = await sync_to_async(seed)()
+
+        stream = event_stream(self.user.id, last_event_id=first.id, broker=self.broker)
+        await anext(stream)  # retry hint
+        replayed = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        self.assertIn(f"id: {second.id}", replayed[0])
+        self.assertIn(f"id: {third.id}", replayed[1])
+
+    async def test_stream_tells_overflowed_client_to_resync(self):
+        stream = event_stream(self.user.id, broker=self.broker)
+        await anext(stream)
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        for i in range(1, 6):
+            self.broker.publish(self.user.id, {"id": i, "verb": "x"})
+        chunk = await asyncio.wait_for(pending, timeout=2)
+        await stream.aclose()
+        self.assertIn("event: resync", chunk)
+
+    def test_stream_endpoint_requires_token(self):
+        resp = self.client.get(reverse("notifications:stream"))
+        self.assertEqual(resp.status_code, 401)
+
+    def test_stream_endpoint_accepts_query_token(self):
+        token = AccessToken.for_user(self.user)
+        resp = self.client.get(reverse("notifications:stream"), {"token": str(token)})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        self.assertTrue(resp.streaming)
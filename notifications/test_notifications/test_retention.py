@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from notifications.models import Notification, ArchivedNotification
+from notifications.retention import archive_read_older_than, enforce_per_user_cap
+from notifications.tasks import archive_old_notifications
+
+User = get_user_model()
+
+
+class RetentionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="r@example.com", password="pass")
+
+    def _notify(self, verb, days_old=0, unread=False, user=None):
+        n = Notification.objects.create(recipient=user or self.user, verb=verb, unread=unread)
+        if days_old:
+            Notification.objects.filter(pk=n.pk).update(
+                timestamp=timezone.now() - timedelta(days=days_old)
+            )
+        return n
+
+    def test_archives_only_old_read_notifications(self):
+        old_read = self._notify("old read", days_old=100)
+        self._notify("old unread", days_old=100, unread=True)
+        self._notify("fresh read", days_old=1)
+
+        moved = archive_read_older_than(days=90, chunk_size=1)
+
+        self.assertEqual(moved, 1)
+        self.assertFalse(Notification.objects.filter(pk=old_read.pk).exists())
+        archived = ArchivedNotification.objects.get(original_id=old_read.pk)
+        self.assertEqual(archived.verb, "old read")
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_per_user_cap_keeps_newest(self):
+        for i in range(5):
+            self._notify(f"n{i}", days_old=5 - i)
+        other = User.objects.create_user(email="o@example.com", password="pass")
+        self._notify("other", user=other)
+
+        moved = enforce_per_user_cap(cap=2, chunk_size=2)
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(
+            list(Notification.objects.filter(recipient=self.user).values_list("verb", flat=True)),
+            ["n4", "n3"],
+        )
+        self.assertTrue(Notification.objects.filter(recipient=other).exists())
+
+    def test_task_runs_both_rules(self):
+        self._notify("stale", days_old=365)
+        result = archive_old_notifications.run()
+        self.assertEqual(result, {"expired": 1, "over_cap": 0})
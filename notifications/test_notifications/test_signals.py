@@ -1,8 +1,9 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from allauth.account.signals import user_signed_up
 from unittest.mock import patch
-from notifications.models import Notification
+from notifications.models import Notification, OutboundEmail
 from notifications import tasks
 from payments.models import Enrollment
 from courses.models import Course, Lesson
@@ -26,9 +27,9 @@ class NotificationSignalsTest(TestCase):
             price=0,
             instructor=self.instructor,
         )
+        cache.clear()
 
-    @patch.object(tasks.send_notification_email, "delay")
-    def test_welcome_user_signal(self, mock_delay):
+    def test_welcome_user_signal(self):
         new_user = User.objects.create_user(
             email="new@example.com", password="pass"
         )
@@ -38,14 +39,13 @@ class NotificationSignalsTest(TestCase):
         self.assertIsNotNone(notif)
         self.assertIn("Welcome", notif.verb)
 
-        mock_delay.assert_called_once_with(
-            new_user.email,
-            "Welcome to Acadamier!",
-            f"Hi {new_user.first_name}, welcome aboard!"
-        )
+        # queued in the same transaction as the notification
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to_email, new_user.email)
+        self.assertEqual(email.subject, "Welcome to Acadamier!")
+        self.assertEqual(email.body, f"Hi {new_user.first_name}, welcome aboard!")
 
-    @patch.object(tasks.send_notification_email, "delay")
-    def test_enrollment_creates_notification(self, mock_delay):
+    def test_enrollment_creates_notification(self):
         Enrollment.objects.create(user=self.student, course=self.course)
 
         notif = Notification.objects.filter(
@@ -54,18 +54,19 @@ class NotificationSignalsTest(TestCase):
         ).first()
         self.assertIsNotNone(notif)
 
-        mock_delay.assert_called_once()
-        args, _ = mock_delay.call_args
-        self.assertIn(self.course.title, args[1])  # subject contains course title
+        email = OutboundEmail.objects.get()
+        self.assertIn(self.course.title, email.subject)
 
     @patch.object(tasks.send_notification_email, "delay")
     def test_lesson_progress_notification(self, mock_delay):
         Lesson.objects.create(course=self.course, title="L1", content="", order=1)
         lesson2 = Lesson.objects.create(course=self.course, title="L2", content="", order=2)
 
-        LessonProgress.objects.create(
-            user=self.student, lesson=lesson2, is_completed=True
-        )
+        # the digest is refreshed by the outbox relay, after the recalc
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonProgress.objects.create(
+                user=self.student, lesson=lesson2, is_completed=True
+            )
 
         notif = Notification.objects.filter(
             recipient=self.student,
@@ -75,7 +76,39 @@ class NotificationSignalsTest(TestCase):
         mock_delay.assert_called_once()
 
     @patch.object(tasks.send_notification_email, "delay")
-    def test_course_completion_notification(self, mock_delay):
+    def test_lesson_milestones_collapse_into_one_digest(self, mock_delay):
+        lessons = [
+            Lesson.objects.create(course=self.course, title=f"L{i}", content="", order=i)
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonProgress.objects.create(user=self.student, lesson=lessons[0], is_completed=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonProgress.objects.create(user=self.student, lesson=lessons[1], is_completed=True)
+
+        digests = Notification.objects.filter(
+            recipient=self.student, group_key=f"lesson-milestone:{self.course.id}"
+        )
+        self.assertEqual(digests.count(), 1)
+        self.assertIn("2/3", digests.get().verb)
+        # one digest email for the period, not one per lesson
+        mock_delay.assert_called_once()
+        self.assertEqual(mock_delay.call_args.args[1], f"Lesson milestone: {self.course.title}")
+
+    def test_lost_digest_gate_still_sends_one_email(self):
+        lessons = [
+            Lesson.objects.create(course=self.course, title=f"L{i}", content="", order=i)
+            for i in range(3)
+        ]
+        for lesson in lessons[:2]:
+            with self.captureOnCommitCallbacks(execute=True):
+                LessonProgress.objects.create(user=self.student, lesson=lesson, is_completed=True)
+            cache.clear()   # the gate is gone, as if another process had handled it
+
+        emails = OutboundEmail.objects.filter(subject=f"Lesson milestone: {self.course.title}")
+        self.assertEqual(emails.count(), 1)
+
+    def test_course_completion_notification(self):
         CourseProgress.objects.create(
             user=self.student, course=self.course, percent=100
         )
@@ -85,19 +118,18 @@ class NotificationSignalsTest(TestCase):
             verb__contains="Congratulations"
         ).first()
         self.assertIsNotNone(notif)
-        mock_delay.assert_called_once()
+        self.assertIn(self.course.title, OutboundEmail.objects.get().subject)
 
-    @patch.object(tasks.send_notification_email, "delay")
-    def test_new_lesson_published_notification(self, mock_delay):
+    @patch.object(tasks.send_notification_email_batch, "delay")
+    def test_new_lesson_published_notification(self, mock_batch_delay):
         # 1) enroll the student (fires enrollment signal)
         Enrollment.objects.create(user=self.student, course=self.course)
-        # clear that call so we only assert on the new-lesson signal below
-        mock_delay.reset_mock()
 
-        # 2) publish a new lesson
-        new_lesson = Lesson.objects.create(
-            course=self.course, title="Brand New", content="", order=3
-        )
+        # 2) publish a new lesson — fan-out only runs once the save commits
+        with self.captureOnCommitCallbacks(execute=True):
+            new_lesson = Lesson.objects.create(
+                course=self.course, title="Brand New", content="", order=3
+            )
 
         # in-app notification exists
         notif = Notification.objects.filter(
@@ -106,16 +138,23 @@ class NotificationSignalsTest(TestCase):
         ).first()
         self.assertIsNotNone(notif)
 
-        # exactly one email task for the new-lesson notification
-        mock_delay.assert_called_once_with(
+        # exactly one email batch, carrying the student's message
+        mock_batch_delay.assert_called_once_with([[
             self.student.email,
             f"New lesson in {self.course.title}",
             f"Hi {self.student.first_name}, a new lesson “{new_lesson.title}” has just been published."
-        )
+        ]])
 
+    @patch.object(tasks.fan_out_new_lesson, "delay")
+    def test_new_lesson_fan_out_waits_for_commit(self, mock_fanout_delay):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Lesson.objects.create(course=self.course, title="Later", content="", order=4)
 
-    @patch.object(tasks.send_notification_email, "delay")
-    def test_org_created_notification(self, mock_delay):
+        mock_fanout_delay.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+
+
+    def test_org_created_notification(self):
         # Create a new org (triggers our post_save signal)
         org = Organization.objects.create(
             name="BizCorp",
@@ -133,10 +172,12 @@ class NotificationSignalsTest(TestCase):
         ).first()
         self.assertIsNotNone(notif)
 
-        # Email task was enqueued with the correct args
-        mock_delay.assert_called_once_with(
-            self.instructor.email,
-            "Welcome to Academier — your Organization ID",
+        # Email was queued with the correct content
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to_email, self.instructor.email)
+        self.assertEqual(email.subject, "Welcome to Academier — your Organization ID")
+        self.assertEqual(
+            email.body,
             (
                 f"Hi {self.instructor.first_name},\n\n"
                 f"Your organization “{org.name}” has been created successfully.\n"
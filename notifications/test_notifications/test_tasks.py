@@ -0,0 +1,75 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from unittest.mock import patch
+
+from notifications import tasks
+from notifications.models import Notification
+from notifications.signals import enrollment_notification
+from courses.models import Course, Lesson
+from payments.models import Enrollment
+
+User = get_user_model()
+
+@override_settings(NOTIFICATION_FANOUT_CHUNK_SIZE=2)
+class FanOutNewLessonTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        post_save.disconnect(enrollment_notification, sender=Enrollment)
+
+    @classmethod
+    def tearDownClass(cls):
+        post_save.connect(enrollment_notification, sender=Enrollment)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        instructor = User.objects.create_user(email="inst@example.com", password="pass")
+        self.course = Course.objects.create(
+            title="Big Course", description="d", price=0, instructor=instructor
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f"s{i}@example.com", first_name=f"S{i}", password="pass"
+            )
+            for i in range(5)
+        ]
+        for student in self.students:
+            Enrollment.objects.create(user=student, course=self.course)
+        self.lesson = Lesson.objects.create(
+            course=self.course, title="Fresh", content="", order=1
+        )
+
+    @patch.object(tasks.send_notification_email_batch, "delay")
+    def test_fan_out_is_chunked(self, mock_batch_delay):
+        processed = tasks.fan_out_new_lesson.run(self.lesson.id)
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(
+            Notification.objects.filter(verb__contains="Fresh").count(), 5
+        )
+        # 5 enrollees in chunks of 2 → 3 email batches
+        batch_sizes = [len(call.args[0]) for call in mock_batch_delay.call_args_list]
+        self.assertEqual(batch_sizes, [2, 2, 1])
+
+    @patch.object(tasks.send_notification_email_batch, "delay")
+    def test_fan_out_reports_progress(self, mock_batch_delay):
+        self.assertIsNone(tasks.get_fanout_progress(self.lesson.id))
+        tasks.fan_out_new_lesson.run(self.lesson.id)
+
+        progress = tasks.get_fanout_progress(self.lesson.id)
+        self.assertEqual(progress["total"], 5)
+        self.assertEqual(progress["processed"], 5)
+        self.assertEqual(progress["status"], "done")
+
+    def test_email_batch_sends_each_message(self):
+        tasks.send_notification_email_batch.run([
+            ["a@example.com", "Subj", "Body A"],
+            ["b@example.com", "Subj", "Body B"],
+        ])
+        tasks.drain_outbound_email.run()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].to, ["b@example.com"])
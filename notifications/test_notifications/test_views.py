@@ -2,6 +2,7 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from django.urls import reverse
+from django.core.cache import cache
 
 from notifications.models import Notification
 
@@ -18,6 +19,7 @@ class NotificationViewsTest(TestCase):
         Notification.objects.create(recipient=self.user1, verb="First")
         Notification.objects.create(recipient=self.user2, verb="Solo")
         Notification.objects.create(recipient=self.user1, verb="Second")
+        cache.clear()
 
         self.client = APIClient()
         self.url = reverse("notifications:list")
@@ -28,10 +30,111 @@ class NotificationViewsTest(TestCase):
         self.assertEqual(resp.status_code, 200)
         data = resp.json()
         # should return 2 notifications, newest first
-        verbs = [n["verb"] for n in data]
+        verbs = [n["verb"] for n in data["results"]]
         self.assertEqual(verbs, ["Second", "First"])
 
+    def test_list_is_cursor_paginated(self):
+        for i in range(3):
+            Notification.objects.create(recipient=self.user1, verb=f"More {i}")
+        self.client.force_authenticate(self.user1)
+
+        first = self.client.get(self.url, {"page_size": 3}).json()
+        self.assertEqual(len(first["results"]), 3)
+        self.assertIsNotNone(first["next"])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([n["verb"] for n in second["results"]], ["Second", "First"])
+        self.assertIsNone(second["next"])
+
+    def test_unread_count(self):
+        self.client.force_authenticate(self.user1)
+        resp = self.client.get(reverse("notifications:unread-count"))
+        self.assertEqual(resp.json(), {"unread": 2})
+
+    def test_unread_counter_follows_new_notifications(self):
+        self.client.force_authenticate(self.user1)
+        self.client.get(reverse("notifications:unread-count"))  # warm the cache
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(recipient=self.user1, verb="Third")
+        resp = self.client.get(reverse("notifications:unread-count"))
+        self.assertEqual(resp.json(), {"unread": 3})
+
+    def test_mark_all_read(self):
+        self.client.force_authenticate(self.user1)
+        resp = self.client.post(reverse("notifications:mark-all-read"))
+        self.assertEqual(resp.json()["marked"], 2)
+        self.assertFalse(
+            Notification.objects.filter(recipient=self.user1, unread=True).exists()
+        )
+        # other users untouched
+        self.assertTrue(
+            Notification.objects.filter(recipient=self.user2, unread=True).exists()
+        )
+        resp = self.client.get(reverse("notifications:unread-count"))
+        self.assertEqual(resp.json(), {"unread": 0})
+
+    def test_mark_read_up_to(self):
+        from datetime import timedelta
+        first = Notification.objects.get(recipient=self.user1, verb="First")
+        Notification.objects.filter(pk=first.pk).update(
+            timestamp=first.timestamp - timedelta(minutes=5)
+        )
+        self.client.force_authenticate(self.user1)
+        self.client.get(reverse("notifications:unread-count"))  # warm the cache
+
+        resp = self.client.post(reverse("notifications:mark-read"), {"up_to": first.pk}, format="json")
+        self.assertEqual(resp.json(), {"marked": 1, "unread": 1})
+        self.assertTrue(
+            Notification.objects.filter(recipient=self.user1, verb="Second", unread=True).exists()
+        )
+
+    def test_mark_read_up_to_splits_equal_timestamps_by_id(self):
+        first = Notification.objects.get(recipient=self.user1, verb="First")
+        Notification.objects.filter(recipient=self.user1).update(timestamp=first.timestamp)
+        self.client.force_authenticate(self.user1)
+
+        resp = self.client.post(reverse("notifications:mark-read"), {"up_to": first.pk}, format="json")
+        self.assertEqual(resp.json(), {"marked": 1, "unread": 1})
+        self.assertTrue(
+            Notification.objects.filter(recipient=self.user1, verb="Second", unread=True).exists()
+        )
+
+    def test_mark_read_ignores_other_users_anchor(self):
+        foreign = Notification.objects.get(recipient=self.user2)
+        self.client.force_authenticate(self.user1)
+        resp = self.client.post(reverse("notifications:mark-read"), {"up_to": foreign.pk}, format="json")
+        self.assertEqual(resp.json()["marked"], 0)
+
     def test_unauthenticated_get_is_denied(self):
         resp = self.client.get(self.url)
         # DRF's IsAuthenticated returns 401 for unauthenticated
         self.assertEqual(resp.status_code, 401)
+
+
+class FanoutProgressViewTest(TestCase):
+    def setUp(self):
+        from courses.models import Course, Lesson
+        from django.core.cache import cache
+        cache.clear()
+        User = get_user_model()
+        self.instructor = User.objects.create_user(email="i@example.com", password="pass")
+        self.other = User.objects.create_user(email="o@example.com", password="pass")
+        course = Course.objects.create(
+            title="C", description="D", price=0, instructor=self.instructor
+        )
+        self.lesson = Lesson.objects.create(course=course, title="L", content="", order=1)
+        self.client = APIClient()
+        self.url = reverse("notifications:fanout-progress", args=[self.lesson.id])
+
+    def test_owner_sees_progress(self):
+        from notifications.tasks import fan_out_new_lesson
+        fan_out_new_lesson.run(self.lesson.id)
+        self.client.force_authenticate(self.instructor)
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["status"], "done")
+
+    def test_other_user_forbidden(self):
+        self.client.force_authenticate(self.other)
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 403)
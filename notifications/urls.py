@@ -1,8 +1,20 @@
 from django.urls import path
-from .views import NotificationListView
+from .views import (
+    NotificationListView,
+    UnreadCountView,
+    MarkAllReadView,
+    MarkReadUpToView,
+    FanoutProgressView,
+)
+from .stream import notification_stream
 
 app_name = "notifications"
 
 urlpatterns = [
     path("", NotificationListView.as_view(), name="list"),
+    path("stream/", notification_stream, name="stream"),
+    path("unread-count/", UnreadCountView.as_view(), name="unread-count"),
+    path("mark-all-read/", MarkAllReadView.as_view(), name="mark-all-read"),
+    path("mark-read/", MarkReadUpToView.as_view(), name="mark-read"),
+    path("fanout/<int:lesson_id>/", FanoutProgressView.as_view(), name="fanout-progress"),
 ]
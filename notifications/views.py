@@ -1,13 +1,103 @@
-from rest_framework import generics, permissions
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from auth_app.authentication import StatelessJWTAuthentication
+from courses.models import Lesson
 from .models import Notification
-from .serializers import NotificationSerializer
+from .pagination import NotificationCursorPagination
+from .serializers import NotificationSerializer, MarkReadSerializer
+from .services import get_unread_count, adjust_unread_count, reset_unread_count
+from .tasks import get_fanout_progress
 
 class NotificationListView(generics.ListAPIView):
     """
-    GET /api/v1/notifications/ → list of the current user's notifications
+    GET /api/v1/notifications/ → cursor-paginated feed of the current user's
+    notifications, newest first (?cursor=…&page_size=…)
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        return Notification.objects.filter(recipient_id=self.request.user.pk)
+
+
+class UnreadCountView(APIView):
+    """
+    GET /api/v1/notifications/unread-count/ → {"unread": n}
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get(self, request):
+        return Response({"unread": get_unread_count(request.user.id)})
+
+
+class MarkAllReadView(APIView):
+    """
+    POST /api/v1/notifications/mark-all-read/ → marks everything read in one UPDATE
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        marked = Notification.objects.filter(
+            recipient=request.user, unread=True
+        ).update(unread=False)
+        reset_unread_count(request.user.id)
+        return Response({"marked": marked, "unread": 0})
+
+
+class MarkReadUpToView(APIView):
+    """
+    POST /api/v1/notifications/mark-read/ {"up_to": <id>} → marks that
+    notification and everything older as read in one UPDATE. "Older" follows
+    the feed's (timestamp, id) order, so rows sharing the anchor's timestamp
+    are split by id.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        anchor = Notification.objects.filter(
+            pk=serializer.validated_data["up_to"], recipient=request.user
+        ).values_list("id", "timestamp").first()
+        if anchor is None:
+            marked = 0
+        else:
+            anchor_id, ts = anchor
+            marked = Notification.objects.filter(
+                Q(timestamp__lt=ts) | Q(timestamp=ts, id__lte=anchor_id),
+                recipient=request.user, unread=True,
+            ).update(unread=False)
+        adjust_unread_count(request.user.id, -marked)
+        return Response({"marked": marked, "unread": get_unread_count(request.user.id)})
+
+
+class FanoutProgressView(APIView):
+    """
+    GET /api/v1/notifications/fanout/<lesson_id>/ → new-lesson fan-out progress,
+    visible to the instructor who owns the lesson's course.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, lesson_id):
+        lesson = get_object_or_404(
+            Lesson.objects.select_related("course", "module__course"), pk=lesson_id
+        )
+        course = lesson.course or (lesson.module.course if lesson.module else None)
+        if course is None or course.instructor_id != request.user.id:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        progress = get_fanout_progress(lesson_id)
+        if progress is None:
+            return Response(
+                {"detail": "No fan-out recorded for this lesson."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(progress)
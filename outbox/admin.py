@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import OutboxMessage
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display  = ("task", "ordering_key", "status", "attempts", "created_at", "sent_at")
+    list_filter   = ("status", "task")
+    search_fields = ("task", "ordering_key", "dedupe_key")
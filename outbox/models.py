@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """
+    One side effect (a Celery task call) written in the same transaction as
+    the change that caused it, and dispatched after commit by `outbox.relay`.
+    """
+    PENDING, DISPATCHED, SENT, FAILED = "pending", "dispatched", "sent", "failed"
+    STATUS_CHOICES = [
+        (PENDING,    "Pending"),
+        (DISPATCHED, "Dispatched"),   # in a chain, waiting for its turn
+        (SENT,       "Sent"),
+        (FAILED,     "Failed"),
+    ]
+
+    task            = models.CharField(max_length=200, help_text="Registered Celery task name")
+    args            = models.JSONField(default=list, blank=True)
+    kwargs          = models.JSONField(default=dict, blank=True)
+    countdown       = models.PositiveIntegerField(null=True, blank=True)
+    ordering_key    = models.CharField(max_length=255, blank=True, db_index=True,
+                                       help_text="Messages sharing a key run in insertion order")
+    dedupe_key      = models.CharField(max_length=255, unique=True, null=True, blank=True,
+                                       help_text="Same key is only ever published (and run) once")
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.TextField(blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.task}{tuple(self.args)} [{self.status}]"
@@ -0,0 +1,290 @@
+"""
+Transactional outbox for signal-triggered side effects.
+
+Receivers call `publish()` instead of `task.delay()`: the task call is written
+as an `OutboxMessage` row inside the caller's transaction, so it only exists
+if the change that caused it commits, and the request never waits on a
+broker round-trip. After commit, `relay_outbox` claims due rows in batches,
+collapses identical calls, dispatches each ordering key as one chain (so a
+recalculation still runs before whatever reads its result) and retries
+failed dispatches with exponential backoff. The beat schedule runs the relay
+every minute too, which picks up anything a lost kick left behind.
+
+A lone message is sent once the broker takes it. A chain stops at its first
+failing task, so its rows are only "dispatched" until each task's own
+`mark_sent` step runs; if one fails, the chain's errback puts whatever
+hasn't run back in the queue with backoff. Dispatched rows carry a lease
+(OUTBOX_DISPATCH_LEASE_SECONDS): if a worker dies mid-chain or the chain is
+lost, the relay requeues them once it runs out.
+
+A keyed message is only claimed when no earlier message with its key is
+still waiting (in backoff, in flight, or held by another relay), so a retry
+can't be overtaken by the messages queued behind it.
+
+Published tasks must be safe to run late and to skip duplicates of: they
+should read the current state rather than carry it in their arguments.
+"""
+import json
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from celery import chain, signature
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, Min, OuterRef, Q
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def _kick_relay():
+    from .tasks import relay_outbox
+    try:
+        relay_outbox.delay()
+    except Exception as exc:   # broker down: the rows stay pending for the beat run
+        logger.warning("Could not schedule the outbox relay: %s", exc)
+
+
+def publish(task, args=(), kwargs=None, *, ordering_key="", dedupe_key=None, countdown=None):
+    """
+    Record a call to `task` (a Celery task or its registered name) to run once
+    the current transaction commits. Returns the new row, or None if
+    `dedupe_key` was already used.
+    """
+    message = OutboxMessage(
+        task=getattr(task, "name", task),
+        args=list(args),
+        kwargs=kwargs or {},
+        countdown=countdown,
+        ordering_key=ordering_key,
+        dedupe_key=dedupe_key,
+    )
+    if dedupe_key:
+        try:
+            with transaction.atomic():   # a savepoint, so a duplicate doesn't abort the caller
+                message.save()
+        except IntegrityError:
+            return None
+    else:
+        message.save()
+    # a relay that finds the rows already claimed by an earlier kick just returns
+    transaction.on_commit(_kick_relay)
+    return message
+
+
+UNSENT = (OutboxMessage.PENDING, OutboxMessage.DISPATCHED)
+
+
+def _in_key_order(batch):
+    """
+    Drop keyed messages that an unsent earlier message with the same key,
+    outside this batch, has to run before (one held by a concurrent relay,
+    or one queued between them that isn't due).
+    """
+    keys = {m.ordering_key for m in batch if m.ordering_key}
+    if not keys:
+        return batch
+    blocked_from = dict(
+        OutboxMessage.objects.filter(ordering_key__in=keys, status__in=UNSENT)
+        .exclude(pk__in=[m.pk for m in batch])
+        .values("ordering_key")
+        .annotate(first=Min("id"))
+        .values_list("ordering_key", "first")
+    )
+    return [
+        m for m in batch
+        if m.ordering_key not in blocked_from or m.pk < blocked_from[m.ordering_key]
+    ]
+
+
+def _claim_batch(batch_size):
+    """Lock the next due rows and lease them so a concurrent relay skips them."""
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    waiting_ahead = OutboxMessage.objects.filter(
+        Q(status=OutboxMessage.DISPATCHED)
+        | Q(status=OutboxMessage.PENDING, next_attempt_at__gt=now),
+        ordering_key=OuterRef("ordering_key"),
+        id__lt=OuterRef("id"),
+    )
+    with transaction.atomic():
+        batch = _in_key_order(list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxMessage.PENDING, next_attempt_at__lte=now)
+            .filter(Q(ordering_key="") | ~Exists(waiting_ahead))
+            .order_by("id")[:batch_size]
+        ))
+        OutboxMessage.objects.filter(pk__in=[m.pk for m in batch]).update(
+            next_attempt_at=lease_until
+        )
+    return batch
+
+
+def requeue_stale_dispatches():
+    """
+    Retry (or fail) chain rows still dispatched after their lease: the chain
+    never reached a worker, or its worker died before the errback could run.
+    """
+    with transaction.atomic():
+        stale = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxMessage.DISPATCHED, next_attempt_at__lte=timezone.now())
+        )
+        if stale:
+            logger.warning("Outbox dispatch lease ran out for %s", [m.pk for m in stale])
+            _retry_or_fail(stale, "Dispatch lease ran out before the task ran")
+    return len(stale)
+
+
+def _call_key(message):
+    return (
+        message.task,
+        json.dumps(message.args, sort_keys=True),
+        json.dumps(message.kwargs, sort_keys=True),
+        message.countdown,
+    )
+
+
+def _group(batch):
+    """
+    Split a batch into dispatch groups: one per ordering key (in id order) and
+    one per unkeyed message. Identical calls keep their first occurrence; the
+    rest ride along and share its outcome.
+    Returns ([[(message to run, its duplicates)]], duplicate count).
+    """
+    groups, by_key, first_of = [], {}, {}
+    duplicates = 0
+    for message in batch:
+        call = _call_key(message)
+        if call in first_of:
+            first_of[call].append(message)
+            duplicates += 1
+            continue
+        group = by_key.get(message.ordering_key) if message.ordering_key else None
+        if group is None:
+            group = []
+            groups.append(group)
+            if message.ordering_key:
+                by_key[message.ordering_key] = group
+        first_of[call] = []
+        group.append((message, first_of[call]))
+    return groups, duplicates
+
+
+def _ids(entries):
+    return [m.pk for message, duplicates in entries for m in [message, *duplicates]]
+
+
+def _signature(message):
+    options = {"countdown": message.countdown} if message.countdown else {}
+    return signature(
+        message.task, args=message.args, kwargs=message.kwargs, immutable=True, **options
+    )
+
+
+def _dispatch(group):
+    """Send a group; a chain's rows are marked dispatched first (see above)."""
+    if len(group) == 1:
+        _signature(group[0][0]).apply_async()
+        return
+    steps = []
+    for entry in group:
+        steps += [
+            _signature(entry[0]),
+            signature("outbox.tasks.mark_sent", args=[_ids([entry])], immutable=True),
+        ]
+    ids = _ids(group)
+    # before sending: an eager or fast worker may mark them sent right away
+    OutboxMessage.objects.filter(pk__in=ids).update(
+        status=OutboxMessage.DISPATCHED,
+        next_attempt_at=timezone.now() + timedelta(seconds=settings.OUTBOX_DISPATCH_LEASE_SECONDS),
+    )
+    try:
+        chain(*steps).apply_async(link_error=signature("outbox.tasks.requeue_unsent", args=[ids]))
+    except Exception:
+        # the broker never took it: back to pending now, not after the lease
+        OutboxMessage.objects.filter(pk__in=ids, status=OutboxMessage.DISPATCHED).update(
+            status=OutboxMessage.PENDING
+        )
+        raise
+
+
+def _retry_or_fail(messages, exc):
+    now = timezone.now()
+    for message in messages:
+        message.attempts += 1
+        message.last_error = str(exc)[:2000]
+        if message.attempts < settings.OUTBOX_MAX_ATTEMPTS:
+            delay = min(
+                settings.OUTBOX_RETRY_BACKOFF * 2 ** (message.attempts - 1),
+                settings.OUTBOX_RETRY_BACKOFF_MAX,
+            )
+            message.status = OutboxMessage.PENDING
+            message.next_attempt_at = now + timedelta(seconds=delay)
+        else:
+            message.status = OutboxMessage.FAILED
+    OutboxMessage.objects.bulk_update(
+        messages, ["attempts", "last_error", "next_attempt_at", "status"]
+    )
+
+
+def requeue_unsent(ids, exc):
+    """Retry (or fail) the rows among `ids` that haven't been marked sent."""
+    messages = list(OutboxMessage.objects.filter(pk__in=ids).exclude(status=OutboxMessage.SENT))
+    _retry_or_fail(messages, exc)
+    return messages
+
+
+def mark_sent(ids):
+    OutboxMessage.objects.filter(pk__in=ids).update(
+        status=OutboxMessage.SENT, sent_at=timezone.now()
+    )
+
+
+def relay_batch(batch_size=None):
+    """
+    Dispatch one batch of due messages.
+    Returns {"claimed": n, "sent": n, "deduplicated": n, "retried": n, "failed": n}.
+    """
+    batch = _claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    stats = Counter(claimed=len(batch), sent=0, deduplicated=0, retried=0, failed=0)
+    if not batch:
+        return dict(stats)
+
+    groups, stats["deduplicated"] = _group(batch)
+    sent_ids = []
+    for group in groups:
+        try:
+            _dispatch(group)
+        except Exception as exc:
+            logger.warning("Outbox dispatch of %s failed: %s", [m.pk for m, _ in group], exc)
+            failed = {m.pk: m for m in requeue_unsent(_ids(group), exc)}
+            for message, _ in group:
+                if message.pk in failed:
+                    stats["failed" if failed[message.pk].status == OutboxMessage.FAILED else "retried"] += 1
+                else:
+                    stats["sent"] += 1   # ran before a later step in its chain failed
+        else:
+            if len(group) == 1:
+                sent_ids += _ids(group)
+            stats["sent"] += len(group)
+
+    mark_sent(sent_ids)
+    return dict(stats)
+
+
+def relay(batch_size=None):
+    """
+    Requeue stale dispatches, then relay batches until one comes back short.
+    Returns the summed stats.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    totals = Counter(requeued=requeue_stale_dispatches())
+    while True:
+        stats = relay_batch(batch_size)
+        totals.update(stats)
+        if stats["claimed"] < batch_size:
+            return {name: totals[name] for name in ("requeued", *stats)}
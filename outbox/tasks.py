@@ -0,0 +1,25 @@
+from celery import shared_task
+
+from . import relay as outbox
+
+
+@shared_task(bind=True, workload="interactive")
+def relay_outbox(self, batch_size=None):
+    """
+    Dispatch pending outbox messages. Kicked after every transaction that
+    publishes one, and scheduled every minute so retries with backoff (and
+    messages whose kick never reached the broker) get picked up.
+    """
+    return outbox.relay(batch_size)
+
+
+@shared_task(workload="interactive")
+def mark_sent(ids):
+    """Chain step after each outboxed task: it ran, so its rows are done."""
+    outbox.mark_sent(ids)
+
+
+@shared_task(workload="interactive")
+def requeue_unsent(request, exc, traceback, ids):
+    """Errback of an outbox chain: retry the rows whose task never ran or failed."""
+    outbox.requeue_unsent(ids, exc)
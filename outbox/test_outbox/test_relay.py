@@ -0,0 +1,245 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from outbox import relay as outbox
+from outbox import tasks
+from outbox.models import OutboxMessage
+
+calls = []
+failing = set()   # task names whose run raises
+
+
+class FakeSignature:
+    def __init__(self, task, args=(), kwargs=None, immutable=False, **options):
+        self.task, self.args = task, tuple(args)
+
+    def apply_async(self):
+        calls.append((self.task, self.args))
+
+
+def fake_chain(*signatures):
+    class Chain:
+        def apply_async(self, link_error):
+            """Run the chain as a worker would: stop at a failure and call the errback."""
+            ran = []
+            calls.append(("chain", ran))
+            for s in signatures:
+                if s.task == "outbox.tasks.mark_sent":
+                    tasks.mark_sent(*s.args)
+                    continue
+                ran.append((s.task, s.args))
+                if s.task in failing:
+                    tasks.requeue_unsent(None, RuntimeError(f"{s.task} failed"), None, *link_error.args)
+                    return
+    return Chain()
+
+
+def lost_chain(*signatures):
+    """A chain the broker accepted but no worker ever finished."""
+    class Chain:
+        def apply_async(self, link_error):
+            calls.append(("lost", [s.task for s in signatures]))
+    return Chain()
+
+
+def unpublishable_chain(*signatures):
+    class Chain:
+        def apply_async(self, link_error):
+            raise ConnectionError("broker down")
+    return Chain()
+
+
+@patch.object(outbox, "chain", fake_chain)
+@patch.object(outbox, "signature", FakeSignature)
+class OutboxRelayTest(TestCase):
+    def setUp(self):
+        calls.clear()
+        failing.clear()
+
+    def test_publish_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            outbox.publish("courses.tasks.rebuild_course_index", (1,))
+        self.assertEqual(calls, [])
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.PENDING)
+
+        with patch("outbox.tasks.relay_outbox.delay", side_effect=lambda: outbox.relay()):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(calls, [("courses.tasks.rebuild_course_index", (1,))])
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.SENT)
+
+    def test_unreachable_broker_leaves_the_message_for_the_beat_run(self):
+        with patch("outbox.tasks.relay_outbox.delay", side_effect=ConnectionError("down")):
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox.publish("courses.tasks.rebuild_course_index", (1,))
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.PENDING)
+
+    def test_dedupe_key_is_only_published_once(self):
+        first = outbox.publish("payments.tasks.send_payment_receipt", (7,), dedupe_key="receipt:7")
+        again = outbox.publish("payments.tasks.send_payment_receipt", (7,), dedupe_key="receipt:7")
+        self.assertIsNotNone(first)
+        self.assertIsNone(again)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_identical_calls_in_a_batch_are_dispatched_once(self):
+        for _ in range(3):
+            outbox.publish("courses.tasks.rebuild_course_index", (1,))
+        outbox.publish("courses.tasks.rebuild_course_index", (2,))
+
+        stats = outbox.relay()
+
+        self.assertEqual(stats["sent"], 2)
+        self.assertEqual(stats["deduplicated"], 2)
+        self.assertEqual(calls, [
+            ("courses.tasks.rebuild_course_index", (1,)),
+            ("courses.tasks.rebuild_course_index", (2,)),
+        ])
+        self.assertFalse(OutboxMessage.objects.exclude(status=OutboxMessage.SENT).exists())
+
+    def test_ordering_key_dispatches_one_chain_in_insertion_order(self):
+        outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        outbox.publish("courses.tasks.rebuild_course_index", (2,))
+        outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+
+        outbox.relay()
+
+        self.assertEqual(calls, [
+            ("chain", [
+                ("progress.tasks.recalc_course_progress", (1, 2)),
+                ("notifications.tasks.update_lesson_milestone", (1, 2)),
+            ]),
+            ("courses.tasks.rebuild_course_index", (2,)),
+        ])
+        self.assertFalse(OutboxMessage.objects.exclude(status=OutboxMessage.SENT).exists())
+
+    def test_tasks_after_a_failure_in_a_chain_are_retried(self):
+        first = outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        second = outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+        failing.add("progress.tasks.recalc_course_progress")
+
+        outbox.relay()
+
+        self.assertEqual(calls, [("chain", [("progress.tasks.recalc_course_progress", (1, 2))])])
+        for message in (first, second):
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), (OutboxMessage.PENDING, 1))
+        self.assertIn("recalc_course_progress failed", second.last_error)
+
+        # once the first task recovers, both run, in order
+        failing.clear()
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        outbox.relay()
+        self.assertEqual(calls[-1], ("chain", [
+            ("progress.tasks.recalc_course_progress", (1, 2)),
+            ("notifications.tasks.update_lesson_milestone", (1, 2)),
+        ]))
+        self.assertFalse(OutboxMessage.objects.exclude(status=OutboxMessage.SENT).exists())
+
+    def test_tasks_that_ran_before_a_failure_stay_sent(self):
+        first = outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        second = outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+        failing.add("notifications.tasks.update_lesson_milestone")
+
+        outbox.relay()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, OutboxMessage.SENT)
+        self.assertEqual((second.status, second.attempts), (OutboxMessage.PENDING, 1))
+
+    def test_batches_are_relayed_until_the_queue_is_empty(self):
+        for n in range(5):
+            outbox.publish("courses.tasks.rebuild_course_index", (n,))
+
+        stats = outbox.relay(batch_size=2)
+
+        self.assertEqual(stats["claimed"], 5)
+        self.assertEqual(len(calls), 5)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BACKOFF=10)
+    def test_failed_dispatch_is_retried_with_backoff_then_failed(self):
+        message = outbox.publish("courses.tasks.rebuild_course_index", (1,))
+        with patch.object(outbox, "_dispatch", side_effect=ConnectionError("broker down")):
+            stats = outbox.relay()
+            self.assertEqual(stats["retried"], 1)
+            message.refresh_from_db()
+            self.assertEqual(message.status, OutboxMessage.PENDING)
+            self.assertEqual(message.attempts, 1)
+            self.assertIn("broker down", message.last_error)
+            self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=5))
+
+            # not due yet
+            self.assertEqual(outbox.relay()["claimed"], 0)
+
+            OutboxMessage.objects.update(next_attempt_at=timezone.now())
+            stats = outbox.relay()
+        self.assertEqual(stats["failed"], 1)
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.FAILED)
+
+    def test_chain_the_broker_refused_goes_straight_back_to_pending(self):
+        first = outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+
+        with patch.object(outbox, "chain", unpublishable_chain):
+            stats = outbox.relay()
+
+        self.assertEqual(stats["retried"], 2)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (OutboxMessage.PENDING, 1))
+        self.assertIn("broker down", first.last_error)
+
+    @override_settings(OUTBOX_DISPATCH_LEASE_SECONDS=60)
+    def test_lost_chain_is_requeued_once_its_lease_runs_out(self):
+        outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+        with patch.object(outbox, "chain", lost_chain):
+            outbox.relay()
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list("status", flat=True)), {OutboxMessage.DISPATCHED}
+        )
+
+        self.assertEqual(outbox.relay()["requeued"], 0)   # still within the lease
+
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.relay()["requeued"], 2)
+        for message in OutboxMessage.objects.all():
+            self.assertEqual((message.status, message.attempts), (OutboxMessage.PENDING, 1))
+            self.assertIn("lease", message.last_error)
+
+    def test_key_waits_for_an_earlier_message_in_backoff(self):
+        first = outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        OutboxMessage.objects.filter(pk=first.pk).update(
+            attempts=1, next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+        outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+        outbox.publish("courses.tasks.rebuild_course_index", (2,))
+
+        outbox.relay()
+
+        self.assertEqual(calls, [("courses.tasks.rebuild_course_index", (2,))])
+        self.assertEqual(
+            OutboxMessage.objects.filter(ordering_key="progress:1:2", status=OutboxMessage.PENDING).count(), 2
+        )
+
+    def test_key_waits_for_an_earlier_message_in_flight(self):
+        with patch.object(outbox, "chain", lost_chain):
+            outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+            outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+            outbox.relay()
+        later = outbox.publish("progress.tasks.recalc_course_progress", (1, 3), ordering_key="progress:1:2")
+
+        outbox.relay()
+
+        later.refresh_from_db()
+        self.assertEqual(later.status, OutboxMessage.PENDING)
+        self.assertEqual(len(calls), 1)
+
+    def test_key_waits_for_an_earlier_message_held_by_another_relay(self):
+        outbox.publish("progress.tasks.recalc_course_progress", (1, 2), ordering_key="progress:1:2")
+        second = outbox.publish("notifications.tasks.update_lesson_milestone", (1, 2), ordering_key="progress:1:2")
+        # the first row is locked elsewhere, so the claim query only returned the second
+        self.assertEqual(outbox._in_key_order([second]), [])
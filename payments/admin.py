@@ -1,3 +1,12 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import PaystackWebhookEvent
+
+
+@admin.register(PaystackWebhookEvent)
+class PaystackWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("event", "reference", "status", "attempts", "received_at", "processed_at")
+    list_filter = ("status", "event")
+    search_fields = ("reference", "event_key")
+    readonly_fields = ("event_key", "payload", "received_at", "processed_at")
@@ -0,0 +1,59 @@
+"""
+Async variants of the single-course initialise/verify endpoints (see
+tem_backend.asyncapi). Same request and response shapes as the sync views;
+the Paystack call is awaited instead of holding a worker thread.
+"""
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+
+from courses.pricing import quote_course
+from tem_backend.asyncapi import aget_object_or_404, async_api_view
+from .gateway import async_paystack, GatewayError
+from .models import PaymentTransaction
+from .serializers import InitTransactionSerializer, VerifyTransactionSerializer
+from .services import settle_transaction
+from .views import GATEWAY_UNAVAILABLE
+
+
+@async_api_view(["POST"])
+async def initialize_transaction(request):
+    serializer = InitTransactionSerializer(data=request.data)
+    await sync_to_async(serializer.is_valid)(raise_exception=True)
+    course = serializer.course
+    amount_kobo = (await sync_to_async(quote_course)(course.id)).amount_kobo
+
+    reference = uuid.uuid4().hex
+    await PaymentTransaction.objects.acreate(
+        user=request.user, course=course, amount=amount_kobo, reference=reference,
+    )
+    try:
+        init_response = await async_paystack.initialize_transaction(
+            amount=amount_kobo,
+            email=request.user.email,
+            reference=reference,
+            callback_url=settings.PAYSTACK_CALLBACK_URL,
+        )
+    except GatewayError:
+        return JsonResponse(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+    auth_url = (init_response.get("data") or {}).get("authorization_url")
+    return JsonResponse({"authorization_url": auth_url, "reference": reference})
+
+
+@async_api_view(["POST"])
+async def verify_transaction(request):
+    serializer = VerifyTransactionSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ref = serializer.validated_data["reference"]
+    await aget_object_or_404(PaymentTransaction.objects.all(), reference=ref)
+    try:
+        verify_resp = await async_paystack.verify_transaction(ref)
+    except GatewayError:
+        return JsonResponse(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+    data = verify_resp.get("data") or {}
+    # select_for_update needs a transaction, which the async ORM can't hold open
+    trx = await sync_to_async(settle_transaction)(ref, succeeded=data.get("status") == "success")
+    return JsonResponse({"status": trx.status})
@@ -0,0 +1,205 @@
+"""
+Paystack gateway client.
+
+Replaces the `paystackapi` SDK, which opened a fresh connection per call and
+had no timeout. One `PaystackClient` per process keeps a pooled keep-alive
+session, applies tight connect/read timeouts, retries idempotent (GET) calls
+on connection errors and 5xx, and trips a circuit breaker when the gateway
+keeps failing so requests fail fast instead of pinning workers.
+
+`AsyncPaystackClient` exposes the same calls as coroutines for ASGI views.
+The module-level clients are built on first use, so importing the views or
+tasks neither reads the gateway settings nor opens anything.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class GatewayError(Exception):
+    """The gateway answered, but not with something we can use."""
+
+
+class GatewayUnavailable(GatewayError):
+    """The gateway could not be reached, timed out, or the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    closed → (N consecutive failures) → open → (reset_timeout) → half-open
+    A half-open breaker lets one trial call through and keeps failing the rest
+    fast; success closes it, failure re-opens it. A trial that never reports
+    back frees the slot for another after reset_timeout.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None and (
+                time.monotonic() - self._opened_at < self.reset_timeout
+            )
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                raise GatewayUnavailable("Paystack circuit is open")
+            self._opened_at = now   # this call is the trial; re-arm for everyone else
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class PaystackClient:
+    def __init__(
+        self,
+        secret_key,
+        base_url="https://api.paystack.co",
+        timeout=(3.05, 10),
+        max_retries=2,
+        pool_size=20,
+        backoff_factor=0.3,
+        breaker=None,
+    ):
+        self.secret_key = secret_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.backoff_factor = backoff_factor
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            secret_key=settings.PAYSTACK_SECRET_KEY,
+            base_url=settings.PAYSTACK_BASE_URL,
+            timeout=(settings.PAYSTACK_CONNECT_TIMEOUT, settings.PAYSTACK_READ_TIMEOUT),
+            max_retries=settings.PAYSTACK_MAX_RETRIES,
+            pool_size=settings.PAYSTACK_POOL_SIZE,
+            breaker=CircuitBreaker(
+                settings.PAYSTACK_CIRCUIT_FAILURES, settings.PAYSTACK_CIRCUIT_RESET
+            ),
+        )
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        session = requests.Session()
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),  # never replay a POST
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Authorization": f"Bearer {self.secret_key}",
+            "Content-Type": "application/json",
+        })
+        return session
+
+    def _request(self, method, path, **kwargs):
+        self.breaker.before_call()
+        try:
+            resp = self.session.request(
+                method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs
+            )
+        except requests.RequestException as exc:
+            self.breaker.record_failure()
+            raise GatewayUnavailable(str(exc)) from exc
+
+        if resp.status_code >= 500:
+            self.breaker.record_failure()
+            raise GatewayUnavailable(f"Paystack returned {resp.status_code}")
+        self.breaker.record_success()
+
+        try:
+            return resp.json()
+        except ValueError as exc:
+            raise GatewayError(f"Paystack returned a non-JSON {resp.status_code}") from exc
+
+    # ─── API calls (return Paystack's JSON envelope: {"status", "message", "data"}) ───
+
+    def initialize_transaction(self, *, amount, email, reference, callback_url=None, **extra):
+        payload = {"amount": amount, "email": email, "reference": reference, **extra}
+        if callback_url:
+            payload["callback_url"] = callback_url
+        return self._request("POST", "/transaction/initialize", json=payload)
+
+    def verify_transaction(self, reference):
+        return self._request("GET", f"/transaction/verify/{quote(str(reference), safe='')}")
+
+    def list_transactions(self, **params):
+        return self._request("GET", "/transaction", params=params)
+
+
+class AsyncPaystackClient:
+    """
+    Awaitable facade over a PaystackClient. Calls run on a thread pool of
+    their own, as wide as the client's connection pool, so ASGI views don't
+    block the event loop, still share the pooled session and circuit
+    breaker, and aren't capped by the loop's small default executor.
+
+    That pool is also the limit: at most `max_workers` gateway calls are in
+    flight per process, and the rest queue for a thread. Lifting it needs a
+    native async HTTP client (httpx.AsyncClient), which isn't a dependency.
+    """
+    def __init__(self, client, max_workers=None):
+        self.client = client
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or client.pool_size, thread_name_prefix="paystack"
+        )
+
+    def _offload(self, func):
+        return sync_to_async(func, thread_sensitive=False, executor=self.executor)
+
+    async def initialize_transaction(self, **kwargs):
+        return await self._offload(self.client.initialize_transaction)(**kwargs)
+
+    async def verify_transaction(self, reference):
+        return await self._offload(self.client.verify_transaction)(reference)
+
+    async def list_transactions(self, **params):
+        return await self._offload(self.client.list_transactions)(**params)
+
+
+paystack = SimpleLazyObject(PaystackClient.from_settings)
+async_paystack = SimpleLazyObject(lambda: AsyncPaystackClient(paystack))
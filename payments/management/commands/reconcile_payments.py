@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from payments.reconcile import reconcile_pending
+
+
+class Command(BaseCommand):
+    help = "Settle stale pending payments against Paystack and report the outcome."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **opts):
+        report = reconcile_pending(chunk_size=opts["chunk_size"])
+        for kind, stats in report.items():
+            self.stdout.write(
+                f"{kind}: checked {stats['checked']}, recovered {stats['recovered']}, "
+                f"failed {stats['failed']}, expired {stats['expired']}, "
+                f"unresolved {stats['unresolved']}"
+            )
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from payments.models import PaystackWebhookEvent
+from payments.services import apply_webhook_event, mark_webhook_event_failed
+from payments.tasks import process_webhook_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-apply stored Paystack webhook events. By default replays failed "
+        "events and pending ones older than --stale-minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--id", type=int, action="append", dest="ids",
+                            help="Replay these event ids (any status). Repeatable.")
+        parser.add_argument("--reference", help="Replay every event for this reference.")
+        parser.add_argument("--stale-minutes", type=int, default=15,
+                            help="Pending events older than this are treated as stuck.")
+        parser.add_argument("--sync", action="store_true",
+                            help="Apply in this process instead of queueing to Celery.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        qs = PaystackWebhookEvent.objects.all()
+        if opts["ids"]:
+            qs = qs.filter(pk__in=opts["ids"])
+        elif opts["reference"]:
+            qs = qs.filter(reference=opts["reference"])
+        else:
+            stale = timezone.now() - timedelta(minutes=opts["stale_minutes"])
+            qs = qs.filter(status=PaystackWebhookEvent.FAILED) | qs.filter(
+                status=PaystackWebhookEvent.PENDING, received_at__lt=stale
+            )
+
+        ids = list(qs.order_by("received_at", "id").values_list("pk", flat=True))
+        if opts["dry_run"]:
+            self.stdout.write(f"{len(ids)} event(s) would be replayed")
+            return
+
+        # processed events are replayed from scratch; settlement stays idempotent
+        PaystackWebhookEvent.objects.filter(pk__in=ids).update(
+            status=PaystackWebhookEvent.PENDING
+        )
+        failed = 0
+        for event_id in ids:
+            if not opts["sync"]:
+                process_webhook_event.delay(event_id)
+                continue
+            try:
+                apply_webhook_event(event_id)
+            except Exception as exc:
+                mark_webhook_event_failed(event_id, exc)
+                failed += 1
+                self.stderr.write(f"event {event_id}: {exc}")
+
+        verb = "applied" if opts["sync"] else "queued"
+        self.stdout.write(self.style.SUCCESS(f"{len(ids) - failed} event(s) {verb}, {failed} failed"))
@@ -51,6 +51,19 @@ class PaymentTransaction(models.Model):
         return f"{self.user.email} → {self.course.title} @ {self.reference}"
 
 
+class EnrollmentQuerySet(models.QuerySet):
+    def active(self, now=None):
+        """
+        Enrollments that grant access right now. `is_active` is flipped by
+        deactivate_expired_enrollments; the expiry check covers the gap
+        until that job next runs.
+        """
+        now = now or timezone.now()
+        return self.filter(is_active=True).filter(
+            models.Q(access_expires__isnull=True) | models.Q(access_expires__gt=now)
+        )
+
+
 class Enrollment(models.Model):
     user       = models.ForeignKey(settings.AUTH_USER_MODEL,
                                    on_delete=models.CASCADE,
@@ -62,23 +75,110 @@ class Enrollment(models.Model):
 
     # NEW —
     access_expires = models.DateTimeField(
-        null=True, blank=True,
+        null=True, blank=True, db_index=True,
         help_text="Null = lifetime. Otherwise access ends at this timestamp."
     )
+    # False once access_expires has passed (see payments.tasks)
+    is_active      = models.BooleanField(default=True)
 
-    @property
-    def is_active(self) -> bool:
-        """
-        True  → lifetime OR not-yet-expired
-        False → expired (and time-limited)
-        """
-        return (
-            self.access_expires is None
-            or self.access_expires > timezone.now()
+    objects = EnrollmentQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_expires = instance.__dict__.get("access_expires")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # derive the flag when expiry is first set or changed, and leave an
+        # explicit is_active alone on every other save
+        expiry_changed = "access_expires" in self.__dict__ and (   # deferred = untouched
+            self.access_expires != getattr(self, "_loaded_expires", None)
         )
+        if self._state.adding or expiry_changed:
+            self.is_active = (
+                self.access_expires is None
+                or self.access_expires > timezone.now()
+            )
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "access_expires" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "is_active"}
+        super().save(*args, **kwargs)
+        self._loaded_expires = self.access_expires
 
     class Meta:
         unique_together = ("user", "course")
 
     def __str__(self):
         return f"{self.user.email} enrolled in {self.course.title}"
+
+
+class Order(models.Model):
+    """
+    A cart of courses paid for with one gateway transaction.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("success", "Success"),
+        ("failed",  "Failed"),
+    ]
+
+    user       = models.ForeignKey(settings.AUTH_USER_MODEL,
+                                   on_delete=models.CASCADE,
+                                   related_name="orders")
+    reference  = models.CharField(max_length=255, unique=True)
+    amount     = models.PositiveIntegerField(help_text="Total in kobo")
+    status     = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    paid_at    = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.email} order [{self.reference}] → ₦{self.amount/100:.2f}"
+
+
+class OrderItem(models.Model):
+    order      = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    course     = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="order_items")
+    list_price = models.DecimalField(max_digits=8, decimal_places=2)
+    amount     = models.PositiveIntegerField(help_text="Charged in kobo, after promotions")
+
+    class Meta:
+        unique_together = ("order", "course")
+
+    def __str__(self):
+        return f"{self.course.title} in order {self.order.reference}"
+
+
+class PaystackWebhookEvent(models.Model):
+    """
+    Raw Paystack webhook, persisted before any processing so the endpoint can
+    answer 200 at once. `event_key` makes redeliveries of the same event no-ops.
+    """
+    PENDING, PROCESSED, FAILED = "pending", "processed", "failed"
+    STATUS_CHOICES = [
+        (PENDING,   "Pending"),
+        (PROCESSED, "Processed"),
+        (FAILED,    "Failed"),
+    ]
+
+    event_key    = models.CharField(max_length=255, unique=True)
+    event        = models.CharField(max_length=100)
+    reference    = models.CharField(max_length=255, blank=True, db_index=True)
+    payload      = models.JSONField()
+    status       = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts     = models.PositiveSmallIntegerField(default=0)
+    last_error   = models.TextField(blank=True)
+    received_at  = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "received_at"])]
+
+    def __str__(self):
+        return f"{self.event} [{self.reference}] → {self.status}"
+
+    @staticmethod
+    def key_for(payload):
+        data = payload.get("data") or {}
+        ident = data.get("id") or data.get("reference")
+        return f"{payload.get('event')}:{ident}"
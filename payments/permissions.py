@@ -26,7 +26,8 @@ class IsEnrolled(permissions.BasePermission):
             course = obj.package.course
         else:
             return False
+        if course.instructor_id == user.id:
+            return True
 
-        # ―― 3) Fetch the enrollment and check *is_active* ――――――――――――――――――
-        enrollment = Enrollment.objects.filter(user=user, course=course).first()
-        return bool(enrollment and enrollment.is_active)
+        # ―― 3) One EXISTS query: enrolled, active and not expired ――――――――――
+        return Enrollment.objects.active().filter(user_id=user.pk, course=course).exists()
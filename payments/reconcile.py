@@ -0,0 +1,165 @@
+"""
+Settles payments nobody came back for.
+
+A transaction stays `pending` if the buyer never returns to `verify/` and the
+webhook is lost. `reconcile_pending()` walks stale pending rows in chunks,
+asks Paystack for their status in bulk (the list API, one window per chunk,
+pages fetched concurrently), falls back to per-reference verify for anything
+the listing didn't cover, and settles each row through the same locked path
+as verify and the webhook worker.
+"""
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .gateway import paystack, GatewayError
+from .models import PaymentTransaction, BulkPaymentTransaction, Order
+from .services import settle_transaction, settle_bulk_transaction, settle_order
+
+logger = logging.getLogger(__name__)
+
+# Paystack status → succeeded?
+GATEWAY_OUTCOMES = {"success": True, "failed": False, "reversed": False}
+# still moving on Paystack's side; never expired by us
+GATEWAY_IN_FLIGHT = {"ongoing", "pending", "processing", "queued"}
+
+# slack around a chunk's created_at range when listing gateway transactions
+WINDOW_SLACK = timedelta(minutes=10)
+
+
+def _stale_chunks(model, cutoff, chunk_size):
+    """Keyset-paginate pending rows created before `cutoff`."""
+    qs = model.objects.filter(status="pending", created_at__lt=cutoff).order_by("pk")
+    last_pk = 0
+    while True:
+        rows = list(
+            qs.filter(pk__gt=last_pk).values_list("pk", "reference", "created_at")[:chunk_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def _statuses(response):
+    return {
+        tx["reference"]: tx.get("status")
+        for tx in (response.get("data") or [])
+        if tx.get("reference")
+    }
+
+
+def _list_window(client, executor, start, end):
+    """reference → status for every gateway transaction created in [start, end]."""
+    params = {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "perPage": settings.PAYSTACK_RECONCILE_PAGE_SIZE,
+    }
+    first = client.list_transactions(page=1, **params)
+    found = _statuses(first)
+    page_count = (first.get("meta") or {}).get("pageCount") or 1
+    pages = executor.map(
+        lambda page: client.list_transactions(page=page, **params), range(2, page_count + 1)
+    )
+    for response in pages:
+        found.update(_statuses(response))
+    return found
+
+
+def _verify_each(client, executor, references):
+    def verify(reference):
+        try:
+            data = client.verify_transaction(reference).get("data") or {}
+        except GatewayError as exc:
+            logger.warning("Reconcile: verify %s failed: %s", reference, exc)
+            return reference, None, False
+        return reference, data.get("status"), True
+
+    # references the gateway couldn't answer for are left out
+    return {ref: status for ref, status, ok in executor.map(verify, references) if ok}
+
+
+def _gateway_statuses(client, executor, rows):
+    references = [ref for _, ref, _ in rows]
+    created = [at for _, _, at in rows]
+    try:
+        found = _list_window(
+            client, executor, min(created) - WINDOW_SLACK, max(created) + WINDOW_SLACK
+        )
+    except GatewayError as exc:
+        logger.warning("Reconcile: listing failed, verifying one by one: %s", exc)
+        found = {}
+
+    statuses = {ref: found[ref] for ref in references if ref in found}
+    missing = [ref for ref in references if ref not in statuses]
+    if missing:
+        statuses.update(_verify_each(client, executor, missing))
+    return statuses
+
+
+def reconcile_model(model, settle, client=None, executor=None, chunk_size=None):
+    """
+    Reconcile stale pending rows of one transaction model.
+    Returns a Counter of checked / recovered / failed / expired / unresolved.
+    """
+    client = client or paystack
+    chunk_size = chunk_size or settings.PAYSTACK_RECONCILE_CHUNK_SIZE
+    now = timezone.now()
+    cutoff = now - timedelta(minutes=settings.PAYSTACK_RECONCILE_AFTER_MINUTES)
+    abandon_before = now - timedelta(hours=settings.PAYSTACK_RECONCILE_ABANDON_AFTER_HOURS)
+    stats = Counter(checked=0, recovered=0, failed=0, expired=0, unresolved=0)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=settings.PAYSTACK_RECONCILE_CONCURRENCY)
+    try:
+        for rows in _stale_chunks(model, cutoff, chunk_size):
+            statuses = _gateway_statuses(client, executor, rows)
+            for _, reference, created_at in rows:
+                stats["checked"] += 1
+                if reference not in statuses:
+                    stats["unresolved"] += 1
+                    continue
+                gateway_status = statuses.get(reference)
+                succeeded = GATEWAY_OUTCOMES.get(gateway_status)
+                if succeeded is None:
+                    # abandoned or unknown to the gateway for long enough → give up
+                    if created_at < abandon_before and gateway_status not in GATEWAY_IN_FLIGHT:
+                        settle(reference, succeeded=False)
+                        stats["expired"] += 1
+                    else:
+                        stats["unresolved"] += 1
+                    continue
+                trx = settle(reference, succeeded=succeeded)
+                if trx is not None and trx.status == "success":
+                    stats["recovered"] += 1
+                else:
+                    stats["failed"] += 1
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return stats
+
+
+def reconcile_pending(client=None, chunk_size=None):
+    """
+    Reconcile single-course, team and cart purchases.
+    Returns {"payments": {...}, "bulk_payments": {...}, "orders": {...}}.
+    """
+    with ThreadPoolExecutor(max_workers=settings.PAYSTACK_RECONCILE_CONCURRENCY) as executor:
+        return {
+            "payments": dict(reconcile_model(
+                PaymentTransaction, settle_transaction, client, executor, chunk_size
+            )),
+            "bulk_payments": dict(reconcile_model(
+                BulkPaymentTransaction, settle_bulk_transaction, client, executor, chunk_size
+            )),
+            "orders": dict(reconcile_model(
+                Order, settle_order, client, executor, chunk_size
+            )),
+        }
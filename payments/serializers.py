@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from courses.models import Course
+from .models import Enrollment
 
 class InitTransactionSerializer(serializers.Serializer):
     course_id = serializers.IntegerField()
@@ -21,4 +22,28 @@ class InitTeamTransactionSerializer(serializers.Serializer):
     courses      = serializers.ListField(child=serializers.IntegerField())
 
 class VerifyTeamTransactionSerializer(serializers.Serializer):
-    reference = serializers.CharField()
\ No newline at end of file
+    reference = serializers.CharField()
+
+
+class InitOrderSerializer(serializers.Serializer):
+    courses = serializers.ListField(child=serializers.IntegerField(), min_length=1)
+
+    def validate_courses(self, value):
+        ids = list(dict.fromkeys(value))   # de-duplicate, keep cart order
+        found = set(Course.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            raise serializers.ValidationError(f"Course(s) not found: {missing}")
+
+        user = self.context["request"].user
+        owned = set(
+            Enrollment.objects.active()
+            .filter(user=user, course_id__in=ids)
+            .values_list("course_id", flat=True)
+        )
+        if owned:
+            raise serializers.ValidationError(f"Already enrolled in: {sorted(owned)}")
+        return ids
+
+class VerifyOrderSerializer(serializers.Serializer):
+    reference = serializers.CharField()
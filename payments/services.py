@@ -1,18 +1,27 @@
 import uuid
-from paystackapi.paystack import Paystack
+from datetime import timedelta
+
 from django.conf import settings
-from .models import BulkPaymentTransaction
-from courses.models import Course
+from django.db import transaction
+from django.utils import timezone
 
-paystack = Paystack(secret_key=settings.PAYSTACK_SECRET_KEY)
+from .models import (
+    BulkPaymentTransaction, PaymentTransaction, Enrollment, PaystackWebhookEvent,
+    Order, OrderItem,
+)
+from courses.pricing import quote_courses
+from notifications.models import Notification
+from notifications.services import bulk_notify
+from progress.entitlements import invalidate_entitlements
+from .gateway import paystack
 
 def process_team_checkout(data: dict, user) -> str:
     org_id = data["organization"]
     seats  = int(data["seats"])
     course_ids = data["courses"]
-    courses = Course.objects.filter(id__in=course_ids)
-    # compute total in kobo
-    total = sum(int(c.price * 100) * seats for c in courses)
+    quotes = quote_courses(course_ids)
+    # compute total in kobo (today's promotions applied)
+    total = sum(q.amount_kobo * seats for q in quotes.values())
 
     reference = uuid.uuid4().hex
     trx = BulkPaymentTransaction.objects.create(
@@ -22,13 +31,218 @@ def process_team_checkout(data: dict, user) -> str:
         reference=reference,
         amount=total,
     )
-    trx.courses.set(courses)
+    trx.courses.set(list(quotes))
 
     # initialize Paystack
-    init = paystack.transaction.initialize(
+    init = paystack.initialize_transaction(
         amount=total,
         email=user.email,
         reference=reference,
         callback_url=settings.PAYSTACK_CALLBACK_URL,
     )
     return reference
+
+
+def create_order(user, course_ids):
+    """
+    Create a pending Order for a cart and open one Paystack transaction for
+    all of it. Returns (order, authorization_url); a free cart is settled on
+    the spot and has no authorization_url.
+    """
+    quotes = quote_courses(course_ids)
+    reference = uuid.uuid4().hex
+    with transaction.atomic():
+        order = Order.objects.create(
+            user=user,
+            reference=reference,
+            amount=sum(q.amount_kobo for q in quotes.values()),
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, course_id=q.course_id, list_price=q.list_price, amount=q.amount_kobo)
+            for q in quotes.values()
+        ])
+
+    if order.amount == 0:
+        return settle_order(reference, succeeded=True), None
+
+    init = paystack.initialize_transaction(
+        amount=order.amount,
+        email=user.email,
+        reference=reference,
+        callback_url=settings.PAYSTACK_CALLBACK_URL,
+        metadata={"order_id": order.id},
+    )
+    return order, (init.get("data") or {}).get("authorization_url")
+
+
+# ─── Settlement ───────────────────────────────────────────────────────
+# Verify, the webhook worker and the reconciler can all see the same charge.
+# Every path locks the transaction row and only acts on a pending one, so the
+# charge is settled exactly once whichever arrives first.
+
+def access_expiry_for(course, start=None):
+    """None → lifetime access."""
+    days = course.default_access_days
+    return (start or timezone.now()) + timedelta(days=days) if days else None
+
+
+def settle_transaction(reference, succeeded):
+    """
+    Mark a single-course transaction success/failed and enroll on success.
+    Returns the transaction, or None if the reference is unknown.
+    """
+    with transaction.atomic():
+        trx = (
+            PaymentTransaction.objects.select_for_update()
+            .select_related("course")
+            .filter(reference=reference)
+            .first()
+        )
+        if trx is None or trx.status != "pending":
+            return trx
+
+        if succeeded:
+            trx.status = "success"
+            trx.paid_at = timezone.now()
+            Enrollment.objects.get_or_create(
+                user_id=trx.user_id,
+                course=trx.course,
+                defaults={"access_expires": access_expiry_for(trx.course)},
+            )
+        else:
+            trx.status = "failed"
+        trx.save()
+        return trx
+
+
+def settle_bulk_transaction(reference, succeeded):
+    """
+    Same as settle_transaction for team purchases; seat provisioning and the
+    receipt follow from the status change (payments.signals).
+    """
+    with transaction.atomic():
+        trx = (
+            BulkPaymentTransaction.objects.select_for_update()
+            .filter(reference=reference)
+            .first()
+        )
+        if trx is None or trx.status != "pending":
+            return trx
+
+        trx.status = "success" if succeeded else "failed"
+        if succeeded:
+            trx.paid_at = timezone.now()
+        trx.save()
+        return trx
+
+
+def _enroll_order(order):
+    """
+    Enroll the buyer in every line of the order with one bulk INSERT and one
+    batch of notifications. Lapsed enrollments are renewed; live ones are left.
+    """
+    courses = [item.course for item in order.items.select_related("course")]
+    now = timezone.now()
+    existing = Enrollment.objects.filter(
+        user_id=order.user_id, course__in=courses
+    ).values_list("course_id", "is_active", "access_expires")
+    owned, lapsed = set(), set()
+    for course_id, is_active, expires in existing:
+        owned.add(course_id)
+        if not is_active or (expires is not None and expires <= now):
+            lapsed.add(course_id)
+
+    for course in courses:
+        if course.id in lapsed:
+            Enrollment.objects.filter(user_id=order.user_id, course=course).update(
+                access_expires=access_expiry_for(course, now), is_active=True
+            )
+
+    new = [course for course in courses if course.id not in owned]
+    Enrollment.objects.bulk_create(
+        [
+            Enrollment(
+                user_id=order.user_id,
+                course=course,
+                access_expires=access_expiry_for(course, now),
+                is_active=True,
+            )
+            for course in new
+        ],
+        ignore_conflicts=True,
+    )
+    # bulk writes skip the post_save receivers that drop the dashboard cache
+    transaction.on_commit(lambda: invalidate_entitlements(order.user_id))
+    granted = [course for course in courses if course.id in lapsed] + new
+    if granted:
+        bulk_notify([
+            Notification(recipient_id=order.user_id, verb=f"You’re now enrolled in “{course.title}”")
+            for course in granted
+        ])
+    return granted
+
+
+def settle_order(reference, succeeded):
+    """
+    Mark an order success/failed and enroll every line on success.
+    Returns the order, or None if the reference is unknown.
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().filter(reference=reference).first()
+        if order is None or order.status != "pending":
+            return order
+
+        if succeeded:
+            order.status = "success"
+            order.paid_at = timezone.now()
+            _enroll_order(order)
+        else:
+            order.status = "failed"
+        order.save()
+        return order
+
+
+def record_webhook_event(payload):
+    """
+    Persist a verified webhook payload. Returns (event, created); a redelivered
+    event comes back with created=False.
+    """
+    data = payload.get("data") or {}
+    return PaystackWebhookEvent.objects.get_or_create(
+        event_key=PaystackWebhookEvent.key_for(payload),
+        defaults={
+            "event": payload.get("event", ""),
+            "reference": data.get("reference") or "",
+            "payload": payload,
+        },
+    )
+
+
+def apply_webhook_event(event_id):
+    """
+    Apply one stored webhook event. Idempotent: a processed event is skipped,
+    and settlement itself only ever moves a pending transaction.
+    Returns True if this call processed the event.
+    """
+    with transaction.atomic():
+        ev = PaystackWebhookEvent.objects.select_for_update().get(pk=event_id)
+        if ev.status == PaystackWebhookEvent.PROCESSED:
+            return False
+
+        if ev.event == "charge.success" and ev.reference:
+            for settle in (settle_transaction, settle_bulk_transaction, settle_order):
+                if settle(ev.reference, succeeded=True) is not None:
+                    break
+
+        ev.status = PaystackWebhookEvent.PROCESSED
+        ev.processed_at = timezone.now()
+        ev.attempts += 1
+        ev.last_error = ""
+        ev.save(update_fields=["status", "processed_at", "attempts", "last_error"])
+        return True
+
+
+def mark_webhook_event_failed(event_id, exc):
+    PaystackWebhookEvent.objects.filter(pk=event_id).update(
+        status=PaystackWebhookEvent.FAILED, last_error=str(exc)[:2000]
+    )
@@ -1,18 +1,25 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from .models import PaymentTransaction, BulkPaymentTransaction
-from .tasks import send_payment_receipt, send_bulk_receipt, provision_team_seats
+from .models import PaymentTransaction, BulkPaymentTransaction, Order
+from .tasks import send_payment_receipt, send_bulk_receipt, provision_team_seats, send_order_receipt
+from outbox.relay import publish
 
 @receiver(post_save, sender=PaymentTransaction)
 def on_payment_success(sender, instance, created, **kwargs):
-    # only when status flips to “success”
+    # only when status flips to “success”; later saves reuse the dedupe key
     if not created and instance.status == "success":
-        send_payment_receipt.delay(instance.id)
+        publish(send_payment_receipt, (instance.id,), dedupe_key=f"payment-receipt:{instance.id}")
 
 
 
 @receiver(post_save, sender=BulkPaymentTransaction)
 def on_bulk_payment(sender, instance, created, **kwargs):
     if not created and instance.status == "success":
-        send_bulk_receipt.delay(instance.id)
-        provision_team_seats.delay(instance.id)
\ No newline at end of file
+        publish(send_bulk_receipt, (instance.id,), dedupe_key=f"bulk-receipt:{instance.id}")
+        publish(provision_team_seats, (instance.id,), dedupe_key=f"provision-seats:{instance.id}")
+
+
+@receiver(post_save, sender=Order)
+def on_order_paid(sender, instance, created, **kwargs):
+    if not created and instance.status == "success":
+        publish(send_order_receipt, (instance.id,), dedupe_key=f"order-receipt:{instance.id}")
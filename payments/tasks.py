@@ -1,35 +1,54 @@
 from celery import shared_task
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import PaymentTransaction, BulkPaymentTransaction, Enrollment
+from .models import PaymentTransaction, BulkPaymentTransaction, Enrollment, Order
 from teams.models import TeamMember
 from django.utils import timezone
 from datetime import timedelta
+from itertools import islice
+from django.conf import settings
 from notifications.models import Notification
+from notifications.services import bulk_notify
+from notifications.mail import enqueue_email
+from progress.entitlements import invalidate_entitlements
+from .services import apply_webhook_event, mark_webhook_event_failed
+from .reconcile import reconcile_pending
+
+@shared_task(bind=True, workload="critical", max_retries=5)
+def process_webhook_event(self, event_id):
+    """
+    Apply a stored Paystack webhook. Safe to run more than once for the same
+    event; failures are recorded on the row and retried with backoff, after
+    which `manage.py replay_webhook_events` can pick them up.
+    """
+    try:
+        return apply_webhook_event(event_id)
+    except Exception as exc:
+        mark_webhook_event_failed(event_id, exc)
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries * 30)
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True)
+@shared_task(bind=True, workload="critical", autoretry_for=(Exception,), retry_backoff=True)
 def send_payment_receipt(self, transaction_id):
     trx = PaymentTransaction.objects.get(pk=transaction_id)
-    send_mail(
-        subject=f"Your payment for {trx.course.title} succeeded",
-        message=(
+    enqueue_email(
+        trx.user.email,
+        f"Your payment for {trx.course.title} succeeded",
+        (
             f"Hi {trx.user.username},\n\n"
             f"Thanks for your payment of ₦{trx.amount/100:.2f} for “{trx.course.title}”.\n"
             f"Reference: {trx.reference}\n\n"
             "Happy learning!\n"
         ),
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[trx.user.email],
+        dedupe_key=f"payment-receipt:{trx.reference}",
     )
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True)
+@shared_task(bind=True, workload="critical", autoretry_for=(Exception,), retry_backoff=True)
 def send_bulk_receipt(self, transaction_id):
     trx = BulkPaymentTransaction.objects.get(pk=transaction_id)
     admin_email = trx.organization.admin.email
     total_amount = trx.amount / 100
-    send_mail(
-        subject=f"Bulk purchase confirmed for {trx.organization.name}",
-        message=(
+    enqueue_email(
+        admin_email,
+        f"Bulk purchase confirmed for {trx.organization.name}",
+        (
             f"Hi {trx.organization.admin.username},\n\n"
             f"Your bulk purchase of {trx.seats} seats for "
             f"{', '.join(c.title for c in trx.courses.all())} has succeeded.\n"
@@ -37,11 +56,27 @@ def send_bulk_receipt(self, transaction_id):
             f"Reference: {trx.reference}\n\n"
             "Invitations have been provisioned for your team members.\n"
         ),
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[admin_email],
+        dedupe_key=f"bulk-receipt:{trx.reference}",
+    )
+
+@shared_task(bind=True, workload="critical", autoretry_for=(Exception,), retry_backoff=True)
+def send_order_receipt(self, order_id):
+    order = Order.objects.select_related("user").get(pk=order_id)
+    lines = order.items.select_related("course")
+    enqueue_email(
+        order.user.email,
+        f"Your order of {len(lines)} course(s) succeeded",
+        (
+            f"Hi {order.user.first_name},\n\n"
+            f"Thanks for your payment of ₦{order.amount/100:.2f}. You're now enrolled in:\n"
+            + "".join(f"  • {item.course.title}\n" for item in lines)
+            + f"\nReference: {order.reference}\n\n"
+            "Happy learning!\n"
+        ),
+        dedupe_key=f"order-receipt:{order.reference}",
     )
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True)
+@shared_task(bind=True, workload="critical", autoretry_for=(Exception,), retry_backoff=True)
 def provision_team_seats(self, transaction_id):
     trx = BulkPaymentTransaction.objects.get(pk=transaction_id)
     # find all active team members
@@ -56,23 +91,58 @@ def provision_team_seats(self, transaction_id):
                 course=course
             )
 
-@shared_task
+@shared_task(workload="bulk")
 def send_expiry_reminders():
-    tomorrow = timezone.now() + timedelta(days=1)
-    qs = Enrollment.objects.filter(
-        access_expires__date = tomorrow.date()
-    )
-    for en in qs:
-        Notification.objects.create(
-            recipient=en.user,
-            verb=f"Your access to “{en.course.title}” expires tomorrow."
+    """
+    Remind users whose access ends tomorrow (local day). Range query on the
+    indexed access_expires; notifications are inserted one chunk at a time.
+    """
+    start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    start += timedelta(days=1)
+    rows = (
+        Enrollment.objects.filter(
+            is_active=True,
+            access_expires__gte=start,
+            access_expires__lt=start + timedelta(days=1),
         )
-        # optionally email …
+        .order_by("pk")
+        .values_list("user_id", "course__title")
+        .iterator(chunk_size=settings.NOTIFICATION_FANOUT_CHUNK_SIZE)
+    )
+    sent = 0
+    while True:
+        chunk = list(islice(rows, settings.NOTIFICATION_FANOUT_CHUNK_SIZE))
+        if not chunk:
+            return sent
+        bulk_notify([
+            Notification(
+                recipient_id=user_id,
+                verb=f"Your access to “{title}” expires tomorrow.",
+            )
+            for user_id, title in chunk
+        ])
+        sent += len(chunk)
 
-@shared_task
+@shared_task(workload="bulk")
 def deactivate_expired_enrollments():
-    now = timezone.now()
-    Enrollment.objects.filter(
-        access_expires__lt = now,
-        access_expires__isnull = False
-    ).update()  # nothing to change—`is_active` is property-based
\ No newline at end of file
+    """
+    Flip is_active off for every enrollment past its expiry, in one UPDATE,
+    and drop the affected users' cached entitlements.
+    """
+    expired = Enrollment.objects.filter(is_active=True, access_expires__lte=timezone.now())
+    user_ids = set(expired.values_list("user_id", flat=True))
+    changed = expired.update(is_active=False)
+    for user_id in user_ids:
+        invalidate_entitlements(user_id)
+    return changed
+
+
+@shared_task(bind=True, workload="bulk")
+def reconcile_pending_payments(self):
+    """
+    Settle stale pending transactions against Paystack. Scheduled every 15 min.
+    A paged sweep with a gateway call per payment, so it runs as bulk: the
+    critical limits would cut a large backlog short, and it would hold a
+    receipts worker while it ran.
+    """
+    return reconcile_pending()
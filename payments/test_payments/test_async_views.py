@@ -0,0 +1,73 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from courses.models import Course
+from payments.gateway import GatewayError, PaystackClient
+from payments.models import Enrollment, PaymentTransaction
+
+User = get_user_model()
+
+
+class AsyncPaymentViewsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="async@test.com", password="pass")
+        self.course = Course.objects.create(
+            title="Ct", description="Desc", price=Decimal("10.00"), instructor=self.user
+        )
+        self.auth = {"authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    def post(self, name, body, auth=True):
+        # constructor headers are ignored by 4.2's AsyncClient, so each request passes its own
+        return self.async_client.post(reverse(f"payments:{name}"), body, content_type="application/json",
+                                      headers=self.auth if auth else None)
+
+    @patch.object(PaystackClient, "_request")
+    async def test_initialize_transaction(self, request):
+        request.return_value = {"data": {"authorization_url": "https://pay.test/authorize"}}
+        res = await self.post("async-init-transaction", {"course_id": self.course.id})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["authorization_url"], "https://pay.test/authorize")
+        trx = await PaymentTransaction.objects.aget(reference=res.json()["reference"])
+        self.assertEqual((trx.user_id, trx.amount), (self.user.id, 1000))
+
+    async def test_initialize_rejects_unknown_course(self):
+        res = await self.post("async-init-transaction", {"course_id": 999})
+        self.assertEqual(res.status_code, 400)
+
+    async def test_initialize_requires_a_token(self):
+        res = await self.post("async-init-transaction", {"course_id": self.course.id}, auth=False)
+        self.assertEqual(res.status_code, 401)
+
+    async def test_initialize_rejects_a_malformed_header(self):
+        url = reverse("payments:async-init-transaction")
+        for header in ("Bearer", "Bearer a b"):
+            res = await self.async_client.post(url, {"course_id": self.course.id},
+                                               content_type="application/json",
+                                               headers={"authorization": header})
+            self.assertEqual(res.status_code, 401, header)
+
+    @patch.object(PaystackClient, "_request", side_effect=GatewayError("down"))
+    async def test_initialize_gateway_down(self, request):
+        res = await self.post("async-init-transaction", {"course_id": self.course.id})
+        self.assertEqual(res.status_code, 502)
+
+    @patch.object(PaystackClient, "_request")
+    async def test_verify_transaction_enrolls(self, request):
+        request.return_value = {"data": {"status": "success"}}
+        await PaymentTransaction.objects.acreate(
+            user=self.user, course=self.course, reference="ref-async", amount=1000
+        )
+        res = await self.post("async-verify-transaction", {"reference": "ref-async"})
+
+        self.assertEqual(res.json(), {"status": "success"})
+        self.assertTrue(await Enrollment.objects.filter(user=self.user, course=self.course).aexists())
+
+    async def test_verify_unknown_reference_is_404(self):
+        res = await self.post("async-verify-transaction", {"reference": "nope"})
+        self.assertEqual(res.status_code, 404)
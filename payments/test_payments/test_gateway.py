@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from payments.gateway import (
+    AsyncPaystackClient, CircuitBreaker, GatewayUnavailable, PaystackClient,
+)
+
+
+class FakePaystackHandler(BaseHTTPRequestHandler):
+    """Just enough of the Paystack API for the client under test."""
+    protocol_version = "HTTP/1.1"   # keep-alive, so connection reuse is observable
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _record(self):
+        server = self.server
+        server.calls.append((self.command, self.path, self.client_address[1]))
+        server.auth_headers.append(self.headers.get("Authorization"))
+
+    def do_POST(self):
+        self._record()
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.server.fail_next:
+            self.server.fail_next -= 1
+            return self._reply(503, {"status": False})
+        self._reply(200, {
+            "status": True,
+            "data": {
+                "authorization_url": f"https://checkout.test/{payload['reference']}",
+                "reference": payload["reference"],
+            },
+        })
+
+    def do_GET(self):
+        self._record()
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if self.server.fail_next:
+            self.server.fail_next -= 1
+            return self._reply(503, {"status": False})
+        reference = self.path.rsplit("/", 1)[-1]
+        self._reply(200, {"status": True, "data": {"status": "success", "reference": reference}})
+
+
+class PaystackClientTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakePaystackHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.calls = []
+        self.server.auth_headers = []
+        self.server.fail_next = 0
+        self.server.delay = 0
+        self.client = PaystackClient(
+            "sk_test", base_url=self.base_url, timeout=(1, 0.5), backoff_factor=0
+        )
+
+    def test_initialize_and_verify(self):
+        init = self.client.initialize_transaction(
+            amount=1000, email="a@test.com", reference="ref-1", callback_url="http://cb"
+        )
+        self.assertEqual(init["data"]["authorization_url"], "https://checkout.test/ref-1")
+
+        verify = self.client.verify_transaction("ref-1")
+        self.assertEqual(verify["data"]["status"], "success")
+        self.assertEqual(self.server.auth_headers, ["Bearer sk_test"] * 2)
+
+    def test_keep_alive_connection_is_reused(self):
+        for i in range(3):
+            self.client.verify_transaction(f"ref-{i}")
+        client_ports = {port for _, _, port in self.server.calls}
+        self.assertEqual(len(client_ports), 1)
+
+    def test_idempotent_get_is_retried(self):
+        self.server.fail_next = 1
+        verify = self.client.verify_transaction("ref-retry")
+        self.assertEqual(verify["data"]["status"], "success")
+        self.assertEqual(len(self.server.calls), 2)
+
+    def test_post_is_never_retried(self):
+        self.server.fail_next = 1
+        with self.assertRaises(GatewayUnavailable):
+            self.client.initialize_transaction(amount=1, email="a@test.com", reference="r")
+        self.assertEqual(len(self.server.calls), 1)
+
+    def test_read_timeout_raises_unavailable(self):
+        self.server.delay = 1
+        client = PaystackClient(
+            "sk_test", base_url=self.base_url, timeout=(1, 0.2), max_retries=0
+        )
+        with self.assertRaises(GatewayUnavailable):
+            client.verify_transaction("slow")
+
+    def test_circuit_opens_after_repeated_failures(self):
+        client = PaystackClient(
+            "sk_test", base_url=self.base_url, max_retries=0,
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        )
+        self.server.fail_next = 2
+        for _ in range(2):
+            with self.assertRaises(GatewayUnavailable):
+                client.verify_transaction("down")
+        calls_before = len(self.server.calls)
+
+        with self.assertRaises(GatewayUnavailable):
+            client.verify_transaction("down")
+        # open circuit short-circuits without touching the network
+        self.assertEqual(len(self.server.calls), calls_before)
+
+    def test_half_open_circuit_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        client = PaystackClient("sk_test", base_url=self.base_url, max_retries=0, breaker=breaker)
+        self.server.fail_next = 1
+        with self.assertRaises(GatewayUnavailable):
+            client.verify_transaction("flaky")
+        time.sleep(0.1)
+        self.assertEqual(client.verify_transaction("flaky")["data"]["status"], "success")
+        self.assertFalse(breaker.is_open)
+
+    def test_half_open_circuit_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.1)
+        breaker.before_call()   # the trial
+        with self.assertRaises(GatewayUnavailable):
+            breaker.before_call()
+        breaker.record_success()
+        breaker.before_call()
+
+    def test_failed_trial_reopens_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.1)
+        breaker.before_call()
+        breaker.record_failure()
+        with self.assertRaises(GatewayUnavailable):
+            breaker.before_call()
+
+    def test_async_client(self):
+        aclient = AsyncPaystackClient(self.client)
+        verify = async_to_sync(aclient.verify_transaction)("ref-async")
+        self.assertEqual(verify["data"]["reference"], "ref-async")
@@ -0,0 +1,117 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Course
+from notifications.models import Notification, OutboundEmail
+from payments.models import Enrollment, Order
+
+User = get_user_model()
+
+
+class OrderCheckoutTest(TestCase):
+    init_url = "/api/v1/payments/orders/init/"
+    verify_url = "/api/v1/payments/orders/verify/"
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user(email="inst@test.com", password="pass")
+        self.user = User.objects.create_user(email="buyer@test.com", password="pass")
+        self.courses = [
+            Course.objects.create(
+                title=f"C{i}", description="D", price=Decimal("10.00"),
+                instructor=self.instructor, default_access_days=30 if i == 0 else None,
+            )
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def _checkout(self, course_ids=None):
+        with patch("payments.services.paystack.initialize_transaction") as init:
+            init.return_value = {"data": {"authorization_url": "https://pay.test/x"}}
+            res = self.client.post(
+                self.init_url,
+                {"courses": course_ids or [c.id for c in self.courses]},
+                format="json",
+            )
+        return res, init
+
+    def test_one_gateway_call_for_the_whole_cart(self):
+        res, init = self._checkout()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(init.call_count, 1)
+        self.assertEqual(init.call_args.kwargs["amount"], 3000)
+
+        order = Order.objects.get(reference=res.json()["reference"])
+        self.assertEqual(order.items.count(), 3)
+        self.assertEqual(order.status, "pending")
+
+    def test_verify_enrolls_every_line_in_bulk(self):
+        res, _ = self._checkout()
+        ref = res.json()["reference"]
+        with patch("payments.views.paystack.verify_transaction") as verify:
+            verify.return_value = {"data": {"status": "success"}}
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(self.verify_url, {"reference": ref}, format="json")
+
+        self.assertEqual(res.json()["status"], "success")
+        self.assertEqual(verify.call_count, 1)
+        enrollments = Enrollment.objects.filter(user=self.user)
+        self.assertEqual(enrollments.count(), 3)
+        self.assertIsNotNone(enrollments.get(course=self.courses[0]).access_expires)
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.user, verb__startswith="You’re now enrolled").count(), 3
+        )
+        self.assertEqual(OutboundEmail.objects.filter(dedupe_key=f"order-receipt:{ref}").count(), 1)
+
+    def test_webhook_settles_orders(self):
+        res, _ = self._checkout()
+        ref = res.json()["reference"]
+        body = json.dumps({"event": "charge.success", "data": {"id": 7, "reference": ref}}).encode()
+        sig = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+        self.client.force_authenticate(None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/v1/payments/webhook/", data=body, content_type="application/json",
+                HTTP_X_PAYSTACK_SIGNATURE=sig,
+            )
+        self.assertEqual(Order.objects.get(reference=ref).status, "success")
+        self.assertEqual(Enrollment.objects.filter(user=self.user).count(), 3)
+
+    def test_lapsed_enrollment_is_renewed(self):
+        Enrollment.objects.create(
+            user=self.user, course=self.courses[0],
+            access_expires=timezone.now() - timedelta(days=1),
+        )
+        res, _ = self._checkout([self.courses[0].id])
+        self.assertEqual(res.status_code, 200)
+        from payments.services import settle_order
+        settle_order(res.json()["reference"], succeeded=True)
+
+        en = Enrollment.objects.get(user=self.user, course=self.courses[0])
+        self.assertTrue(en.is_active)
+        self.assertGreater(en.access_expires, timezone.now() + timedelta(days=29))
+
+    def test_rejects_courses_already_owned(self):
+        Enrollment.objects.create(user=self.user, course=self.courses[1])
+        res, init = self._checkout()
+        self.assertEqual(res.status_code, 400)
+        init.assert_not_called()
+
+    def test_verify_requires_own_order(self):
+        res, _ = self._checkout()
+        other = User.objects.create_user(email="other@test.com", password="pass")
+        self.client.force_authenticate(other)
+        res = self.client.post(self.verify_url, {"reference": res.json()["reference"]}, format="json")
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,145 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from courses.models import Course
+from teams.models import Organization
+from payments.gateway import GatewayUnavailable
+from payments.models import PaymentTransaction, BulkPaymentTransaction, Enrollment
+from payments.reconcile import reconcile_pending
+
+User = get_user_model()
+
+
+class FakeGateway:
+    """Paystack stand-in: `listed` comes back from the list API, `verified` from verify."""
+
+    def __init__(self, listed=(), verified=None, per_page=2, list_fails=False):
+        self.listed = list(listed)
+        self.verified = verified or {}
+        self.per_page = per_page
+        self.list_fails = list_fails
+        self.list_calls = []
+        self.verify_calls = []
+
+    def list_transactions(self, page=1, **params):
+        self.list_calls.append(page)
+        if self.list_fails:
+            raise GatewayUnavailable("down")
+        start = (page - 1) * self.per_page
+        page_count = max(1, -(-len(self.listed) // self.per_page))
+        return {
+            "status": True,
+            "data": self.listed[start:start + self.per_page],
+            "meta": {"page": page, "pageCount": page_count},
+        }
+
+    def verify_transaction(self, reference):
+        self.verify_calls.append(reference)
+        outcome = self.verified.get(reference)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome is None:
+            return {"status": False, "message": "Transaction reference not found"}
+        return {"status": True, "data": {"reference": reference, "status": outcome}}
+
+
+class ReconcilePendingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="buyer@test.com", password="pass")
+        self.course = Course.objects.create(
+            title="C", description="D", price=Decimal("10.00"), instructor=self.user
+        )
+        self.org = Organization.objects.create(name="Org", admin=self.user)
+
+    def _pending(self, reference, age=timedelta(hours=1)):
+        trx = PaymentTransaction.objects.create(
+            user=self.user, course=self.course, reference=reference, amount=1000
+        )
+        PaymentTransaction.objects.filter(pk=trx.pk).update(created_at=timezone.now() - age)
+        return trx
+
+    def test_recovers_paid_and_fails_declined_in_bulk(self):
+        for ref in ("paid-1", "paid-2", "declined", "fresh"):
+            self._pending(ref)
+        PaymentTransaction.objects.filter(reference="fresh").update(created_at=timezone.now())
+        gateway = FakeGateway(listed=[
+            {"reference": "paid-1", "status": "success"},
+            {"reference": "someone-else", "status": "success"},
+            {"reference": "paid-2", "status": "success"},
+            {"reference": "declined", "status": "failed"},
+        ])
+
+        report = reconcile_pending(client=gateway)
+
+        self.assertEqual(report["payments"]["checked"], 3)
+        self.assertEqual(report["payments"]["recovered"], 2)
+        self.assertEqual(report["payments"]["failed"], 1)
+        self.assertEqual(gateway.list_calls, [1, 2])   # two pages, no bulk rows to list
+        self.assertEqual(gateway.verify_calls, [])
+        self.assertEqual(Enrollment.objects.filter(user=self.user).count(), 1)
+        statuses = dict(PaymentTransaction.objects.values_list("reference", "status"))
+        self.assertEqual(statuses, {
+            "paid-1": "success", "paid-2": "success", "declined": "failed", "fresh": "pending",
+        })
+
+    def test_falls_back_to_verify_when_listing_fails(self):
+        self._pending("paid")
+        self._pending("flaky")
+        gateway = FakeGateway(
+            list_fails=True,
+            verified={"paid": "success", "flaky": GatewayUnavailable("timeout")},
+        )
+
+        report = reconcile_pending(client=gateway)
+
+        self.assertEqual(report["payments"]["recovered"], 1)
+        self.assertEqual(report["payments"]["unresolved"], 1)
+        self.assertEqual(
+            PaymentTransaction.objects.get(reference="flaky").status, "pending"
+        )
+
+    def test_expires_long_abandoned_but_not_in_flight(self):
+        self._pending("abandoned", age=timedelta(days=2))
+        self._pending("ongoing", age=timedelta(days=2))
+        self._pending("recent-abandon", age=timedelta(hours=2))
+        gateway = FakeGateway(verified={"ongoing": "ongoing", "recent-abandon": "abandoned"})
+
+        report = reconcile_pending(client=gateway)
+
+        self.assertEqual(report["payments"]["expired"], 1)
+        self.assertEqual(report["payments"]["unresolved"], 2)
+        statuses = dict(PaymentTransaction.objects.values_list("reference", "status"))
+        self.assertEqual(statuses["abandoned"], "failed")
+        self.assertEqual(statuses["ongoing"], "pending")
+        self.assertEqual(statuses["recent-abandon"], "pending")
+
+    def test_bulk_transactions_are_reconciled(self):
+        trx = BulkPaymentTransaction.objects.create(
+            organization=self.org, user=self.user, seats=2, reference="team-1", amount=2000
+        )
+        trx.courses.set([self.course])
+        BulkPaymentTransaction.objects.filter(pk=trx.pk).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        gateway = FakeGateway(listed=[{"reference": "team-1", "status": "success"}])
+
+        report = reconcile_pending(client=gateway)
+
+        self.assertEqual(report["bulk_payments"]["recovered"], 1)
+        trx.refresh_from_db()
+        self.assertEqual(trx.status, "success")
+
+    def test_command_reports_counts(self):
+        self._pending("paid")
+        gateway = FakeGateway(listed=[{"reference": "paid", "status": "success"}])
+        out = StringIO()
+        with patch("payments.reconcile.paystack", gateway):
+            call_command("reconcile_payments", stdout=out)
+        self.assertIn("payments: checked 1, recovered 1", out.getvalue())
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from courses.models import Course
+from notifications.models import Notification
+from payments.models import Enrollment
+from payments.tasks import send_expiry_reminders, deactivate_expired_enrollments
+from progress.entitlements import get_entitlements
+
+User = get_user_model()
+
+
+class EnrollmentExpiryTasksTest(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(email="inst@test.com", password="pass")
+        self.courses = [
+            Course.objects.create(
+                title=f"C{i}", description="D", price=Decimal("10.00"), instructor=self.instructor
+            )
+            for i in range(3)
+        ]
+        self.student = User.objects.create_user(email="s@test.com", password="pass")
+
+    def _tomorrow_noon(self):
+        return timezone.localtime().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def test_save_keeps_is_active_in_step(self):
+        en = Enrollment.objects.create(
+            user=self.student, course=self.courses[0],
+            access_expires=timezone.now() - timedelta(days=1),
+        )
+        self.assertFalse(en.is_active)
+        en.access_expires = timezone.now() + timedelta(days=30)
+        en.save()
+        self.assertTrue(Enrollment.objects.get(pk=en.pk).is_active)
+
+    def test_save_leaves_is_active_alone_when_expiry_is_unchanged(self):
+        en = Enrollment.objects.create(
+            user=self.student, course=self.courses[0],
+            access_expires=timezone.now() + timedelta(days=30),
+        )
+        en = Enrollment.objects.get(pk=en.pk)
+        en.is_active = False   # revoked by hand
+        en.save()
+        self.assertFalse(Enrollment.objects.get(pk=en.pk).is_active)
+
+        en.access_expires += timedelta(days=30)
+        en.save(update_fields=["access_expires"])
+        self.assertTrue(Enrollment.objects.get(pk=en.pk).is_active)
+
+    def test_deactivate_flips_expired_rows_in_one_update(self):
+        expired = Enrollment.objects.create(
+            user=self.student, course=self.courses[0],
+            access_expires=timezone.now() + timedelta(hours=1),
+        )
+        lifetime = Enrollment.objects.create(user=self.student, course=self.courses[1])
+        Enrollment.objects.filter(pk=expired.pk).update(
+            access_expires=timezone.now() - timedelta(minutes=1)
+        )
+
+        with self.assertNumQueries(2):   # the affected users, then one UPDATE
+            changed = deactivate_expired_enrollments()
+
+        self.assertEqual(changed, 1)
+        self.assertFalse(Enrollment.objects.get(pk=expired.pk).is_active)
+        self.assertTrue(Enrollment.objects.get(pk=lifetime.pk).is_active)
+        self.assertEqual(Enrollment.objects.active().count(), 1)
+
+    def test_deactivate_drops_cached_entitlements(self):
+        en = Enrollment.objects.create(
+            user=self.student, course=self.courses[0],
+            access_expires=timezone.now() + timedelta(hours=1),
+        )
+        Enrollment.objects.filter(pk=en.pk).update(access_expires=timezone.now() - timedelta(minutes=1))
+        cache.clear()
+        self.assertTrue(get_entitlements(self.student.pk)[0]["is_active"])
+
+        deactivate_expired_enrollments()
+        self.assertFalse(get_entitlements(self.student.pk)[0]["is_active"])
+
+    def test_reminders_cover_tomorrow_only(self):
+        Enrollment.objects.create(
+            user=self.student, course=self.courses[0], access_expires=self._tomorrow_noon()
+        )
+        Enrollment.objects.create(
+            user=self.student, course=self.courses[1],
+            access_expires=self._tomorrow_noon() + timedelta(days=1),
+        )
+        Enrollment.objects.create(user=self.student, course=self.courses[2])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sent = send_expiry_reminders()
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(
+            list(
+                Notification.objects.filter(verb__endswith="expires tomorrow.")
+                .values_list("verb", flat=True)
+            ),
+            ["Your access to “C0” expires tomorrow."],
+        )
+
+    def test_reminders_use_constant_queries(self):
+        for course in self.courses:
+            Enrollment.objects.create(
+                user=self.student, course=course, access_expires=self._tomorrow_noon()
+            )
+        # select + one bulk insert, however many rows
+        with self.assertNumQueries(2):
+            send_expiry_reminders()
+        self.assertEqual(
+            Notification.objects.filter(verb__endswith="expires tomorrow.").count(), 3
+        )
@@ -48,7 +48,7 @@ class PaymentsViewsTest(TestCase):
 
     # ----- individual payment tests -----
 
-    @patch("payments.views.paystack.transaction.initialize")
+    @patch("payments.views.paystack.initialize_transaction")
     def test_initialize_transaction_success(self, mock_initialize):
         mock_initialize.return_value = {
             "data": {"authorization_url": "https://pay.test/authorize"}
@@ -72,7 +72,7 @@ class PaymentsViewsTest(TestCase):
         )
         self.assertEqual(resp.status_code, 401)
 
-    @patch("payments.views.paystack.transaction.verify")
+    @patch("payments.views.paystack.verify_transaction")
     def test_verify_transaction_success(self, mock_verify):
         trx = PaymentTransaction.objects.create(
             user=self.user, course=self.course,
@@ -91,7 +91,7 @@ class PaymentsViewsTest(TestCase):
             Enrollment.objects.filter(user=self.user, course=self.course).exists()
         )
 
-    @patch("payments.views.paystack.transaction.verify")
+    @patch("payments.views.paystack.verify_transaction")
     def test_verify_transaction_failed(self, mock_verify):
         trx = PaymentTransaction.objects.create(
             user=self.user, course=self.course,
@@ -109,7 +109,7 @@ class PaymentsViewsTest(TestCase):
             Enrollment.objects.filter(user=self.user, course=self.course).exists()
         )
 
-    @patch("payments.views.paystack.transaction.verify") 
+    @patch("payments.views.paystack.verify_transaction") 
     def test_verify_transaction_sets_expiry(self, mock_verify): 
         """Enrolment for a course with default_access_days must carry timestamp.""" 
         trx = PaymentTransaction.objects.create( 
@@ -141,10 +141,11 @@ class PaymentsViewsTest(TestCase):
         ).encode() 
         sig = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest() 
  
-        self.client.post( 
-            self.webhook_url, data=body, content_type="application/json", 
-            HTTP_X_PAYSTACK_SIGNATURE=sig, 
-        ) 
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post( 
+                self.webhook_url, data=body, content_type="application/json", 
+                HTTP_X_PAYSTACK_SIGNATURE=sig, 
+            ) 
  
         en = Enrollment.objects.get(user=self.user, course=self.course_14) 
         self.assertIsNotNone(en.access_expires)
@@ -160,12 +161,13 @@ class PaymentsViewsTest(TestCase):
         signature = hmac.new(
             settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512
         ).hexdigest()
-        resp = self.client.post(
-            self.webhook_url,
-            data=body,
-            content_type="application/json",
-            HTTP_X_PAYSTACK_SIGNATURE=signature,
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                self.webhook_url,
+                data=body,
+                content_type="application/json",
+                HTTP_X_PAYSTACK_SIGNATURE=signature,
+            )
         self.assertEqual(resp.status_code, 200)
         trx.refresh_from_db()
         self.assertEqual(trx.status, "success")
@@ -241,7 +243,7 @@ class PaymentsViewsTest(TestCase):
         )
         self.assertEqual(resp.status_code, 401)
 
-    @patch("payments.views.paystack.transaction.verify")
+    @patch("payments.views.paystack.verify_transaction")
     def test_verify_team_transaction_success(self, mock_verify):
         # set up a real BulkPaymentTransaction
         from payments.services import process_team_checkout  # to create trx
@@ -266,7 +268,7 @@ class PaymentsViewsTest(TestCase):
         self.assertEqual(trx.status, "success")
         self.assertIsNotNone(trx.paid_at)
 
-    @patch("payments.views.paystack.transaction.verify")
+    @patch("payments.views.paystack.verify_transaction")
     def test_verify_team_transaction_failed(self, mock_verify):
         ref = "team-ref-fail"
         trx = BulkPaymentTransaction.objects.create(
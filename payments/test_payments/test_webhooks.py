@@ -0,0 +1,104 @@
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from courses.models import Course
+from payments.models import PaymentTransaction, Enrollment, PaystackWebhookEvent
+from payments.services import apply_webhook_event, settle_transaction
+
+User = get_user_model()
+
+
+class PaystackWebhookIngestionTest(TestCase):
+    url = "/api/v1/payments/webhook/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="buyer@test.com", password="pass")
+        self.course = Course.objects.create(
+            title="C", description="D", price=Decimal("10.00"), instructor=self.user
+        )
+        self.trx = PaymentTransaction.objects.create(
+            user=self.user, course=self.course, reference="ref-1", amount=1000
+        )
+
+    def _post(self, payload):
+        body = json.dumps(payload).encode()
+        sig = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+        return self.client.post(
+            self.url, data=body, content_type="application/json",
+            HTTP_X_PAYSTACK_SIGNATURE=sig,
+        )
+
+    def _charge(self):
+        return {"event": "charge.success", "data": {"id": 99, "reference": "ref-1"}}
+
+    def test_event_is_stored_and_applied_after_commit(self):
+        with patch("payments.views.process_webhook_event.delay") as delay:
+            with self.captureOnCommitCallbacks() as callbacks:
+                resp = self._post(self._charge())
+            self.assertEqual(resp.status_code, 200)
+            event = PaystackWebhookEvent.objects.get()
+            self.assertEqual(event.event_key, "charge.success:99")
+            self.assertEqual(event.status, PaystackWebhookEvent.PENDING)
+            self.trx.refresh_from_db()
+            self.assertEqual(self.trx.status, "pending")
+
+            self.assertEqual(len(callbacks), 1)
+            callbacks[0]()
+            delay.assert_called_once_with(event.id)
+
+    def test_redelivery_is_a_noop(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post(self._charge())
+        with patch("payments.views.process_webhook_event.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self._post(self._charge())
+        self.assertEqual(resp.status_code, 200)
+        delay.assert_not_called()
+        self.assertEqual(PaystackWebhookEvent.objects.count(), 1)
+        self.assertEqual(Enrollment.objects.filter(user=self.user).count(), 1)
+
+    def test_apply_is_idempotent_against_verify(self):
+        settle_transaction("ref-1", succeeded=True)
+        paid_at = PaymentTransaction.objects.get(pk=self.trx.pk).paid_at
+        event, _ = PaystackWebhookEvent.objects.get_or_create(
+            event_key="charge.success:99",
+            defaults={"event": "charge.success", "reference": "ref-1", "payload": self._charge()},
+        )
+        self.assertTrue(apply_webhook_event(event.id))
+        self.assertFalse(apply_webhook_event(event.id))
+
+        self.trx.refresh_from_db()
+        self.assertEqual(self.trx.paid_at, paid_at)
+        self.assertEqual(Enrollment.objects.filter(user=self.user).count(), 1)
+
+    def test_late_failure_does_not_undo_success(self):
+        settle_transaction("ref-1", succeeded=True)
+        settle_transaction("ref-1", succeeded=False)
+        self.trx.refresh_from_db()
+        self.assertEqual(self.trx.status, "success")
+
+    def test_replay_command_applies_failed_events(self):
+        event = PaystackWebhookEvent.objects.create(
+            event_key="charge.success:99", event="charge.success",
+            reference="ref-1", payload=self._charge(),
+            status=PaystackWebhookEvent.FAILED, last_error="db down",
+        )
+        out = StringIO()
+        call_command("replay_webhook_events", "--sync", stdout=out)
+        self.assertIn("1 event(s) applied", out.getvalue())
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, PaystackWebhookEvent.PROCESSED)
+        self.trx.refresh_from_db()
+        self.assertEqual(self.trx.status, "success")
@@ -4,8 +4,11 @@ from .views import (
     VerifyTransactionAPIView,
     PaystackWebhookAPIView,
     InitializeTeamTransactionAPIView,
-    VerifyTeamTransactionAPIView
+    VerifyTeamTransactionAPIView,
+    InitializeOrderAPIView,
+    VerifyOrderAPIView,
 )
+from . import async_views
 
 app_name = "payments"
 
@@ -14,5 +17,10 @@ urlpatterns = [
     path("verify/", VerifyTransactionAPIView.as_view(),   name="verify-transaction"),
     path("team/init/",   InitializeTeamTransactionAPIView.as_view(), name="team-init"),
     path("team/verify/", VerifyTeamTransactionAPIView.as_view(),  name="team-verify"),
+    path("orders/init/",   InitializeOrderAPIView.as_view(), name="order-init"),
+    path("orders/verify/", VerifyOrderAPIView.as_view(),     name="order-verify"),
     path("webhook/", PaystackWebhookAPIView.as_view(),    name="webhook"),
+    # ASGI-native variants (tem_backend.asyncapi)
+    path("async/init/",   async_views.initialize_transaction, name="async-init-transaction"),
+    path("async/verify/", async_views.verify_transaction,     name="async-verify-transaction"),
 ]
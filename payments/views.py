@@ -1,20 +1,26 @@
-from django.utils import timezone
+from django.db import transaction
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
-from paystackapi.paystack import Paystack
 from django.conf import settings
-from .models import PaymentTransaction, Enrollment, BulkPaymentTransaction
+from .models import PaymentTransaction, BulkPaymentTransaction, Order
 from .serializers import InitTransactionSerializer, VerifyTransactionSerializer
-from .services import process_team_checkout
+from .services import (
+    process_team_checkout, record_webhook_event, settle_transaction, settle_bulk_transaction,
+    create_order, settle_order,
+)
+from .tasks import process_webhook_event
+from .gateway import paystack, GatewayError
 from .serializers import InitTeamTransactionSerializer, VerifyTeamTransactionSerializer
+from .serializers import InitOrderSerializer, VerifyOrderSerializer
 from courses.models import Course
+from courses.pricing import quote_course
 import uuid
 from rest_framework.views import APIView
+from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import PermissionDenied
 import hashlib, hmac, json
-from datetime import timedelta
 
-paystack = Paystack(secret_key=settings.PAYSTACK_SECRET_KEY)
+GATEWAY_UNAVAILABLE = {"detail": "Payment gateway unavailable, please retry shortly."}
 
 class InitializeTransactionAPIView(generics.GenericAPIView):
     serializer_class = InitTransactionSerializer
@@ -24,7 +30,7 @@ class InitializeTransactionAPIView(generics.GenericAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         course = Course.objects.get(pk=serializer.validated_data["course_id"])
-        amount_kobo = int(course.price * 100)
+        amount_kobo = quote_course(course.id).amount_kobo
 
         # generate our own unique reference
         reference = uuid.uuid4().hex
@@ -38,13 +44,16 @@ class InitializeTransactionAPIView(generics.GenericAPIView):
         )
 
         # call Paystack initialize
-        init_response = paystack.transaction.initialize(
-            amount=amount_kobo,
-            email=request.user.email,
-            reference=reference,
-            callback_url=settings.PAYSTACK_CALLBACK_URL,
-        )
-        auth_url = init_response.get("data", {}).get("authorization_url")
+        try:
+            init_response = paystack.initialize_transaction(
+                amount=amount_kobo,
+                email=request.user.email,
+                reference=reference,
+                callback_url=settings.PAYSTACK_CALLBACK_URL,
+            )
+        except GatewayError:
+            return Response(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+        auth_url = (init_response.get("data") or {}).get("authorization_url")
         return Response({
             "authorization_url": auth_url,
             "reference": reference
@@ -57,24 +66,12 @@ class VerifyTransactionAPIView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         ref = request.data.get("reference")
         trx = PaymentTransaction.objects.get(reference=ref)
-        verify_resp = paystack.transaction.verify(reference=ref)
-        data = verify_resp.get("data", {})
-        status_str = data.get("status")
-
-        trx.status = "success" if status_str == "success" else "failed"
-        if trx.status == "success":
-            trx.paid_at = timezone.now()
-
-            # --- determine expiry ----------------------------
-            course = trx.course
-            days   = course.default_access_days  # None → lifetime
-            expires = timezone.now() + timedelta(days=days) if days else None
-            # --------------------------------------------------
-
-            Enrollment.objects.get_or_create(user=trx.user, 
-                                             course=trx.course,
-                                             defaults = {"access_expires": expires})
-        trx.save()
+        try:
+            verify_resp = paystack.verify_transaction(ref)
+        except GatewayError:
+            return Response(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+        data = verify_resp.get("data") or {}
+        trx = settle_transaction(ref, succeeded=data.get("status") == "success")
 
         return Response({"status": trx.status}, status=status.HTTP_200_OK)
 
@@ -92,28 +89,10 @@ class PaystackWebhookAPIView(APIView):
         if not hmac.compare_digest(expected, signature):
             raise PermissionDenied("Invalid signature")
 
-        event = json.loads(body)
-        if event["event"] == "charge.success":
-            ref = event["data"]["reference"]
-            try:
-                trx = PaymentTransaction.objects.get(reference=ref)
-                if trx.status != "success":
-                    trx.status = "success"
-                    trx.paid_at = timezone.now()
-                    trx.save()
-                    #Enrollment.objects.get_or_create(user=trx.user, course=trx.course)
-                    course  = trx.course
-                    days    = course.default_access_days
-                    expires = timezone.now() + timedelta(days=days) if days else None
-
-                    Enrollment.objects.get_or_create( 
-                        user=trx.user, 
-                        course=course, 
-                        defaults={"access_expires": expires}, 
-                    )
-
-            except PaymentTransaction.DoesNotExist:
-                pass
+        # store and acknowledge; the worker applies it (see apply_webhook_event)
+        event, created = record_webhook_event(json.loads(body))
+        if created:
+            transaction.on_commit(lambda: process_webhook_event.delay(event.id))
 
         return Response({"received": True})
     
@@ -125,7 +104,10 @@ class InitializeTeamTransactionAPIView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         s = self.get_serializer(data=request.data)
         s.is_valid(raise_exception=True)
-        ref = process_team_checkout(request.data, request.user)
+        try:
+            ref = process_team_checkout(request.data, request.user)
+        except GatewayError:
+            return Response(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
         return Response({"reference": ref}, status=status.HTTP_200_OK)
 
 class VerifyTeamTransactionAPIView(generics.GenericAPIView):
@@ -135,13 +117,47 @@ class VerifyTeamTransactionAPIView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         ref = request.data.get("reference")
         trx = BulkPaymentTransaction.objects.get(reference=ref)
-        verify = paystack.transaction.verify(reference=ref).get("data", {})
-        if verify.get("status") == "success":
-            trx.status = "success"
-            trx.paid_at = timezone.now()
-            trx.save()
-            # you can signal/post-process seat provisioning here
-        else:
-            trx.status = "failed"
-            trx.save()
-        return Response({"status": trx.status}, status=status.HTTP_200_OK)
\ No newline at end of file
+        try:
+            verify = paystack.verify_transaction(ref).get("data") or {}
+        except GatewayError:
+            return Response(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+        trx = settle_bulk_transaction(ref, succeeded=verify.get("status") == "success")
+        return Response({"status": trx.status}, status=status.HTTP_200_OK)
+
+
+class InitializeOrderAPIView(generics.GenericAPIView):
+    """
+    Check out a cart of courses with a single Paystack transaction.
+    """
+    serializer_class = InitOrderSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        s = self.get_serializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        try:
+            order, auth_url = create_order(request.user, s.validated_data["courses"])
+        except GatewayError:
+            return Response(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+        return Response({
+            "authorization_url": auth_url,
+            "reference": order.reference,
+            "amount": order.amount,
+            "status": order.status,
+        }, status=status.HTTP_200_OK)
+
+class VerifyOrderAPIView(generics.GenericAPIView):
+    serializer_class = VerifyOrderSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        s = self.get_serializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        ref = s.validated_data["reference"]
+        get_object_or_404(Order, reference=ref, user=request.user)
+        try:
+            verify = paystack.verify_transaction(ref).get("data") or {}
+        except GatewayError:
+            return Response(GATEWAY_UNAVAILABLE, status=status.HTTP_502_BAD_GATEWAY)
+        order = settle_order(ref, succeeded=verify.get("status") == "success")
+        return Response({"status": order.status}, status=status.HTTP_200_OK)
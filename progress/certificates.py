@@ -0,0 +1,156 @@
+"""
+Certificate PDFs.
+
+Certificates never change once issued, so each one is rendered a single time
+(on issue, by `render_certificate_pdf`), stored under its cert_id and served
+from storage with an ETag. `render_pdf()` is a pure function of plain values
+so `manage.py rerender_certificates` can fan it out to worker processes when
+the template changes.
+"""
+import hashlib
+import zipfile
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# kind → (model label, title, subject line, path prefix, related fields for the render).
+# Models are looked up lazily so worker processes can import render_pdf
+# without setting up Django; reportlab is imported on first render, since the
+# views import this module and most processes never draw a certificate.
+KINDS = {
+    "lesson": (
+        "progress.Certification",
+        "Certificate of Completion",
+        "For successfully completing lesson:",
+        "certificates/lesson",
+        ("user", "lesson"),
+    ),
+    "scorm": (
+        "progress.ScormCertification",
+        "SCORM Completion Certificate",
+        "For successfully completing SCORM package:",
+        "certificates/scorm",
+        ("user", "package"),
+    ),
+}
+
+
+def model_for(kind):
+    return apps.get_model(KINDS[kind][0])
+
+
+def storage_path(kind, cert_id):
+    return f"{KINDS[kind][3]}/{cert_id}.pdf"
+
+
+def render_args(kind, cert):
+    """The plain values `render_pdf` needs; cert must have user and subject loaded."""
+    subject = cert.package if kind == "scorm" else cert.lesson
+    return (
+        kind,
+        cert.user.get_full_name() or cert.user.email,
+        subject.title,
+        cert.issued_at.date().isoformat(),
+        str(cert.cert_id),
+    )
+
+
+def render_pdf(kind, name, subject_title, issued_on, cert_id):
+    from reportlab.pdfgen import canvas
+
+    _, title, subject_line, _, _ = KINDS[kind]
+    buffer = BytesIO()
+    # invariant → no embedded timestamps, so identical input gives identical bytes
+    p = canvas.Canvas(buffer, invariant=1)
+    p.setTitle(title)
+
+    p.setFont("Helvetica-Bold", 18)
+    p.drawCentredString(300, 800, title)
+
+    p.setFont("Helvetica", 12)
+    p.drawString(100, 750, f"Presented to: {name}")
+    p.drawString(100, 730, subject_line)
+    p.drawString(120, 710, f"\"{subject_title}\"")
+    p.drawString(100, 690, f"Issued on: {issued_on}")
+    p.drawString(100, 670, f"Certificate ID: {cert_id}")
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def etag_for(content):
+    return hashlib.sha256(content).hexdigest()[:32]
+
+
+def save_pdf(kind, pk, cert_id, content):
+    """Write rendered bytes to storage and record path + ETag on the row."""
+    path = storage_path(kind, cert_id)
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    saved = default_storage.save(path, ContentFile(content))
+    etag = etag_for(content)
+    model_for(kind).objects.filter(pk=pk).update(pdf=saved, pdf_etag=etag)
+    return saved, etag
+
+
+def store_certificate_pdf(kind, pk):
+    cert = model_for(kind).objects.select_related(*KINDS[kind][4]).get(pk=pk)
+    return save_pdf(kind, cert.pk, cert.cert_id, render_pdf(*render_args(kind, cert)))
+
+
+# ─── Bulk download ──────────────────────────────────────────────────────
+
+def certificate_files(user_ids):
+    """
+    (archive name, storage path) for every certificate held by `user_ids`
+    (a list or a values("user_id") subquery). Unrendered ones are rendered now.
+    """
+    for kind, (_, _, _, _, related) in KINDS.items():
+        certs = (
+            model_for(kind).objects.filter(user_id__in=user_ids)
+            .select_related(*related)
+            .order_by("user_id", "pk")
+        )
+        for cert in certs.iterator(chunk_size=200):
+            if cert.pdf_etag and cert.pdf:
+                path = cert.pdf.name
+            else:
+                path, _ = save_pdf(kind, cert.pk, cert.cert_id, render_pdf(*render_args(kind, cert)))
+            yield f"{cert.user.email}/{kind}_{cert.cert_id}.pdf", path
+
+
+class _ZipSink:
+    """Write-only, unseekable target for ZipFile; drained after every write."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_zip(files, block_size=64 * 1024):
+    """
+    Yield a ZIP of (archive name, storage path) pairs piece by piece, so the
+    archive is never held in memory. PDFs are already compressed: stored as-is.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, path in files:
+            with default_storage.open(path, "rb") as src, archive.open(name, "w") as dst:
+                while block := src.read(block_size):
+                    dst.write(block)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
@@ -8,6 +8,9 @@ from .models import (
     ScormPackageProgress,
     ScormCertification,
 )
+from outbox.relay import publish
+from .tasks import render_certificate_pdf
+from .verification import forget_certificate
 
 
 @receiver(post_save, sender=LessonProgress)
@@ -29,3 +32,23 @@ def award_scorm_certificate(sender, instance, **kwargs):
             package=instance.package,
             defaults={"issued_at": timezone.now()},
         )
+
+
+@receiver(post_save, sender=Certification)
+def render_lesson_certificate(sender, instance, created, **kwargs):
+    if created:
+        forget_certificate(instance.cert_id)   # drop a cached "not found"
+        publish(
+            render_certificate_pdf, ("lesson", instance.pk),
+            dedupe_key=f"certificate-pdf:lesson:{instance.pk}",
+        )
+
+
+@receiver(post_save, sender=ScormCertification)
+def render_scorm_certificate(sender, instance, created, **kwargs):
+    if created:
+        forget_certificate(instance.cert_id)
+        publish(
+            render_certificate_pdf, ("scorm", instance.pk),
+            dedupe_key=f"certificate-pdf:scorm:{instance.pk}",
+        )
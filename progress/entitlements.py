@@ -0,0 +1,108 @@
+"""
+Learner-dashboard snapshot: every course a user is enrolled in, with access
+expiry, progress, last activity and certificates, built from five grouped
+queries and cached per user. Writes to any of the source tables drop the
+user's cache entry (see progress.signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from payments.models import Enrollment
+from .models import CourseProgress, LessonProgress, Certification, ScormCertification
+
+ENTITLEMENTS_KEY = "progress:entitlements:{user_id}"
+
+
+def _lesson_course():
+    # lessons hang off a course directly or through a module
+    return Coalesce("lesson__course_id", "lesson__module__course_id")
+
+
+def build_entitlements(user_id):
+    enrollments = list(
+        Enrollment.objects.filter(user_id=user_id)
+        .order_by("-enrolled_at")
+        .values(
+            "course_id", "course__title", "enrolled_at", "access_expires", "is_active",
+        )
+    )
+    course_ids = [row["course_id"] for row in enrollments]
+    if not course_ids:
+        return []
+
+    progress = {
+        row["course_id"]: row
+        for row in CourseProgress.objects.filter(user_id=user_id, course_id__in=course_ids)
+        .values("course_id", "percent", "completed_lessons", "total_lessons", "updated_at")
+    }
+    last_lesson = dict(
+        LessonProgress.objects.filter(user_id=user_id)
+        .annotate(course_id=_lesson_course())
+        .filter(course_id__in=course_ids)
+        .values("course_id")
+        .annotate(last=Max("updated_at"))
+        .values_list("course_id", "last")
+    )
+    lesson_certs = dict(
+        Certification.objects.filter(user_id=user_id)
+        .annotate(course_id=_lesson_course())
+        .filter(course_id__in=course_ids)
+        .values("course_id")
+        .annotate(n=Count("id"))
+        .values_list("course_id", "n")
+    )
+    scorm_certs = dict(
+        ScormCertification.objects.filter(user_id=user_id, package__course_id__in=course_ids)
+        .values("package__course_id")
+        .annotate(n=Count("id"))
+        .values_list("package__course_id", "n")
+    )
+
+    snapshot = []
+    for row in enrollments:
+        cid = row["course_id"]
+        prog = progress.get(cid, {})
+        activity = [t for t in (last_lesson.get(cid), prog.get("updated_at")) if t]
+        snapshot.append({
+            "course": cid,
+            "title": row["course__title"],
+            "enrolled_at": row["enrolled_at"],
+            "access_expires": row["access_expires"],
+            "is_active": row["is_active"],
+            "percent": prog.get("percent", 0),
+            "completed_lessons": prog.get("completed_lessons", 0),
+            "total_lessons": prog.get("total_lessons", 0),
+            "last_activity": max(activity) if activity else None,
+            "certificates": lesson_certs.get(cid, 0) + scorm_certs.get(cid, 0),
+        })
+    return snapshot
+
+
+def get_entitlements(user_id):
+    """
+    Cached snapshot; `active` is worked out on every read so an expiry that
+    passes while the entry is cached still shows.
+    """
+    key = ENTITLEMENTS_KEY.format(user_id=user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_entitlements(user_id)
+        cache.set(key, snapshot, settings.PROGRESS_ENTITLEMENTS_CACHE_TTL)
+
+    now = timezone.now()
+    return [
+        {
+            **row,
+            "active": row["is_active"] and (
+                row["access_expires"] is None or row["access_expires"] > now
+            ),
+        }
+        for row in snapshot
+    ]
+
+
+def invalidate_entitlements(user_id):
+    cache.delete(ENTITLEMENTS_KEY.format(user_id=user_id))
@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from progress.certificates import KINDS, model_for, render_args, render_pdf, save_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render stored certificate PDFs, e.g. after the template changed. "
+        "Rendering runs on a process pool; storage writes stay in this process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=[*KINDS, "all"], default="all")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Render processes; 0 renders inline.")
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument("--missing-only", action="store_true",
+                            help="Only certificates that have no stored PDF yet.")
+
+    def handle(self, *args, **opts):
+        kinds = list(KINDS) if opts["kind"] == "all" else [opts["kind"]]
+        pool = ProcessPoolExecutor(opts["workers"]) if opts["workers"] > 0 else None
+        try:
+            for kind in kinds:
+                done = self._rerender(kind, pool, opts["chunk_size"], opts["missing_only"])
+                self.stdout.write(f"{kind}: {done} certificate(s) rendered")
+        finally:
+            if pool:
+                pool.shutdown()
+
+    def _rerender(self, kind, pool, chunk_size, missing_only):
+        qs = model_for(kind).objects.select_related(*KINDS[kind][4]).order_by("pk")
+        if missing_only:
+            qs = qs.filter(pdf_etag="")
+
+        done, last_pk = 0, 0
+        while True:
+            chunk = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return done
+            columns = zip(*(render_args(kind, cert) for cert in chunk))
+            if pool:
+                rendered = pool.map(render_pdf, *columns, chunksize=max(1, chunk_size // 8))
+            else:
+                rendered = map(render_pdf, *columns)
+            for cert, content in zip(chunk, rendered):
+                save_pdf(kind, cert.pk, cert.cert_id, content)
+            done += len(chunk)
+            last_pk = chunk[-1].pk
@@ -22,6 +22,9 @@ class CourseProgress(models.Model):
     user       = models.ForeignKey(User, on_delete=models.CASCADE, related_name="course_progress")
     course     = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="progress_records")
     percent    = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)
+    # counters maintained by recalc_course_progress, so readers never recount
+    completed_lessons = models.PositiveIntegerField(default=0)
+    total_lessons     = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -45,6 +48,9 @@ class Certification(models.Model):
     lesson    = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="certifications")
     cert_id   = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     issued_at = models.DateTimeField(auto_now_add=True)
+    # rendered once on issue (progress.certificates)
+    pdf       = models.FileField(upload_to="certificates/", blank=True)
+    pdf_etag  = models.CharField(max_length=64, blank=True)
 
     class Meta:
         unique_together = ("user", "lesson")
@@ -59,6 +65,9 @@ class ScormCertification(models.Model):
     package   = models.ForeignKey(ScormPackage, on_delete=models.CASCADE, related_name="certifications")
     cert_id   = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     issued_at = models.DateTimeField(auto_now_add=True)
+    # rendered once on issue (progress.certificates)
+    pdf       = models.FileField(upload_to="certificates/", blank=True)
+    pdf_etag  = models.CharField(max_length=64, blank=True)
 
     class Meta:
         unique_together = ("user", "package")
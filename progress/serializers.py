@@ -29,4 +29,22 @@ class CertificationSerializer(serializers.ModelSerializer):
 class ScormCertificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScormCertification
-        fields = ["id", "package", "cert_id", "issued_at"]
\ No newline at end of file
+        fields = ["id", "package", "cert_id", "issued_at"]
+
+
+class EntitlementSerializer(serializers.Serializer):
+    """One row of the learner dashboard (see progress.entitlements)."""
+    course            = serializers.IntegerField()
+    title             = serializers.CharField()
+    enrolled_at       = serializers.DateTimeField()
+    access_expires    = serializers.DateTimeField(allow_null=True)
+    active            = serializers.BooleanField()
+    percent           = serializers.DecimalField(max_digits=5, decimal_places=2)
+    completed_lessons = serializers.IntegerField()
+    total_lessons     = serializers.IntegerField()
+    last_activity     = serializers.DateTimeField(allow_null=True)
+    certificates      = serializers.IntegerField()
+    certificate_available = serializers.SerializerMethodField()
+
+    def get_certificate_available(self, row):
+        return row["certificates"] > 0
@@ -1,13 +1,34 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import LessonProgress
+from .models import LessonProgress, CourseProgress, Certification, ScormCertification
+from payments.models import Enrollment
+from .entitlements import invalidate_entitlements
 from scorm_player.models import RuntimeData
+from outbox.relay import publish
 from .tasks import recalc_course_progress, recalc_scorm_progress
 
+PROGRESS_ORDERING_KEY = "progress:{user_id}:{course_id}"
+
 @receiver(post_save, sender=LessonProgress)
 def update_course_progress(sender, instance, **kwargs):
-    recalc_course_progress.delay(instance.user_id, instance.lesson.course_id)
+    course_id = instance.lesson.course_id
+    publish(
+        recalc_course_progress, (instance.user_id, course_id),
+        ordering_key=PROGRESS_ORDERING_KEY.format(user_id=instance.user_id, course_id=course_id),
+    )
 
 @receiver(post_save, sender=RuntimeData)
 def update_scorm_package_progress(sender, instance, **kwargs):
-    recalc_scorm_progress.delay(instance.user_id, instance.sco.package_id)
+    publish(recalc_scorm_progress, (instance.user_id, instance.sco.package_id))
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=CourseProgress)
+@receiver(post_save, sender=LessonProgress)
+@receiver(post_save, sender=Certification)
+@receiver(post_delete, sender=Certification)
+@receiver(post_save, sender=ScormCertification)
+@receiver(post_delete, sender=ScormCertification)
+def drop_entitlements_cache(sender, instance, **kwargs):
+    invalidate_entitlements(instance.user_id)
@@ -8,7 +8,7 @@ from .models import (
 )
 
 
-@shared_task
+@shared_task(workload="interactive")
 def recalc_course_progress(user_id, course_id):
     total = Lesson.objects.filter(course_id=course_id).count()
     completed = LessonProgress.objects.filter(
@@ -21,10 +21,12 @@ def recalc_course_progress(user_id, course_id):
         user_id=user_id, course_id=course_id
     )
     cp.percent = round(percent, 2)
+    cp.completed_lessons = completed
+    cp.total_lessons = total
     cp.save()
 
 
-@shared_task
+@shared_task(workload="interactive")
 def recalc_scorm_progress(user_id, package_id):
     total = Sco.objects.filter(package_id=package_id).count()
     # consider a SCO completed if RuntimeData.data carries a “completed” or “passed” status
@@ -44,3 +46,12 @@ def recalc_scorm_progress(user_id, package_id):
     )
     sp.percent = round(percent, 2)
     sp.save()
+
+
+@shared_task(bind=True, workload="bulk", autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+def render_certificate_pdf(self, kind, cert_pk):
+    """
+    Render and store a newly issued certificate ("lesson" or "scorm").
+    """
+    from .certificates import store_certificate_pdf
+    store_certificate_pdf(kind, cert_pk)
@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from courses.models import Course, Lesson
+from progress.models import LessonProgress, Certification
+from teams.models import Organization, TeamMember
+
+User = get_user_model()
+
+
+class CertificatePdfTests(APITestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(
+            email="learner@example.com", password="pass", first_name="Ada", last_name="L"
+        )
+        self.client.force_authenticate(self.user)
+        self.course = Course.objects.create(title="C", description="d", price=0, instructor=self.user)
+        self.lesson = Lesson.objects.create(course=self.course, title="Intro", content="...", order=1)
+
+    def _issue(self, user=None, lesson=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonProgress.objects.create(
+                user=user or self.user, lesson=lesson or self.lesson, is_completed=True
+            )
+        return Certification.objects.get(user=user or self.user, lesson=lesson or self.lesson)
+
+    def test_rendered_and_stored_on_issue(self):
+        cert = self._issue()
+        self.assertEqual(cert.pdf.name, f"certificates/lesson/{cert.cert_id}.pdf")
+        self.assertTrue(cert.pdf_etag)
+        with default_storage.open(cert.pdf.name) as f:
+            self.assertTrue(f.read().startswith(b"%PDF"))
+
+    def test_download_serves_stored_file_with_etag(self):
+        cert = self._issue()
+        url = reverse("progress:certification-download", args=[cert.pk])
+
+        with patch("progress.views.render_pdf") as render:
+            res = self.client.get(url)
+            body = b"".join(res.streaming_content)
+            render.assert_not_called()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["ETag"], f'"{cert.pdf_etag}"')
+        self.assertTrue(body.startswith(b"%PDF"))
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{cert.pdf_etag}"')
+        self.assertEqual(res.status_code, 304)
+
+    def test_unrendered_certificate_is_rendered_on_first_download(self):
+        cert = Certification.objects.create(user=self.user, lesson=self.lesson)  # no on_commit
+        res = self.client.get(reverse("progress:certification-download", args=[cert.pk]))
+        self.assertEqual(res.status_code, 200)
+        cert.refresh_from_db()
+        self.assertTrue(cert.pdf_etag)
+
+    def test_missing_stored_file_is_rendered_again(self):
+        cert = self._issue()
+        default_storage.delete(cert.pdf.name)
+        res = self.client.get(reverse("progress:certification-download", args=[cert.pk]))
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(b"".join(res.streaming_content).startswith(b"%PDF"))
+        self.assertTrue(default_storage.exists(cert.pdf.name))
+
+    def test_rerender_command_uses_a_process_pool(self):
+        cert = self._issue()
+        default_storage.delete(cert.pdf.name)
+        out = StringIO()
+        call_command("rerender_certificates", "--kind", "lesson", "--workers", "2", stdout=out)
+        self.assertIn("lesson: 1 certificate(s) rendered", out.getvalue())
+        self.assertTrue(default_storage.exists(cert.pdf.name))
+
+    def test_org_zip_streams_members_certificates(self):
+        org = Organization.objects.create(name="Org", admin=self.user)
+        members = []
+        for i in range(2):
+            member = User.objects.create_user(email=f"m{i}@org.com", password="pass")
+            TeamMember.objects.create(organization=org, user=member, status=TeamMember.ACTIVE)
+            self._issue(user=member)
+            members.append(member)
+        outsider = User.objects.create_user(email="x@else.com", password="pass")
+        self._issue(user=outsider)
+
+        res = self.client.get(f"/api/v1/teams/organizations/{org.pk}/certificates/")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        archive = zipfile.ZipFile(BytesIO(b"".join(res.streaming_content)))
+        names = sorted(archive.namelist())
+        self.assertEqual([n.split("/")[0] for n in names], ["m0@org.com", "m1@org.com"])
+        self.assertTrue(archive.read(names[0]).startswith(b"%PDF"))
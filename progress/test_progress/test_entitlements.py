@@ -0,0 +1,102 @@
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from courses.models import Course, Lesson
+from payments.models import Enrollment
+from progress.models import LessonProgress
+from progress.entitlements import get_entitlements
+
+User = get_user_model()
+
+
+class EntitlementViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="learner@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("progress:entitlements")
+
+        self.courses = [
+            Course.objects.create(title=f"C{i}", description="d", price=0, instructor=self.user)
+            for i in range(3)
+        ]
+        self.lessons = [
+            Lesson.objects.create(course=course, title="L", content="...", order=1)
+            for course in self.courses
+        ]
+        for course in self.courses:
+            Enrollment.objects.create(user=self.user, course=course)
+
+    def _rows(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        return {row["course"]: row for row in res.json()}
+
+    def test_snapshot_combines_progress_and_certificates(self):
+        with self.captureOnCommitCallbacks(execute=True):   # the recalc is relayed after commit
+            LessonProgress.objects.create(user=self.user, lesson=self.lessons[0], is_completed=True)
+
+        rows = self._rows()
+        self.assertEqual(len(rows), 3)
+        first = rows[self.courses[0].id]
+        self.assertEqual(first["percent"], "100.00")
+        self.assertEqual(first["completed_lessons"], 1)
+        self.assertIsNotNone(first["last_activity"])
+        self.assertTrue(first["certificate_available"])
+        self.assertTrue(first["active"])
+        self.assertFalse(rows[self.courses[1].id]["certificate_available"])
+
+    def test_query_count_does_not_grow_with_courses(self):
+        for lesson in self.lessons:
+            LessonProgress.objects.create(user=self.user, lesson=lesson, is_completed=True)
+        cache.clear()
+        with self.assertNumQueries(5):
+            self.assertEqual(len(get_entitlements(self.user.id)), 3)
+        with self.assertNumQueries(0):
+            get_entitlements(self.user.id)
+
+    def test_writes_invalidate_the_cache(self):
+        self._rows()
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonProgress.objects.create(user=self.user, lesson=self.lessons[2], is_completed=True)
+        self.assertEqual(self._rows()[self.courses[2].id]["completed_lessons"], 1)
+
+        extra = Course.objects.create(title="New", description="d", price=0, instructor=self.user)
+        Enrollment.objects.create(user=self.user, course=extra)
+        self.assertIn(extra.id, self._rows())
+
+    def test_expiry_shows_while_cached(self):
+        Enrollment.objects.filter(course=self.courses[0]).update(
+            access_expires=timezone.now() + timedelta(minutes=1)
+        )
+        cache.clear()
+        self.assertTrue(get_entitlements(self.user.id)[-1]["active"])
+
+        later = timezone.now() + timedelta(minutes=2)
+        with patch("progress.entitlements.timezone.now", return_value=later):
+            rows = {r["course"]: r for r in get_entitlements(self.user.id)}
+        self.assertFalse(rows[self.courses[0].id]["active"])
+        self.assertTrue(rows[self.courses[1].id]["active"])
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    "LOCATION": tempfile.mkdtemp(),
+}})
+class SharedEntitlementCacheTests(EntitlementViewTests):
+    """A shared cache backend, as production configures, seen from two processes."""
+
+    def test_enrollment_elsewhere_drops_the_cached_snapshot(self):
+        self.assertEqual(len(self._rows()), 3)
+        course = Course.objects.create(title="C3", description="d", price=0, instructor=self.user)
+        with patch("progress.entitlements.cache", caches.create_connection("default")):
+            Enrollment.objects.create(user=self.user, course=course)
+        self.assertEqual(len(self._rows()), 4)
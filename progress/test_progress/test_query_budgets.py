@@ -0,0 +1,55 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from courses.models import Course, Lesson
+from payments.models import Enrollment
+from progress.models import LessonProgress, Certification
+from tem_backend.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class ProgressQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="pb@x.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.courses = [
+            Course.objects.create(title=f"C{n}", description="d", price=0, instructor=self.user)
+            for n in range(3)
+        ]
+        self.lessons = [
+            Lesson.objects.create(course=course, title="L", content="c", order=1)
+            for course in self.courses
+        ]
+        for course in self.courses:
+            Enrollment.objects.create(user=self.user, course=course)
+
+    def test_lesson_progress_list_within_budget(self):
+        for lesson in self.lessons:
+            LessonProgress.objects.create(user=self.user, lesson=lesson)
+        res = self.client.get(reverse("progress:lesson-progress-list"))
+        self.assertEqual(len(res.data), 3)
+        self.assertWithinQueryBudget(res)
+
+    def test_complete_within_budget(self):
+        lp = LessonProgress.objects.create(user=self.user, lesson=self.lessons[0])
+        res = self.client.post(reverse("progress:lesson-progress-complete", args=[lp.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertWithinQueryBudget(res)
+
+    def test_certificates_list_within_budget(self):
+        for lesson in self.lessons:
+            LessonProgress.objects.create(user=self.user, lesson=lesson, is_completed=True)
+        self.assertEqual(Certification.objects.filter(user=self.user).count(), 3)
+        res = self.client.get(reverse("progress:certification-list"))
+        self.assertEqual(len(res.data), 3)
+        self.assertWithinQueryBudget(res)
+
+    def test_entitlements_within_budget(self):
+        res = self.client.get(reverse("progress:entitlements"))
+        self.assertEqual(len(res.data), 3)
+        self.assertWithinQueryBudget(res)
+        # second read is served from cache
+        self.assertEqual(self.assertWithinQueryBudget(self.client.get(reverse("progress:entitlements"))), 0)
@@ -43,6 +43,7 @@ class TasksTests(TestCase):
         recalc_course_progress.run(self.user.id, self.course.id)
         cp = CourseProgress.objects.get(user=self.user, course=self.course)
         self.assertAlmostEqual(float(cp.percent), 50.00)
+        self.assertEqual((cp.completed_lessons, cp.total_lessons), (1, 2))
 
         LessonProgress.objects.create(user=self.user, lesson=self.lesson2, is_completed=True)
         recalc_course_progress.run(self.user.id, self.course.id)
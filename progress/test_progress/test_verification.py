@@ -0,0 +1,96 @@
+import tempfile
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from courses.models import Course, Lesson
+from progress.models import Certification
+from progress.views import CertificateVerifyThrottle
+
+User = get_user_model()
+
+
+class CertificateVerifyTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="learner@example.com", password="pass", first_name="Ada", last_name="Lovelace"
+        )
+        course = Course.objects.create(title="Maths", description="d", price=0, instructor=self.user)
+        self.lesson = Lesson.objects.create(course=course, title="Engines", content="...", order=1)
+        self.cert = Certification.objects.create(user=self.user, lesson=self.lesson)
+
+    def _url(self, cert_id):
+        return reverse("progress:certificate-verify", args=[str(cert_id)])
+
+    def test_public_lookup_without_auth(self):
+        res = self.client.get(self._url(self.cert.cert_id))
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertTrue(data["valid"])
+        self.assertEqual(data["holder"], "Ada Lovelace")
+        self.assertEqual(data["title"], "Engines")
+        self.assertEqual(data["course"], "Maths")
+        self.assertNotIn("email", data)
+
+    def test_hits_and_misses_are_cached(self):
+        self.client.get(self._url(self.cert.cert_id))
+        unknown = uuid.uuid4()
+        self.assertEqual(self.client.get(self._url(unknown)).status_code, 404)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self._url(self.cert.cert_id)).status_code, 200)
+            self.assertEqual(self.client.get(self._url(unknown)).status_code, 404)
+
+    def test_malformed_id_skips_the_database(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(self._url("not-a-uuid"))
+        self.assertEqual(res.status_code, 404)
+
+    def test_issue_clears_negative_entry(self):
+        cert_id = uuid.uuid4()
+        self.assertEqual(self.client.get(self._url(cert_id)).status_code, 404)
+        other = Lesson.objects.create(course=self.lesson.course, title="Two", content="...", order=2)
+        Certification.objects.create(user=self.user, lesson=other, cert_id=cert_id)
+        self.assertEqual(self.client.get(self._url(cert_id)).status_code, 200)
+
+    def test_rate_limited_per_ip(self):
+        with patch.object(CertificateVerifyThrottle, "rate", "2/min", create=True):
+            codes = [
+                self.client.get(self._url(uuid.uuid4()), REMOTE_ADDR="10.0.0.1").status_code
+                for _ in range(3)
+            ]
+            other_ip = self.client.get(self._url(uuid.uuid4()), REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(codes, [404, 404, 429])
+        self.assertEqual(other_ip.status_code, 404)
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    "LOCATION": tempfile.mkdtemp(),
+}})
+class SharedCertificateVerifyTests(CertificateVerifyTests):
+    """A shared cache backend, as production configures, seen from two processes."""
+
+    def test_issue_elsewhere_after_a_cached_miss(self):
+        cert_id = uuid.uuid4()
+        self.assertEqual(self.client.get(self._url(cert_id)).status_code, 404)
+
+        other = Lesson.objects.create(course=self.lesson.course, title="Two", content="...", order=2)
+        with patch("progress.verification.cache", caches.create_connection("default")):
+            Certification.objects.create(user=self.user, lesson=other, cert_id=cert_id)
+
+        self.assertEqual(self.client.get(self._url(cert_id)).status_code, 200)
+
+    def test_rate_limit_counts_across_processes(self):
+        with patch.object(CertificateVerifyThrottle, "rate", "2/min", create=True):
+            for _ in range(2):
+                self.client.get(self._url(uuid.uuid4()), REMOTE_ADDR="10.0.0.1")
+            with patch.object(CertificateVerifyThrottle, "cache", caches.create_connection("default")):
+                res = self.client.get(self._url(uuid.uuid4()), REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(res.status_code, 429)
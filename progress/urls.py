@@ -7,6 +7,8 @@ from .views import (
     ScormPackageProgressViewSet,
     CertificationViewSet,
     ScormCertificationViewSet,
+    EntitlementView,
+    CertificateVerifyView,
 )
 
 router = DefaultRouter()
@@ -17,5 +19,7 @@ router.register("certs",      CertificationViewSet,        basename="certificati
 router.register("scorm-certs",ScormCertificationViewSet,   basename="scorm-certification")
 
 urlpatterns = [
+    path("entitlements/", EntitlementView.as_view(), name="entitlements"),
+    path("certs/verify/<str:cert_id>/", CertificateVerifyView.as_view(), name="certificate-verify"),
     path("", include(router.urls)),
 ]
@@ -0,0 +1,85 @@
+"""
+Public certificate lookup for employers.
+
+`lookup_certificate()` resolves a cert_id through a read-through cache. Hits
+are cached for a day (certificates don't change); misses are cached too, for
+CERT_VERIFY_NEGATIVE_TTL, so guessing ids mostly never reaches the database.
+Issuing a certificate clears any negative entry for its id.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Certification, ScormCertification
+
+VERIFY_KEY = "progress:cert-verify:{cert_id}"
+NOT_FOUND = {"valid": False}
+
+
+def _holder(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+def _from_db(cert_id):
+    row = (
+        Certification.objects.filter(cert_id=cert_id)
+        .values(
+            "issued_at", "user__first_name", "user__last_name",
+            "lesson__title", "lesson__course__title",
+        )
+        .first()
+    )
+    if row:
+        return {
+            "valid": True,
+            "cert_id": str(cert_id),
+            "type": "lesson",
+            "holder": _holder(row["user__first_name"], row["user__last_name"]),
+            "title": row["lesson__title"],
+            "course": row["lesson__course__title"],
+            "issued_at": row["issued_at"].isoformat(),
+        }
+
+    row = (
+        ScormCertification.objects.filter(cert_id=cert_id)
+        .values(
+            "issued_at", "user__first_name", "user__last_name",
+            "package__title", "package__course__title",
+        )
+        .first()
+    )
+    if row:
+        return {
+            "valid": True,
+            "cert_id": str(cert_id),
+            "type": "scorm",
+            "holder": _holder(row["user__first_name"], row["user__last_name"]),
+            "title": row["package__title"],
+            "course": row["package__course__title"],
+            "issued_at": row["issued_at"].isoformat(),
+        }
+    return None
+
+
+def lookup_certificate(raw_cert_id):
+    """
+    Public details of a certificate, or None. Malformed ids never touch cache or DB.
+    """
+    try:
+        cert_id = uuid.UUID(str(raw_cert_id))
+    except ValueError:
+        return None
+
+    key = VERIFY_KEY.format(cert_id=cert_id)
+    cached = cache.get(key)
+    if cached is None:
+        found = _from_db(cert_id)
+        cached = found or NOT_FOUND
+        ttl = settings.CERT_VERIFY_CACHE_TTL if found else settings.CERT_VERIFY_NEGATIVE_TTL
+        cache.set(key, cached, ttl)
+    return cached if cached["valid"] else None
+
+
+def forget_certificate(cert_id):
+    cache.delete(VERIFY_KEY.format(cert_id=cert_id))
@@ -1,10 +1,14 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.throttling import SimpleRateThrottle
 
-from io import BytesIO
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
+from auth_app.authentication import StatelessJWTAuthentication
+
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 
 
 from .models import (
@@ -21,13 +25,46 @@ from .serializers import (
     CourseProgressSerializer,
     ScormPackageProgressSerializer, 
     CertificationSerializer, 
-    ScormCertificationSerializer
+    ScormCertificationSerializer,
+    EntitlementSerializer,
 )
+from .entitlements import get_entitlements
+from .certificates import render_args, render_pdf, save_pdf
+from .verification import lookup_certificate
+
+
+def certificate_pdf_response(request, kind, cert, filename):
+    """
+    Serve the stored PDF with an ETag (304 on a matching If-None-Match).
+    A certificate whose background render hasn't landed yet, or whose stored
+    file has gone missing, is rendered here.
+    """
+    if cert.pdf_etag and cert.pdf and default_storage.exists(cert.pdf.name):
+        path, etag = cert.pdf.name, cert.pdf_etag
+    else:
+        path, etag = save_pdf(kind, cert.pk, cert.cert_id, render_pdf(*render_args(kind, cert)))
+
+    quoted = f'"{etag}"'
+    if quoted in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(
+            default_storage.open(path, "rb"),
+            as_attachment=True,
+            filename=filename,
+            content_type="application/pdf",
+        )
+    response["ETag"] = quoted
+    response["Cache-Control"] = "private, max-age=86400"
+    return response
+
 
 class LessonProgressViewSet(viewsets.ModelViewSet):
     queryset         = LessonProgress.objects.all()
     serializer_class = LessonProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # completion issues certificates and notifications in-request
+    query_budget = {"list": 3, "retrieve": 3, "create": 8, "complete": 16}
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
@@ -47,6 +84,7 @@ class CourseProgressViewSet(viewsets.ReadOnlyModelViewSet):
     queryset         = CourseProgress.objects.all()
     serializer_class = CourseProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
@@ -56,6 +94,7 @@ class ScormPackageProgressViewSet(viewsets.ReadOnlyModelViewSet):
     queryset         = ScormPackageProgress.objects.all()
     serializer_class = ScormPackageProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
@@ -68,42 +107,19 @@ class CertificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class   = CertificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget       = 4
 
     def get_queryset(self):
         # only show the logged-in user’s certificates
-        return Certification.objects.filter(user=self.request.user)
+        return Certification.objects.filter(user=self.request.user).select_related("user", "lesson")
     
 
     @action(detail=True, methods=["get"])
     def download(self, request, pk=None):
         cert = self.get_object()
-        # create PDF in memory
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer)
-        p.setTitle("Certificate of Completion")
-
-        # Header
-        p.setFont("Helvetica-Bold", 18)
-        p.drawCentredString(300, 800, "Certificate of Completion")
-
-        # Body
-        p.setFont("Helvetica", 12)
-        name = cert.user.get_full_name() or cert.user.username
-        p.drawString(100, 750, f"Presented to: {name}")
-        p.drawString(100, 730, f"For successfully completing lesson:")
-        p.drawString(120, 710, f"\"{cert.lesson.title}\"")
-        p.drawString(100, 690, f"Issued on: {cert.issued_at.date().isoformat()}")
-        p.drawString(100, 670, f"Certificate ID: {cert.cert_id}")
-
-        p.showPage()
-        p.save()
-
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = (
-            f'attachment; filename="certificate_{cert.cert_id}.pdf"'
+        return certificate_pdf_response(
+            request, "lesson", cert, f"certificate_{cert.cert_id}.pdf"
         )
-        return response
 
 
 class ScormCertificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -112,35 +128,53 @@ class ScormCertificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class   = ScormCertificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget       = 4
 
     def get_queryset(self):
-        return ScormCertification.objects.filter(user=self.request.user)
+        return ScormCertification.objects.filter(user=self.request.user).select_related("user", "package")
     
 
     @action(detail=True, methods=["get"])
     def download(self, request, pk=None):
         scert = self.get_object()
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer)
-        p.setTitle("SCORM Completion Certificate")
-
-        p.setFont("Helvetica-Bold", 18)
-        p.drawCentredString(300, 800, "SCORM Completion Certificate")
-
-        p.setFont("Helvetica", 12)
-        name = scert.user.get_full_name() or scert.user.username
-        p.drawString(100, 750, f"Presented to: {name}")
-        p.drawString(100, 730, f"For successfully completing SCORM package:")
-        p.drawString(120, 710, f"\"{scert.package.title}\"")
-        p.drawString(100, 690, f"Issued on: {scert.issued_at.date().isoformat()}")
-        p.drawString(100, 670, f"Certificate ID: {scert.cert_id}")
-
-        p.showPage()
-        p.save()
-
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = (
-            f'attachment; filename="scorm_certificate_{scert.cert_id}.pdf"'
+        return certificate_pdf_response(
+            request, "scorm", scert, f"scorm_certificate_{scert.cert_id}.pdf"
         )
-        return response
\ No newline at end of file
+
+
+class EntitlementView(APIView):
+    """
+    GET /progress/entitlements/ → everything the "My Learning" page needs,
+    one row per enrolled course.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    query_budget = 7
+
+    def get(self, request):
+        rows = get_entitlements(request.user.id)
+        return Response(EntitlementSerializer(rows, many=True).data)
+
+
+class CertificateVerifyThrottle(SimpleRateThrottle):
+    """Per-IP limit on public lookups (REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["cert_verify"])."""
+    scope = "cert_verify"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class CertificateVerifyView(APIView):
+    """
+    GET /progress/certs/verify/<cert_id>/ → public, read-only certificate check.
+    """
+    authentication_classes = ()
+    permission_classes = [permissions.AllowAny]
+    query_budget = 2
+    throttle_classes = [CertificateVerifyThrottle]
+
+    def get(self, request, cert_id):
+        details = lookup_certificate(cert_id)
+        if details is None:
+            return Response({"valid": False}, status=status.HTTP_404_NOT_FOUND)
+        return Response(details)
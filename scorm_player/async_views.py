@@ -0,0 +1,35 @@
+"""
+Async variant of the SCORM runtime ping (see tem_backend.asyncapi). SCOs
+commit often and in bursts; here the request waits on the database without
+holding a worker thread between queries.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+
+from payments.permissions import IsEnrolled
+from tem_backend.asyncapi import aget_object_or_404, async_api_view
+from tem_backend.instrumentation import query_budget
+from .models import Sco, RuntimeData
+from .serializers import RuntimeDataSerializer
+
+
+# RuntimePingView's 9, plus the user row that token auth fetches
+@query_budget(10)
+@async_api_view(["GET", "POST"])
+async def runtime_ping(request, sco_id):
+    sco = await aget_object_or_404(Sco.objects.select_related("package__course"), id=sco_id)
+    if not await sync_to_async(IsEnrolled().has_object_permission)(request, None, sco):
+        raise PermissionDenied()
+    rd, _ = await RuntimeData.objects.aget_or_create(user=request.user, sco=sco, attempt=1)
+
+    if request.method == "GET":
+        return JsonResponse(RuntimeDataSerializer(rd).data)
+
+    serializer = RuntimeDataSerializer(rd, data=request.data, partial=True)
+    serializer.is_valid(raise_exception=True)
+    # Merge incoming CMI values with existing data
+    rd.data.update(serializer.validated_data.get("data", {}))
+    await rd.asave()
+    return JsonResponse(RuntimeDataSerializer(rd).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,260 @@
+"""
+Load generator for the SCORM runtime endpoint.
+
+Simulates learners driving `api_adapter.js`: LMSInitialize fetches the
+runtime snapshot, bursts of LMSSetValue calls stay client-side until an
+LMSCommit posts them, and LMSFinish posts the final lesson status. Each
+learner is one asyncio task holding a keep-alive HTTP/1.1 connection
+(stdlib only: asyncio streams, no third-party client).
+
+While the run is in progress, `LockSampler` polls the database for sessions
+blocked on a lock (PostgreSQL only), so write-path changes can be compared on
+contention as well as latency.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+from django.db import connection, connections
+
+Learner = namedtuple("Learner", "token sco_id")
+
+OPS = ("initialize", "commit", "finish")
+
+
+# ─── Minimal HTTP/1.1 client ────────────────────────────────────────────
+
+class Connection:
+    """One keep-alive connection; reconnects transparently if the server closes it."""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.writer = None
+
+    async def request(self, method, path, headers, body=b""):
+        for attempt in (1, 2):
+            if self.writer is None:
+                await self._connect()
+            try:
+                return await asyncio.wait_for(self._send(method, path, headers, body), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # stale keep-alive socket; retry once on a fresh one
+                await self.close()
+                if attempt == 2:
+                    raise
+
+    async def _send(self, method, path, headers, body):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while (line := await self.reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            payload = b""
+            while size := int((await self.reader.readuntil(b"\r\n")).strip(), 16):
+                payload += await self.reader.readexactly(size + 2)
+            await self.reader.readuntil(b"\r\n")
+        else:
+            payload = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, payload
+
+
+# ─── Learner sessions ───────────────────────────────────────────────────
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)   # op → [ms]
+        self.statuses = defaultdict(Counter)  # op → {status: n}
+        self.errors = Counter()               # exception class → n
+
+    def record(self, op, ms, status):
+        self.latencies[op].append(ms)
+        self.statuses[op][status] += 1
+
+
+async def _call(conn, recorder, op, method, path, token, data=None):
+    body = json.dumps(data).encode() if data is not None else b""
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    if data is not None:
+        headers["Content-Type"] = "application/json"
+    start = time.perf_counter()
+    try:
+        status, _ = await conn.request(method, path, headers, body)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+        recorder.errors[type(exc).__name__] += 1
+        status = None
+    recorder.record(op, (time.perf_counter() - start) * 1000, status)
+
+
+def _cmi_value(rng, n):
+    return rng.choice((
+        ("cmi.core.lesson_location", f"page-{n}"),
+        ("cmi.core.session_time", f"00:{n % 60:02d}:{rng.randint(0, 59):02d}"),
+        ("cmi.core.score.raw", str(rng.randint(0, 100))),
+        ("cmi.suspend_data", "x" * rng.randint(32, 1024)),
+        ("cmi.core.lesson_status", "incomplete"),
+    ))
+
+
+async def learner_session(learner, base, recorder, rng, commits, burst, think_ms, timeout):
+    url = urlsplit(base)
+    path = f"{url.path.rstrip('/')}/api/v1/scorm/runtime/{learner.sco_id}/"
+    conn = Connection(url.hostname, url.port or 80, timeout)
+    data = {}
+    try:
+        await _call(conn, recorder, "initialize", "GET", path, learner.token)
+        for n in range(commits):
+            for _ in range(burst):                  # LMSSetValue: client-side only
+                key, value = _cmi_value(rng, n)
+                data[key] = value
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think_ms / 1000)
+            await _call(conn, recorder, "commit", "POST", path, learner.token, {"data": data})
+        data["cmi.core.lesson_status"] = "completed"
+        await _call(conn, recorder, "finish", "POST", path, learner.token, {"data": data})
+    finally:
+        await conn.close()
+
+
+# ─── Lock-wait sampling ─────────────────────────────────────────────────
+
+class LockSampler:
+    """Background thread counting sessions waiting on a lock, every `interval` s."""
+
+    QUERY = (
+        "SELECT count(*) FROM pg_stat_activity "
+        "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+    )
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.samples = []
+        self.supported = connection.vendor == "postgresql"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        conn = connections.create_connection("default")
+        try:
+            while not self._stop.wait(self.interval):
+                with conn.cursor() as cursor:
+                    cursor.execute(self.QUERY)
+                    self.samples.append(cursor.fetchone()[0])
+        finally:
+            conn.close()
+
+    def __enter__(self):
+        if self.supported:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.supported:
+            self._stop.set()
+            self._thread.join()
+
+    def report(self):
+        if not self.supported:
+            return {"supported": False, "reason": f"not available on {connection.vendor}"}
+        waiting = [n for n in self.samples if n]
+        return {
+            "supported": True,
+            "samples": len(self.samples),
+            "samples_with_waiters": len(waiting),
+            "max_waiters": max(self.samples, default=0),
+            "mean_waiters": round(sum(self.samples) / len(self.samples), 3) if self.samples else 0,
+        }
+
+
+# ─── Run and report ─────────────────────────────────────────────────────
+
+def _percentile(ordered, q):
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _latency(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def _run(learners, base, recorder, rng_seed, commits, burst, think_ms, ramp_up, timeout):
+    async def start(i, learner):
+        if ramp_up:
+            await asyncio.sleep(ramp_up * i / len(learners))
+        await learner_session(
+            learner, base, recorder, random.Random(rng_seed + i), commits, burst, think_ms, timeout
+        )
+    await asyncio.gather(*(start(i, learner) for i, learner in enumerate(learners)))
+
+
+def run(learners, base, commits=10, burst=8, think_ms=200, ramp_up=0.0, timeout=30.0,
+        rng_seed=0, sample_locks=True):
+    """Drive every learner to LMSFinish; returns the report dict."""
+    recorder = Recorder()
+    sampler = LockSampler() if sample_locks else None
+    started = time.perf_counter()
+    with sampler or nullcontext():
+        asyncio.run(_run(learners, base, recorder, rng_seed, commits, burst, think_ms, ramp_up, timeout))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter()
+    for counts in recorder.statuses.values():
+        statuses.update(counts)
+    total = sum(statuses.values())
+    failed = sum(n for status, n in statuses.items() if status is None or status >= 400)
+    return {
+        "config": {
+            "learners": len(learners), "commits": commits, "burst": burst,
+            "think_ms": think_ms, "ramp_up_s": ramp_up, "target": base,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "error_rate": round(failed / total, 4) if total else None,
+        "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        "exceptions": dict(recorder.errors),
+        "latency": {
+            "all": _latency([ms for op in OPS for ms in recorder.latencies[op]]),
+            **{op: _latency(recorder.latencies[op]) for op in OPS},
+        },
+        "lock_waits": sampler.report() if sampler else None,
+    }
@@ -0,0 +1,75 @@
+import json
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from payments.models import Enrollment
+from scorm_player.loadtest import Learner, run
+from scorm_player.models import Sco
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent learners driving the SCORM runtime API "
+        "(LMSSetValue bursts, LMSCommit, LMSFinish) against a running server "
+        "and report throughput, latency percentiles, lock waits and errors as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000",
+                            help="Base URL of the server under test.")
+        parser.add_argument("--learners", type=int, default=50)
+        parser.add_argument("--commits", type=int, default=10, help="LMSCommit calls per learner.")
+        parser.add_argument("--burst", type=int, default=8, help="LMSSetValue calls per commit.")
+        parser.add_argument("--think-ms", type=int, default=200, help="Mean pause before each commit.")
+        parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds to stagger learner starts over.")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--no-lock-sampling", action="store_true")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+
+    def handle(self, *args, **opts):
+        if opts["learners"] < 1:
+            raise CommandError("--learners must be at least 1.")
+        learners = self._learners(opts["learners"])
+        report = run(
+            learners, opts["url"],
+            commits=opts["commits"], burst=opts["burst"], think_ms=opts["think_ms"],
+            ramp_up=opts["ramp_up"], timeout=opts["timeout"], rng_seed=opts["seed"],
+            sample_locks=not opts["no_lock_sampling"],
+        )
+        body = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(body + "\n")
+            self.stdout.write(f"report written to {opts['output']}")
+        else:
+            self.stdout.write(body)
+
+    def _learners(self, n):
+        """Distinct active enrollees in courses with SCOs, each on one of their SCOs."""
+        scos = {}
+        for sco_id, course_id in Sco.objects.order_by("pk").values_list("pk", "package__course_id"):
+            scos.setdefault(course_id, sco_id)
+        enrollments = (
+            Enrollment.objects.active()
+            .filter(course_id__in=list(scos))
+            .select_related("user")
+            .order_by("user_id", "pk")
+        )
+        learners, seen = [], set()
+        for enrollment in enrollments.iterator():
+            if enrollment.user_id in seen:
+                continue
+            seen.add(enrollment.user_id)
+            token = str(AccessToken.for_user(enrollment.user))
+            learners.append(Learner(token, scos[enrollment.course_id]))
+            if len(learners) == n:
+                return learners
+        if not learners:
+            raise CommandError("No active enrollments in a course with SCOs; run seed_data first.")
+        self.stderr.write(
+            f"Only {len(learners)} distinct learner(s) available; reusing them for {n} sessions."
+        )
+        return list(islice(cycle(learners), n))
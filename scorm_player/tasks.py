@@ -1,10 +1,9 @@
 from celery import shared_task
-from django.core.mail import send_mail
-from django.conf import settings
+from notifications.mail import enqueue_email
 from .models import ScormPackage
 from .upload import handle_scorm_upload
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+@shared_task(bind=True, workload="media", autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
 def extract_and_notify(self, package_id):
     """
     1) Unzip & parse the SCORM package.
@@ -15,15 +14,17 @@ def extract_and_notify(self, package_id):
         handle_scorm_upload(pkg)
         subject = f"SCORM Package “{pkg.title}” Parsed Successfully"
         msg = "Your SCORM package has been processed and is ready to launch."
+        outcome = "ok"
     except Exception as e:
         subject = f"Error Parsing SCORM Package “{pkg.title}”"
         msg = f"We encountered an error while processing:\n\n{e}"
+        outcome = "error"
         raise  # let Celery retry
     finally:
-        send_mail(
+        # one email per outcome, however many times Celery retries
+        enqueue_email(
+            pkg.uploaded_by.email,
             subject,
             msg,
-            settings.DEFAULT_FROM_EMAIL,
-            [pkg.uploaded_by.email],
-            fail_silently=True,
+            dedupe_key=f"scorm-extract:{pkg.id}:{outcome}",
         )
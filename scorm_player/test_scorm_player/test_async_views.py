@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from courses.models import Course
+from payments.models import Enrollment
+from scorm_player.models import ScormPackage, Sco, RuntimeData
+from tem_backend.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class AsyncRuntimePingTests(QueryBudgetMixin, TestCase):
+    # constructor headers are ignored by 4.2's AsyncClient, so each request passes its own
+    def setUp(self):
+        self.instructor = User.objects.create_user(email="asc-inst@x.com", password="pass")
+        self.student = User.objects.create_user(email="asc-stud@x.com", password="pass")
+        self.course = Course.objects.create(
+            title="SC", description="d", price=0, instructor=self.instructor
+        )
+        pkg = ScormPackage.objects.create(
+            title="P", course=self.course, file="p.zip", uploaded_by=self.instructor
+        )
+        self.sco = Sco.objects.create(package=pkg, identifier="i0", launch_url="index.html",
+                                      title="S0", sequence=0)
+        self.url = reverse("scorm:scorm-runtime-async", args=[self.sco.id])
+        self.auth = {"authorization": f"Bearer {RefreshToken.for_user(self.student).access_token}"}
+
+    async def test_requires_a_token(self):
+        res = await self.async_client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_requires_enrollment(self):
+        res = await self.async_client.get(self.url, headers=self.auth)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_unknown_sco_is_404(self):
+        url = reverse("scorm:scorm-runtime-async", args=[self.sco.id + 99])
+        res = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_method_not_allowed(self):
+        res = await self.async_client.delete(self.url, headers=self.auth)
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_ping_merges_cmi_values(self):
+        await Enrollment.objects.acreate(user=self.student, course=self.course)
+        for values in ({"cmi.core.lesson_status": "incomplete"}, {"cmi.core.score.raw": "80"}):
+            res = await self.async_client.post(self.url, {"data": values},
+                                               content_type="application/json", headers=self.auth)
+            self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+            self.assertWithinQueryBudget(res)
+
+        rd = await RuntimeData.objects.aget(user=self.student, sco=self.sco)
+        self.assertEqual(rd.data, {"cmi.core.lesson_status": "incomplete", "cmi.core.score.raw": "80"})
+        res = await self.async_client.get(self.url, headers=self.auth)
+        self.assertEqual(res.json()["data"], rd.data)
+
@@ -0,0 +1,64 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.servers.basehttp import WSGIServer
+from django.test import LiveServerTestCase
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+
+from courses.models import Course
+from payments.models import Enrollment
+from scorm_player.models import ScormPackage, Sco, RuntimeData
+
+User = get_user_model()
+
+
+class SerialLiveServerThread(LiveServerThread):
+    # the threaded server would share one in-memory SQLite connection between
+    # request threads; a serial server closes each connection instead, which
+    # the load generator reconnects through
+    def _create_server(self, connections_override=None):
+        return WSGIServer((self.host, self.port), QuietWSGIRequestHandler, allow_reuse_address=False)
+
+
+class ScormLoadTestCommandTests(LiveServerTestCase):
+    server_thread_class = SerialLiveServerThread
+
+    def setUp(self):
+        instructor = User.objects.create_user(email="lt-inst@x.com", password="pass")
+        course = Course.objects.create(title="LT", description="d", price=0, instructor=instructor)
+        package = ScormPackage.objects.create(
+            title="P", course=course, file="p.zip", uploaded_by=instructor
+        )
+        self.sco = Sco.objects.create(package=package, identifier="i", launch_url="index.html", title="S")
+        for n in range(3):
+            learner = User.objects.create_user(email=f"lt{n}@x.com", password="pass")
+            Enrollment.objects.create(user=learner, course=course)
+
+    def test_drives_learners_to_finish(self):
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as out:
+            call_command(
+                "scorm_loadtest", url=self.live_server_url, learners=3, commits=2, burst=3,
+                think_ms=0, output=out.name, stdout=StringIO(),
+            )
+            report = json.load(out)
+
+        self.assertEqual(report["requests"], 3 * (1 + 2 + 1))
+        self.assertEqual(report["error_rate"], 0)
+        self.assertEqual(report["latency"]["commit"]["count"], 6)
+        self.assertGreater(report["throughput_rps"], 0)
+        self.assertFalse(report["lock_waits"]["supported"])   # SQLite
+        statuses = [rd.data["cmi.core.lesson_status"] for rd in RuntimeData.objects.filter(sco=self.sco)]
+        self.assertEqual(statuses, ["completed"] * 3)
+
+    def test_unreachable_server_counts_as_errors(self):
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as out:
+            call_command(
+                "scorm_loadtest", url="http://127.0.0.1:9", learners=1, commits=1,
+                think_ms=0, timeout=2, output=out.name, stdout=StringIO(),
+            )
+            report = json.load(out)
+        self.assertEqual(report["error_rate"], 1.0)
+        self.assertTrue(report["exceptions"])
@@ -0,0 +1,76 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from courses.models import Course
+from payments.models import Enrollment
+from scorm_player.models import ScormPackage, Sco, RuntimeData
+from tem_backend.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class ScormViewsTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(email="sc-inst@x.com", password="pass")
+        self.student = User.objects.create_user(email="sc-stud@x.com", password="pass")
+        self.course = Course.objects.create(
+            title="SC", description="d", price=0, instructor=self.instructor
+        )
+        self.pkg = ScormPackage.objects.create(
+            title="P", course=self.course, file="p.zip", uploaded_by=self.instructor
+        )
+        self.scos = [
+            Sco.objects.create(package=self.pkg, identifier=f"i{n}", launch_url="index.html",
+                               title=f"S{n}", sequence=n)
+            for n in range(3)
+        ]
+        self.runtime_url = reverse("scorm:scorm-runtime", args=[self.scos[0].id])
+        self.client.force_authenticate(self.student)
+
+    def enroll(self):
+        Enrollment.objects.create(user=self.student, course=self.course)
+
+    def test_sco_list_within_budget(self):
+        self.enroll()
+        res = self.client.get(reverse("scorm:scorm-sco-list", args=[self.pkg.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([s["title"] for s in res.data], ["S0", "S1", "S2"])
+        self.assertWithinQueryBudget(res)
+
+    def test_sco_list_requires_enrollment(self):
+        res = self.client.get(reverse("scorm:scorm-sco-list", args=[self.pkg.id]))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_sco_list_open_to_instructor(self):
+        self.client.force_authenticate(self.instructor)
+        res = self.client.get(reverse("scorm:scorm-sco-list", args=[self.pkg.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_packages_by_course_within_budget(self):
+        res = self.client.get(reverse("scorm:scorm-packages-by-course", args=[self.course.id]))
+        self.assertEqual(len(res.data), 1)
+        self.assertWithinQueryBudget(res)
+
+    def test_runtime_requires_enrollment(self):
+        res = self.client.get(self.runtime_url)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_runtime_open_to_instructor(self):
+        self.client.force_authenticate(self.instructor)
+        res = self.client.get(self.runtime_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_runtime_ping_within_budget(self):
+        self.enroll()
+        res = self.client.post(
+            self.runtime_url, {"data": {"cmi.core.lesson_status": "incomplete"}}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertWithinQueryBudget(res)
+
+        res = self.client.get(self.runtime_url)
+        self.assertEqual(res.data["data"], {"cmi.core.lesson_status": "incomplete"})
+        self.assertWithinQueryBudget(res)
+        self.assertEqual(RuntimeData.objects.count(), 1)
@@ -6,12 +6,14 @@ from .views import (
     RuntimePingView,
     ScormPackageListByCourse
 )
+from .async_views import runtime_ping
 
 urlpatterns = [
     path("packages/", ScormPackageUploadView.as_view(), name="scorm-upload"),
     path("packages/<int:package_id>/scos/", ScoListView.as_view(), name="scorm-sco-list"),
     path("launch/<int:sco_id>/", LaunchScoView.as_view(), name="scorm-launch"),
     path("runtime/<int:sco_id>/", RuntimePingView.as_view(), name="scorm-runtime"),
+    path("async/runtime/<int:sco_id>/", runtime_ping, name="scorm-runtime-async"),
     path(
       "courses/<int:course_id>/packages/",ScormPackageListByCourse.as_view(), name="scorm-packages-by-course"),
 ]
\ No newline at end of file
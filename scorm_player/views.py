@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404, render
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from outbox.relay import publish
 from payments.permissions import IsEnrolled
 from .permissions import IsCourseInstructor
 
@@ -20,12 +21,13 @@ class ScormPackageUploadView(generics.CreateAPIView):
     queryset = ScormPackage.objects.all()
     serializer_class = ScormPackageUploadSerializer
     permission_classes = (permissions.IsAuthenticated, IsCourseInstructor)
+    query_budget = 9
 
     def perform_create(self, serializer):
         package = serializer.save(uploaded_by=self.request.user)
-        # enqueue background processing
+        # background processing, once the upload has committed
         from .tasks import extract_and_notify
-        extract_and_notify.delay(package.id)
+        publish(extract_and_notify, (package.id,), dedupe_key=f"scorm-extract:{package.id}")
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -39,6 +41,7 @@ class ScormPackageListByCourse(generics.ListAPIView):
     """
     serializer_class = ScormPackageUploadSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    query_budget = 3
 
     def get_queryset(self):
         course_id = self.kwargs["course_id"]
@@ -48,7 +51,16 @@ class ScormPackageListByCourse(generics.ListAPIView):
 
 class ScoListView(generics.ListAPIView):
     serializer_class = ScoSerializer
-    permission_classes = (permissions.IsAuthenticated, IsEnrolled())
+    permission_classes = (permissions.IsAuthenticated, IsEnrolled)
+    query_budget = 3
+
+    def list(self, request, *args, **kwargs):
+        # IsEnrolled is an object permission, which a list never checks on its own
+        package = get_object_or_404(
+            ScormPackage.objects.select_related("course"), pk=self.kwargs["package_id"]
+        )
+        self.check_object_permissions(request, package)
+        return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
         return Sco.objects.filter(package_id=self.kwargs["package_id"]).order_by("sequence")
@@ -56,10 +68,12 @@ class ScoListView(generics.ListAPIView):
 # ───────── Launch view ───────── #
 
 class LaunchScoView(views.APIView):
-    permission_classes = (permissions.IsAuthenticated, IsEnrolled())
+    permission_classes = (permissions.IsAuthenticated, IsEnrolled)
+    query_budget = 3
 
     def get(self, request, sco_id):
-        sco = get_object_or_404(Sco, id=sco_id)
+        sco = get_object_or_404(Sco.objects.select_related("package__course"), id=sco_id)
+        self.check_object_permissions(request, sco)
         return render(request, "scorm_player/launch_iframe.html", {"sco": sco})
 
 # ───────── Runtime API ───────── #
@@ -69,19 +83,25 @@ class RuntimePingView(views.APIView):
     POST → append/update runtime data sent by the SCO
     GET  → fetch current runtime snapshot for this user & SCO
     """
-    permission_classes = (permissions.IsAuthenticated, IsEnrolled())
+    permission_classes = (permissions.IsAuthenticated, IsEnrolled)
+    query_budget = 9
+
+    def get_sco(self, request, sco_id):
+        sco = get_object_or_404(Sco.objects.select_related("package__course"), id=sco_id)
+        self.check_object_permissions(request, sco)
+        return sco
 
     def get_object(self, user, sco):
         obj, _ = RuntimeData.objects.get_or_create(user=user, sco=sco, attempt=1)
         return obj
 
     def get(self, request, sco_id):
-        sco = get_object_or_404(Sco, id=sco_id)
+        sco = self.get_sco(request, sco_id)
         rd = self.get_object(request.user, sco)
         return Response(RuntimeDataSerializer(rd).data)
 
     def post(self, request, sco_id):
-        sco = get_object_or_404(Sco, id=sco_id)
+        sco = self.get_sco(request, sco_id)
         rd = self.get_object(request.user, sco)
 
         serializer = RuntimeDataSerializer(rd, data=request.data, partial=True)
@@ -2,7 +2,7 @@ from celery import shared_task
 from .models import Organization, TeamAnalyticsSnapshot, TeamMember
 from progress.models import LessonProgress 
 
-@shared_task
+@shared_task(workload="bulk")
 def snapshot_team_analytics():
     """
     Compute seat & learning metrics for every org and save a snapshot.
@@ -11,6 +11,8 @@ from .serializers import (
 )
 from .permissions import IsTeamAdmin, IsTeamMember
 from payments.services import process_team_checkout
+from progress.certificates import certificate_files, iter_zip
+from django.http import StreamingHttpResponse
 from dj_rest_auth.registration.views import RegisterView
 from dj_rest_auth.views import LoginView
 from rest_framework.exceptions import PermissionDenied
@@ -83,6 +85,21 @@ class OrganizationViewSet(viewsets.ModelViewSet):
             "pending_invites": org.members.filter(status="pending").count(),
         })
     
+    @action(detail=True, methods=["get"], permission_classes=[IsTeamAdmin])
+    def certificates(self, request, pk=None):
+        """
+        Stream a ZIP of every active member's certificates.
+        """
+        org = self.get_object()
+        members = TeamMember.objects.filter(
+            organization=org, status=TeamMember.ACTIVE
+        ).values("user_id")
+        response = StreamingHttpResponse(
+            iter_zip(certificate_files(members)), content_type="application/zip"
+        )
+        response["Content-Disposition"] = f'attachment; filename="certificates_org_{org.pk}.zip"'
+        return response
+
     @action(detail=True, methods=["get"], permission_classes=[IsTeamAdmin])
     def analytics(self, request, pk=None):
         """
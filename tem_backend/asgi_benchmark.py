@@ -0,0 +1,255 @@
+"""
+WSGI vs ASGI throughput for the I/O-bound endpoints.
+
+Each scenario pairs a sync endpoint with its async variant (see
+tem_backend.asyncapi) and drives both through Django's real handlers in
+this process, at the same worker count:
+
+  • WSGI: WSGIHandler behind `threads` worker threads, like one gthread
+    worker; clients beyond that wait for a free thread.
+  • ASGI: ASGIHandler on one event loop, like one uvicorn worker.
+
+`concurrency` clients each send their next request as soon as the last one
+answers, until `requests` have completed. Paystack is replaced by a stub that
+answers after `gateway_ms`, so the result shows what waiting on the gateway
+costs each path, not Paystack's own latency. Runs against whatever is in the
+database (normally a `seed_data` dataset) and writes pending payment
+transactions as it goes.
+
+The async payment views still wait on the gateway in a thread: the async
+client offloads to the sync one on a pool of PAYSTACK_POOL_SIZE threads.
+With more clients in flight than that, the ASGI payment numbers measure the
+pool, not the event loop (`gateway_threads` in the report).
+"""
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from courses.models import Course
+from payments.gateway import PaystackClient
+from payments.models import PaymentTransaction
+from .benchmark import ScenarioUnavailable, _percentile, runtime_ping
+
+Pair = namedtuple("Pair", "method sync_path async_path user body")
+
+
+def _learner():
+    user = get_user_model().objects.filter(is_staff=False).order_by("pk").first()
+    if user is None:
+        raise ScenarioUnavailable("no users")
+    return user.pk
+
+
+def payment_init():
+    course = Course.objects.order_by("pk").first()
+    if course is None:
+        raise ScenarioUnavailable("no courses")
+    return Pair(
+        "POST", reverse("payments:init-transaction"), reverse("payments:async-init-transaction"),
+        _learner(), {"course_id": course.pk},
+    )
+
+
+def payment_verify():
+    course = Course.objects.order_by("pk").first()
+    if course is None:
+        raise ScenarioUnavailable("no courses")
+    trx = PaymentTransaction.objects.create(
+        user_id=_learner(), course=course, amount=100, reference=f"bench-{uuid.uuid4().hex}",
+    )
+    return Pair(
+        "POST", reverse("payments:verify-transaction"), reverse("payments:async-verify-transaction"),
+        trx.user_id, {"reference": trx.reference},
+    )
+
+
+def runtime():
+    request = runtime_ping()
+    sco_id = request.path.rstrip("/").rsplit("/", 1)[1]
+    return Pair(
+        "POST", request.path, reverse("scorm:scorm-runtime-async", args=[sco_id]),
+        request.user, request.data,
+    )
+
+
+SCENARIOS = {
+    "payment_init": payment_init,
+    "payment_verify": payment_verify,
+    "runtime_ping": runtime,
+}
+
+
+def _stub_gateway(gateway_ms):
+    """Patch the sync client, which the async one offloads to, with a fixed wait."""
+    def request(self, method, path, **kwargs):
+        time.sleep(gateway_ms / 1000)
+        if path.startswith("/transaction/verify/"):
+            return {"status": True, "data": {"status": "abandoned"}}
+        return {"status": True, "data": {"authorization_url": "https://checkout.invalid/bench"}}
+    return mock.patch.object(PaystackClient, "_request", request)
+
+
+def _body(pair):
+    return json.dumps(pair.body).encode() if pair.body is not None else b""
+
+
+def _wsgi_call(app, pair, path, token, host):
+    body = _body(pair)
+    environ = {
+        "REQUEST_METHOD": pair.method, "PATH_INFO": path, "QUERY_STRING": "",
+        "SERVER_NAME": host, "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host, "HTTP_AUTHORIZATION": f"Bearer {token}",
+        "CONTENT_TYPE": "application/json", "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": BytesIO(body), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+        "wsgi.version": (1, 0), "wsgi.multithread": True, "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    status = []
+    result = app(environ, lambda s, headers, exc_info=None: status.append(int(s[:3])))
+    try:
+        b"".join(result)
+    finally:
+        getattr(result, "close", lambda: None)()
+    return status[0]
+
+
+async def _asgi_call(app, pair, path, token, host):
+    body = _body(pair)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": pair.method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 0), "server": (host, 80),
+        "headers": [
+            (b"host", host.encode()), (b"authorization", f"Bearer {token}".encode()),
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return pending.pop() if pending else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+def _summarize(latencies, statuses, wall):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / wall, 1),
+        "p50_ms": round(_percentile(ordered, 0.50), 2),
+        "p95_ms": round(_percentile(ordered, 0.95), 2),
+        "p99_ms": round(_percentile(ordered, 0.99), 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "errors": sum(1 for s in statuses if s >= 400),
+        "status": sorted(set(statuses)),
+    }
+
+
+def run_wsgi(pair, token, requests, concurrency, threads, host):
+    app = WSGIHandler()
+    worker_slots = threading.BoundedSemaphore(threads)
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    latencies, statuses = [], []
+
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            start = time.perf_counter()
+            with worker_slots:
+                status = _wsgi_call(app, pair, pair.sync_path, token, host)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return _summarize(latencies, statuses, time.perf_counter() - start)
+
+
+def run_asgi(pair, token, requests, concurrency, host):
+    app = ASGIHandler()
+    latencies, statuses = [], []
+
+    async def client(remaining):
+        while next(remaining, None) is not None:
+            start = time.perf_counter()
+            statuses.append(await _asgi_call(app, pair, pair.async_path, token, host))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def main():
+        remaining = iter(range(requests))
+        start = time.perf_counter()
+        await asyncio.gather(*(client(remaining) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    # the event loop runs on its own thread, as a server's would
+    with ThreadPoolExecutor(max_workers=1) as loop_thread:
+        wall = loop_thread.submit(asyncio.run, main()).result()
+    return _summarize(latencies, statuses, wall)
+
+
+def run(names=None, requests=200, concurrency=50, threads=4, gateway_ms=200, host="localhost"):
+    results, skipped = {}, {}
+    with _stub_gateway(gateway_ms):
+        for name in names or SCENARIOS:
+            try:
+                pair = SCENARIOS[name]()
+            except ScenarioUnavailable as exc:
+                skipped[name] = str(exc)
+                continue
+            token = str(RefreshToken.for_user(get_user_model().objects.get(pk=pair.user)).access_token)
+            wsgi = run_wsgi(pair, token, requests, concurrency, threads, host)
+            asgi = run_asgi(pair, token, requests, concurrency, host)
+            results[name] = {
+                "wsgi": wsgi,
+                "asgi": asgi,
+                "speedup": round(asgi["throughput_rps"] / wsgi["throughput_rps"], 2)
+                if wsgi["throughput_rps"] else None,
+            }
+    return {
+        "meta": {
+            "at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "requests": requests,
+            "concurrency": concurrency,
+            "wsgi_threads": threads,
+            "gateway_ms": gateway_ms,
+            "gateway_threads": settings.PAYSTACK_POOL_SIZE,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
@@ -0,0 +1,64 @@
+"""
+Plain async views for I/O-bound endpoints.
+
+DRF's views are sync, so under ASGI each one runs on a thread for its whole
+duration, gateway round-trips included. The endpoints that mostly wait
+(payment initialise/verify, the SCORM runtime ping) also have async
+variants built on `async_api_view`, which gives them what APIView would:
+
+  • allowed methods (405 otherwise), CSRF exemption
+  • JWT auth via auth_app.authentication.aauthenticate (401 without a user)
+  • `request.data`, the parsed JSON body
+  • DRF-shaped JSON errors for ValidationError, PermissionDenied and Http404
+
+Served natively by the ASGI app (tem_backend.asgi). Under WSGI Django would
+run each one in a fresh event loop, so WSGI clients should keep using the
+sync endpoints. `manage.py benchmark_asgi` compares the two paths.
+"""
+import json
+from functools import wraps
+
+from django.http import Http404, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from auth_app.authentication import aauthenticate
+
+
+def _error(detail, code):
+    return JsonResponse(detail if isinstance(detail, (dict, list)) else {"detail": detail}, status=code, safe=False)
+
+
+def async_api_view(methods):
+    methods = {m.upper() for m in methods}
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return _error(f'Method "{request.method}" not allowed.', status.HTTP_405_METHOD_NOT_ALLOWED)
+            request.user = await aauthenticate(request)
+            if request.user is None:
+                return _error("Authentication credentials were not provided or are invalid.",
+                              status.HTTP_401_UNAUTHORIZED)
+            try:
+                request.data = json.loads(request.body or b"{}")
+            except ValueError:
+                return _error("JSON parse error.", status.HTTP_400_BAD_REQUEST)
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return _error("Not found.", status.HTTP_404_NOT_FOUND)
+            except APIException as exc:   # ValidationError, PermissionDenied, …
+                return _error(exc.detail, exc.status_code)
+
+        wrapper.csrf_exempt = True   # JWT, not cookies; csrf_exempt() would hide the coroutine in 4.2
+        return wrapper
+    return decorator
+
+
+async def aget_object_or_404(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        raise Http404
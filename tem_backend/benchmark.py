@@ -0,0 +1,223 @@
+"""
+In-process endpoint benchmarks.
+
+Each scenario issues a real request through the full middleware stack
+(JWT auth included) with DRF's test client, against whatever data is in the
+database (normally a `seed_data` dataset). Latency is measured around the
+request; query count and DB time come from InstrumentationMiddleware.
+Results are plain JSON so runs from before and after a change can be diffed
+with `benchmark --compare`.
+"""
+import platform
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from courses.models import Quiz
+from payments.models import Enrollment
+from scorm_player.models import Sco
+from teams.models import Organization
+from .seed import SEED_DOMAIN
+
+Request = namedtuple("Request", "method path user data")
+
+
+class ScenarioUnavailable(Exception):
+    """The database has nothing this scenario can run against."""
+
+
+def _seeded_learner():
+    """A seeded learner with the most enrollments (a heavy dashboard)."""
+    row = (
+        Enrollment.objects.filter(user__email__endswith=f"@{SEED_DOMAIN}")
+        .values("user").annotate(n=Count("id")).order_by("-n").first()
+    )
+    if row is None:
+        raise ScenarioUnavailable("no enrolled learners; run seed_data first")
+    return row["user"]
+
+
+def catalog():
+    return Request("get", reverse("courses:courses-list"), _seeded_learner(), None)
+
+
+def featured():
+    return Request("get", reverse("courses:courses-featured"), _seeded_learner(), None)
+
+
+def runtime_ping():
+    enrollment = (
+        Enrollment.objects.filter(course__scorm_packages__isnull=False, is_active=True)
+        .order_by("pk").values("user_id", "course_id").first()
+    )
+    if enrollment is None:
+        raise ScenarioUnavailable("no enrollment in a course with a SCORM package")
+    sco = Sco.objects.filter(package__course_id=enrollment["course_id"]).order_by("pk").first()
+    return Request(
+        "post", reverse("scorm:scorm-runtime", args=[sco.pk]), enrollment["user_id"],
+        {"data": {"cmi.core.lesson_status": "incomplete", "cmi.core.session_time": "00:01:00"}},
+    )
+
+
+def quiz_submit():
+    quiz = Quiz.objects.order_by("pk").prefetch_related("questions__choices").first()
+    if quiz is None:
+        raise ScenarioUnavailable("no quizzes")
+    course_id = quiz.lesson.course_id or quiz.lesson.module.course_id
+    user = Enrollment.objects.filter(course_id=course_id).values_list("user_id", flat=True).first()
+    answers = {str(q.pk): q.choices.all()[0].pk for q in quiz.questions.all()}
+    return Request(
+        "post", reverse("courses:quizzesubmit-submit", args=[quiz.pk]), user,
+        {"answers": answers},
+    )
+
+
+def dashboard():
+    return Request("get", reverse("progress:entitlements"), _seeded_learner(), None)
+
+
+def analytics():
+    org = (
+        Organization.objects.filter(analytics_snapshots__isnull=False)
+        .annotate(n=Count("members")).order_by("-n").first()
+    )
+    if org is None:
+        raise ScenarioUnavailable("no organisation with an analytics snapshot")
+    return Request(
+        "get", reverse("teams:organization-analytics", args=[org.pk]), org.admin_id, None
+    )
+
+
+SCENARIOS = {
+    "catalog": catalog,
+    "featured": featured,
+    "runtime_ping": runtime_ping,
+    "quiz_submit": quiz_submit,
+    "dashboard": dashboard,
+    "analytics": analytics,
+}
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    latencies = sorted(s["ms"] for s in samples)
+    return {
+        "iterations": len(samples),
+        "status": sorted({s["status"] for s in samples}),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "min_ms": round(latencies[0], 3),
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p95_ms": round(_percentile(latencies, 0.95), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries": statistics.median(s["queries"] for s in samples),
+        "db_ms": round(statistics.median(s["db_ms"] for s in samples), 3),
+        "serializer_ms": round(statistics.median(s["serializer_ms"] for s in samples), 3),
+        "response_bytes": samples[-1]["bytes"],
+    }
+
+
+def _client(user_id, host):
+    client = APIClient(HTTP_HOST=host)
+    if user_id is not None:
+        token = RefreshToken.for_user(get_user_model().objects.get(pk=user_id))
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.access_token}")
+    return client
+
+
+def run_scenario(name, iterations, warmup, host):
+    request = SCENARIOS[name]()
+    client = _client(request.user, host)
+    send = getattr(client, request.method)
+    samples = []
+    for i in range(warmup + iterations):
+        reset_queries()   # DEBUG keeps every query otherwise
+        start = time.perf_counter()
+        response = send(request.path, request.data, format="json") if request.data else send(request.path)
+        elapsed = (time.perf_counter() - start) * 1000
+        if i < warmup:
+            continue
+        stats = response.wsgi_request.instrumentation
+        samples.append({
+            "ms": elapsed,
+            "status": response.status_code,
+            "queries": stats.queries,
+            "db_ms": stats.db_ms,
+            "serializer_ms": stats.serializer_ms,
+            "bytes": len(response.content) if not response.streaming else None,
+        })
+    return {"path": request.path, **summarize(samples)}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def dataset_size():
+    models = (
+        "auth_app.User", "courses.Course", "courses.Lesson", "payments.Enrollment",
+        "progress.LessonProgress", "scorm_player.RuntimeData", "teams.TeamMember",
+    )
+    return {label: apps.get_model(label).objects.count() for label in models}
+
+
+def run(names=None, iterations=50, warmup=5, host="localhost"):
+    results, skipped = {}, {}
+    for name in names or SCENARIOS:
+        try:
+            results[name] = run_scenario(name, iterations, warmup, host)
+        except ScenarioUnavailable as exc:
+            skipped[name] = str(exc)
+    return {
+        "meta": {
+            "at": timezone.now().isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "iterations": iterations,
+            "warmup": warmup,
+        },
+        "dataset": dataset_size(),
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(baseline, current, metrics=("p50_ms", "p95_ms", "queries")):
+    """{scenario: {metric: (before, after, change %)}} for scenarios in both runs."""
+    out = {}
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        out[name] = {}
+        for metric in metrics:
+            old, new = before[metric], now[metric]
+            change = round(100 * (new - old) / old, 1) if old else None
+            out[name][metric] = (old, new, change)
+    return out
@@ -1,12 +1,129 @@
 import os
+from collections import namedtuple
+
 from celery import Celery
+from celery.schedules import crontab
 from django.conf import settings
+from kombu import Exchange, Queue
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tem_backend.settings.development")
+# Celery's Django fixup runs the system checks on every worker start, which
+# imports the whole URLconf and every view. The web deploy runs them already;
+# set CELERY_SKIP_CHECKS= (empty) to have a worker run them too.
+os.environ.setdefault("CELERY_SKIP_CHECKS", "1")
+
+
+# ─── Workload routing ───────────────────────────────────────────────────
+#
+# Tasks declare a workload class (`@shared_task(workload="media")`); each class
+# gets its own queue, so a backlog of transcodes can't hold up a payment
+# receipt. Within a queue, `priority` (0-9, higher runs sooner) orders messages
+# on brokers that support it; apply_async(priority=...) still wins. Each queue
+# is meant to be consumed by its own worker pool, sized by `concurrency` and
+# `prefetch` (see `worker_argv` and `manage.py celery_workers`). Time limits
+# apply to every task of the class that doesn't set its own. `acks_late`
+# classes ack after the task finishes and reject on worker loss, so a task
+# whose worker is killed goes back on the queue instead of being dropped.
+
+Workload = namedtuple(
+    "Workload", "queue priority concurrency prefetch soft_time_limit time_limit acks_late"
+)
+
+WORKLOADS = {
+    # money moves: receipts, webhooks, seat provisioning
+    "critical":    Workload("critical",    9, 4,  1, 60,      90,      False),
+    # someone is waiting on the result: progress, outbox relay
+    "interactive": Workload("interactive", 7, 8,  4, 30,      60,      False),
+    "default":     Workload("default",     5, 4,  4, 5 * 60,  6 * 60,  False),
+    # scheduled sweeps, fan-outs, digests and renders
+    "bulk":        Workload("bulk",        3, 2,  1, 15 * 60, 20 * 60, True),
+    # CPU-heavy: one task per process, never prefetched, re-queued if a worker dies
+    "media":       Workload("media",       1, 2,  1, 30 * 60, 35 * 60, True),
+}
+DEFAULT_WORKLOAD = "default"
+MAX_PRIORITY = 9
+
+
+def workload_of(task):
+    name = getattr(task, "workload", None) or DEFAULT_WORKLOAD
+    if name not in WORKLOADS:
+        raise ValueError(f"{task.name}: unknown workload {name!r}")
+    return WORKLOADS[name]
+
+
+class WorkloadRouter:
+    """task_routes entry: queue and default priority from the task's workload."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _broker_priority(self, priority):
+        # Redis pops priority step 0 first, AMQP delivers the highest first
+        if (self.app.conf.broker_url or "").startswith(("redis://", "rediss://")):
+            return MAX_PRIORITY - priority
+        return priority
+
+    def __call__(self, name, args, kwargs, options, task=None, **kw):
+        task = task or self.app.tasks.get(name)
+        if task is None:
+            return None
+        workload = workload_of(task)
+        return {"queue": workload.queue, "priority": self._broker_priority(workload.priority)}
+
+
+class WorkloadAnnotations:
+    """task_annotations entry: the workload's time limits and ack mode."""
+
+    def annotate(self, task):
+        if task.name.startswith("celery."):
+            return None
+        workload = workload_of(task)
+        # without reject_on_worker_lost a late ack still acks a killed task
+        attrs = {"acks_late": workload.acks_late, "reject_on_worker_lost": workload.acks_late}
+        if task.time_limit is None and task.soft_time_limit is None:
+            attrs.update(soft_time_limit=workload.soft_time_limit, time_limit=workload.time_limit)
+        return attrs
+
+
+def configure_routing(app):
+    app.conf.update(
+        task_queues=[
+            Queue(
+                w.queue, Exchange(w.queue, type="direct"), routing_key=w.queue,
+                queue_arguments={"x-max-priority": MAX_PRIORITY},
+            )
+            for w in WORKLOADS.values()
+        ],
+        task_default_queue=WORKLOADS[DEFAULT_WORKLOAD].queue,
+        task_default_exchange=WORKLOADS[DEFAULT_WORKLOAD].queue,
+        task_default_routing_key=WORKLOADS[DEFAULT_WORKLOAD].queue,
+        task_queue_max_priority=MAX_PRIORITY,
+        task_routes=(WorkloadRouter(app),),
+        task_annotations=(WorkloadAnnotations(),),
+        broker_transport_options={
+            "priority_steps": list(range(MAX_PRIORITY + 1)),
+            "sep": ":",
+            "queue_order_strategy": "priority",
+        },
+    )
+
+
+def worker_argv(name, app_name="tem_backend"):
+    """`celery` CLI arguments for a worker pool dedicated to one workload."""
+    workload = WORKLOADS[name]
+    return [
+        "-A", app_name, "worker",
+        "-Q", workload.queue,
+        "-n", f"{name}@%h",
+        "--concurrency", str(workload.concurrency),
+        "--prefetch-multiplier", str(workload.prefetch),
+    ]
+
 
 app = Celery("tem_backend")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.conf.timezone = settings.TIME_ZONE
+configure_routing(app)
 app.autodiscover_tasks()
 
 app.conf.beat_schedule = {
@@ -14,4 +131,32 @@ app.conf.beat_schedule = {
         "task": "teams.tasks.snapshot_team_analytics",
         "schedule": 3600.0,
     },
+    "drain-outbound-email-every-minute": {
+        "task": "notifications.tasks.drain_outbound_email",
+        "schedule": 60.0,
+    },
+    "relay-outbox-every-minute": {
+        "task": "outbox.tasks.relay_outbox",
+        "schedule": 60.0,
+    },
+    "prune-expired-tokens-hourly": {
+        "task": "auth_app.tasks.prune_expired_tokens",
+        "schedule": 3600.0,
+    },
+    "archive-old-notifications-daily": {
+        "task": "notifications.tasks.archive_old_notifications",
+        "schedule": 24 * 3600.0,
+    },
+    "deactivate-expired-enrollments-hourly": {
+        "task": "payments.tasks.deactivate_expired_enrollments",
+        "schedule": 3600.0,
+    },
+    "send-expiry-reminders-daily": {
+        "task": "payments.tasks.send_expiry_reminders",
+        "schedule": crontab(hour=8, minute=0),
+    },
+    "reconcile-pending-payments": {
+        "task": "payments.tasks.reconcile_pending_payments",
+        "schedule": 15 * 60.0,
+    },
 }
@@ -0,0 +1,144 @@
+"""
+Sparse fieldsets for read endpoints: `?fields=` and `?expand=`.
+
+  GET /courses/?fields=id,title,price
+  GET /courses/42/?expand=lessons.content
+
+`?fields=` picks the top-level fields to send. `?expand=` adds a field that
+is left out unless asked for (the serializer's Meta.expandable_fields). An
+expanded field is sent as its serializer's card; a dotted name adds a field
+to that, e.g. `lessons.content`.
+
+Without `?fields=`, lists send Meta.default_list_fields (a card) and detail
+views send everything that isn't expandable. Writes always get the full
+serializer.
+
+The chosen fields also shape the query: `fieldset_columns()` is the column
+list for `only()`, so text nobody asked for stays in the database, and views
+skip annotations and prefetches for fields that aren't sent.
+"""
+from collections import namedtuple
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+Fieldset = namedtuple("Fieldset", "fields expand")   # set or None, {name: {subfield}}
+
+FULL = Fieldset(None, {})
+
+
+def _names(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def nested_fields(serializer_class, subfields=()):
+    """An expanded serializer's fields: its card plus `subfields`."""
+    meta = serializer_class.Meta
+    return set(getattr(meta, "default_list_fields", meta.fields)) | set(subfields)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer side. Takes `fields` (names to keep, None for the default) and
+    `expand` ({expandable name: extra subfields}). Meta may declare:
+
+      default_list_fields – what a list sends without ?fields=
+      expandable_fields   – {name: serializer class}, sent only when expanded
+      column_sources      – {method field: model fields it reads}
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expand = expand or {}
+        if fields is None:
+            fields = set(self.fields) - set(getattr(self.Meta, "expandable_fields", ()))
+        keep = set(fields) | set(self.expand)
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+    def expanded(self, name, instances, **kwargs):
+        """Serialize `instances` for the expanded field `name`."""
+        serializer_class = self.Meta.expandable_fields[name]
+        return serializer_class(
+            instances, fields=nested_fields(serializer_class, self.expand[name]),
+            context=self.context, **kwargs,
+        ).data
+
+
+def fieldset_columns(serializer):
+    """The model fields `serializer` reads, for `only()`."""
+    model = serializer.Meta.model
+    column_sources = getattr(serializer.Meta, "column_sources", {})
+    concrete = {f.name for f in model._meta.concrete_fields}
+    columns = {model._meta.pk.name}
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.SerializerMethodField):
+            columns.update(column_sources.get(name, ()))
+        elif field.source.split(".")[0] in concrete:
+            columns.add(field.source.split(".")[0])
+    return columns
+
+
+class SparseFieldsViewMixin:
+    """
+    View side: parses the query string once per request and hands the result
+    to every serializer the view builds. Unknown names are a 400.
+    """
+
+    def get_fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = self._parse_fieldset()
+        return self._fieldset
+
+    def _parse_fieldset(self):
+        if self.request.method != "GET":
+            return FULL
+        meta = self.get_serializer_class().Meta
+        expandable = getattr(meta, "expandable_fields", {})
+        params = self.request.query_params
+        requested = set(_names(params.get("fields")))
+        expand = {}
+        for token in _names(params.get("expand")):
+            name, _, subfield = token.partition(".")
+            if name not in expandable:
+                raise ValidationError({"expand": [f"Cannot expand {name!r}."]})
+            expand.setdefault(name, set())
+            if subfield:
+                if subfield not in expandable[name].Meta.fields:
+                    raise ValidationError({"expand": [f"Unknown field {token!r}."]})
+                expand[name].add(subfield)
+
+        unknown = requested - set(meta.fields)
+        if unknown:
+            raise ValidationError({"fields": [f"Unknown field {name!r}." for name in sorted(unknown)]})
+        for name in requested & set(expandable):
+            expand.setdefault(name, set())
+        if requested:
+            return Fieldset(requested - set(expandable), expand)
+        if not self.detail and hasattr(meta, "default_list_fields"):
+            return Fieldset(set(meta.default_list_fields), expand)
+        return Fieldset(None, expand)
+
+    def get_serializer(self, *args, **kwargs):
+        fieldset = self.get_fieldset()
+        kwargs.setdefault("fields", fieldset.fields)
+        kwargs.setdefault("expand", fieldset.expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def sends(self, *names):
+        """True if the response includes any of `names`."""
+        fieldset = self.get_fieldset()
+        if fieldset.fields is None:
+            expandable = getattr(self.get_serializer_class().Meta, "expandable_fields", ())
+            return any(name not in expandable or name in fieldset.expand for name in names)
+        return any(name in fieldset.fields or name in fieldset.expand for name in names)
+
+    def only_sent_columns(self, queryset, *always):
+        """`queryset` limited to the columns the response reads, plus `always`."""
+        fieldset = self.get_fieldset()
+        if fieldset is FULL:
+            return queryset
+        serializer = self.get_serializer_class()(
+            fields=fieldset.fields, expand=fieldset.expand, context=self.get_serializer_context()
+        )
+        return queryset.only(*fieldset_columns(serializer), *always)
@@ -0,0 +1,289 @@
+"""
+Per-endpoint query and latency instrumentation, safe to leave on in production.
+
+`InstrumentationMiddleware` wraps every request:
+
+  • counts and times SQL through `connection.execute_wrapper`
+  • times top-level serializer `.data` rendering
+  • records query count, DB ms, serializer ms and total ms per view into
+    fixed-bucket histograms (memory is bounded by buckets × views)
+  • checks the view's `query_budget`, logging or raising when it's exceeded
+
+Celery tasks executed in-process (CELERY_TASK_ALWAYS_EAGER) are left out of
+the counts: in production they run on a worker, not inside the request.
+
+The middleware is async-capable, so under ASGI it doesn't push async views
+onto a thread. There the queries run on the request's sync thread (Django's
+async ORM and sync_to_async), so the counter is installed on that thread's
+connections once and stays; it is a pass-through outside a request.
+
+`tem_backend.views.metrics_view` exposes a snapshot to staff; tests assert
+budgets with `tem_backend.testing.QueryBudgetMixin`.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from celery.signals import task_prerun, task_postrun
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+OVERFLOW_VIEW = "<other>"
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """
+    Declare a budget on a function view. Class views set `query_budget`
+    instead: either a number or {action-or-method: number}, e.g.
+    {"list": 5, "retrieve": 5} on a viewset or {"get": 3} on an APIView;
+    anything left out is unbudgeted.
+    """
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+# ─── Histograms ─────────────────────────────────────────────────────────
+
+class Histogram:
+    """Fixed buckets; the last slot counts everything above the top bound."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip((*self.bounds, self.max), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 3),
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.serializer_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.total_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.budget_exceeded = 0
+
+    def snapshot(self):
+        return {
+            "queries": self.queries.snapshot(),
+            "db_ms": self.db_ms.snapshot(),
+            "serializer_ms": self.serializer_ms.snapshot(),
+            "total_ms": self.total_ms.snapshot(),
+            "budget_exceeded": self.budget_exceeded,
+        }
+
+
+class Registry:
+    def __init__(self, max_views):
+        self.max_views = max_views
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def record(self, view, stats, total_ms, over_budget):
+        with self._lock:
+            if view not in self._views and len(self._views) >= self.max_views:
+                view = OVERFLOW_VIEW
+            metrics = self._views.setdefault(view, ViewMetrics())
+            metrics.queries.observe(stats.queries)
+            metrics.db_ms.observe(stats.db_ms)
+            metrics.serializer_ms.observe(stats.serializer_ms)
+            metrics.total_ms.observe(total_ms)
+            metrics.budget_exceeded += over_budget
+
+    def snapshot(self):
+        with self._lock:
+            return {view: m.snapshot() for view, m in sorted(self._views.items())}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = Registry(getattr(settings, "INSTRUMENTATION_MAX_VIEWS", 500))
+
+
+# ─── Per-request collection ─────────────────────────────────────────────
+
+class RequestStats:
+    __slots__ = ("queries", "db_ms", "serializer_ms", "_serializer_depth", "_in_task", "_in_query")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self._serializer_depth = 0
+        self._in_task = 0
+        self._in_query = False
+
+
+_current = ContextVar("instrumentation_stats", default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    # _in_query: a connection shared between threads can carry several
+    # requests' wrappers; count each query once
+    if stats is None or stats._in_task or stats._in_query:
+        return execute(sql, params, many, context)
+    stats._in_query = True
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats._in_query = False
+        stats.queries += 1
+        stats.db_ms += (time.perf_counter() - start) * 1000
+
+
+_original_data = serializers.BaseSerializer.data
+_serializer_patch_lock = threading.Lock()
+
+
+def _timed_data(self):
+    stats = _current.get()
+    if stats is None or stats._serializer_depth or stats._in_task:
+        # nested .data calls (e.g. SerializerMethodFields) count towards the outer one
+        return _original_data.fget(self)
+    stats._serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_data.fget(self)
+    finally:
+        stats._serializer_depth -= 1
+        stats.serializer_ms += (time.perf_counter() - start) * 1000
+
+
+@task_prerun.connect
+def _enter_task(**kwargs):
+    stats = _current.get()
+    if stats is not None:
+        stats._in_task += 1
+
+
+@task_postrun.connect
+def _leave_task(**kwargs):
+    stats = _current.get()
+    if stats is not None:
+        stats._in_task -= 1
+
+
+def install_serializer_timing():
+    with _serializer_patch_lock:
+        if serializers.BaseSerializer.data is _original_data:
+            serializers.BaseSerializer.data = property(_timed_data)
+
+
+def _install_query_counter():
+    for conn in connections.all():
+        if _count_query not in conn.execute_wrappers:
+            conn.execute_wrappers.append(_count_query)
+
+
+def budget_for(view_func, method):
+    cls = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    budget = getattr(cls, "query_budget", None) or getattr(view_func, "query_budget", None)
+    if isinstance(budget, dict):
+        method = method.lower()
+        # viewsets route methods to actions; plain views are keyed by method
+        action = (getattr(view_func, "actions", None) or {}).get(method, method)
+        budget = budget.get(action)
+    return budget
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_count_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, stats, (time.perf_counter() - start) * 1000)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            await sync_to_async(_install_query_counter)()
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, stats, (time.perf_counter() - start) * 1000)
+
+    def _record(self, request, response, stats, total_ms):
+        request.instrumentation = stats
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return response
+        view = match.view_name or match._func_path
+        budget = budget_for(match.func, request.method)
+        over = budget is not None and stats.queries > budget
+        registry.record(view, stats, total_ms, over)
+
+        if over:
+            message = f"{view} ran {stats.queries} queries (budget {budget})"
+            if settings.QUERY_BUDGET_ACTION == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,60 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tem_backend.benchmark import SCENARIOS, compare, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot endpoints in-process against the current database and "
+        "print (or write) JSON results; --compare diffs against an earlier run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenarios", nargs="*",
+                            help=f"Any of {', '.join(SCENARIOS)} (default: all).")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--output", help="Write the JSON here instead of stdout.")
+        parser.add_argument("--compare", metavar="BASELINE", help="Earlier results file.")
+        parser.add_argument("--host", default=None,
+                            help="Host header to send (default: first ALLOWED_HOSTS entry).")
+
+    def handle(self, *args, **opts):
+        if opts["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        unknown = set(opts["scenarios"]) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+        baseline = None
+        if opts["compare"]:
+            with open(opts["compare"]) as f:
+                baseline = json.load(f)
+
+        report = run(opts["scenarios"], opts["iterations"], opts["warmup"], self._host(opts))
+        for name, reason in report["skipped"].items():
+            self.stderr.write(f"skipped {name}: {reason}")
+
+        body = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(body + "\n")
+            self.stdout.write(f"results written to {opts['output']}")
+        else:
+            self.stdout.write(body)
+
+        if baseline is not None:
+            for name, metrics in compare(baseline, report).items():
+                cells = ", ".join(
+                    f"{metric} {old} → {new}" + (f" ({change:+}%)" if change is not None else "")
+                    for metric, (old, new, change) in metrics.items()
+                )
+                self.stdout.write(f"{name}: {cells}")
+
+    def _host(self, opts):
+        if opts["host"]:
+            return opts["host"]
+        hosts = [h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")]
+        return hosts[0] if hosts else "localhost"
@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tem_backend.asgi_benchmark import SCENARIOS, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent throughput of the I/O-bound endpoints served sync under "
+        "WSGI and async under ASGI, at the same worker count, with a stubbed gateway."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenarios", nargs="*",
+                            help=f"Any of {', '.join(SCENARIOS)} (default: all).")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per path.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Clients in flight.")
+        parser.add_argument("--threads", type=int, default=4,
+                            help="WSGI worker threads (the ASGI side is one event loop).")
+        parser.add_argument("--gateway-ms", type=int, default=200,
+                            help="Simulated Paystack latency.")
+        parser.add_argument("--output", help="Write the JSON here instead of stdout.")
+        parser.add_argument("--host", default=None,
+                            help="Host header to send (default: first ALLOWED_HOSTS entry).")
+
+    def handle(self, *args, **opts):
+        for option in ("requests", "concurrency", "threads"):
+            if opts[option] < 1:
+                raise CommandError(f"--{option} must be at least 1.")
+        unknown = set(opts["scenarios"]) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+
+        report = run(
+            opts["scenarios"], opts["requests"], opts["concurrency"], opts["threads"],
+            opts["gateway_ms"], self._host(opts),
+        )
+        for name, reason in report["skipped"].items():
+            self.stderr.write(f"skipped {name}: {reason}")
+
+        body = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(body + "\n")
+            self.stdout.write(f"results written to {opts['output']}")
+        else:
+            self.stdout.write(body)
+
+        for name, result in report["results"].items():
+            wsgi, asgi = result["wsgi"], result["asgi"]
+            self.stdout.write(
+                f"{name}: wsgi {wsgi['throughput_rps']} req/s (p95 {wsgi['p95_ms']} ms), "
+                f"asgi {asgi['throughput_rps']} req/s (p95 {asgi['p95_ms']} ms), "
+                f"×{result['speedup']}"
+            )
+
+    def _host(self, opts):
+        if opts["host"]:
+            return opts["host"]
+        hosts = [h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")]
+        return hosts[0] if hosts else "localhost"
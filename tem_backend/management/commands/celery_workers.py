@@ -0,0 +1,33 @@
+import shlex
+
+from django.core.management.base import BaseCommand
+
+from tem_backend.celery import WORKLOADS, app, worker_argv
+
+
+class Command(BaseCommand):
+    help = (
+        "Print one `celery worker` command per workload queue (Procfile format), "
+        "with its concurrency and prefetch, and list which tasks each queue carries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", action="store_true", help="Also list the tasks routed to each queue.")
+
+    def handle(self, *args, **opts):
+        for name in WORKLOADS:
+            self.stdout.write(f"worker-{name}: celery {shlex.join(worker_argv(name))}")
+        if not opts["tasks"]:
+            return
+        app.loader.import_default_modules()   # runs the lazy task autodiscovery
+        router = app.conf.task_routes[0]
+        by_queue = {}
+        for task_name in sorted(app.tasks):
+            if task_name.startswith("celery."):
+                continue
+            route = router(task_name, (), {}, {})
+            by_queue.setdefault(route["queue"], []).append(task_name)
+        for queue, names in by_queue.items():
+            self.stdout.write(f"\n{queue}:")
+            for task_name in names:
+                self.stdout.write(f"  {task_name}")
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tem_backend.startup import TARGETS, first_party, profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh web or worker processes under `python -X importtime` and report "
+        "per-module import cost, per-app ready() time and the startup phases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", nargs="?", default="web", choices=TARGETS)
+        parser.add_argument("--runs", type=int, default=3,
+                            help="Processes to start; each figure is the minimum across them.")
+        parser.add_argument("--limit", type=int, default=25, help="Modules to list.")
+        parser.add_argument("--local", action="store_true",
+                            help="Only list this project's modules.")
+        parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+
+    def handle(self, *args, **opts):
+        if opts["runs"] < 1:
+            raise CommandError("--runs must be at least 1.")
+        try:
+            report = profile(opts["target"], opts["runs"])
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{report['target']} startup, best of {report['runs']}: "
+            f"{report['import_total_ms']} ms importing"
+        )
+        for name, ms in report["phases_ms"].items():
+            self.stdout.write(f"  {name:<24} {ms:>9.2f} ms")
+
+        self.stdout.write("\nready():")
+        for label, ms in report["ready_ms"].items():
+            self.stdout.write(f"  {label:<24} {ms:>9.2f} ms")
+
+        self.stdout.write("\nself import time by package:")
+        for package, ms in list(report["packages"].items())[:opts["limit"]]:
+            self.stdout.write(f"  {package:<24} {ms:>9.2f} ms")
+
+        modules = first_party(report) if opts["local"] else report["modules"]
+        self.stdout.write(f"\n{'module':<48} {'self ms':>9} {'cumul. ms':>10}")
+        for row in modules[:opts["limit"]]:
+            self.stdout.write(
+                f"{row['module']:<48} {row['self_ms']:>9.2f} {row['cumulative_ms']:>10.2f}"
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tem_backend.seed import DEFAULT_SCALE, flush, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-insert a synthetic, production-shaped dataset (users under the seed "
+        "domain) for benchmarking. Every size is adjustable; --flush removes it."
+    )
+
+    def add_arguments(self, parser):
+        for field, default in DEFAULT_SCALE._asdict().items():
+            parser.add_argument(
+                f"--{field.replace('_', '-')}", type=type(default), default=default,
+            )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same data).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--flush", action="store_true",
+                            help="Delete previously seeded data first.")
+        parser.add_argument("--flush-only", action="store_true")
+
+    def handle(self, *args, **opts):
+        if opts["flush"] or opts["flush_only"]:
+            self.stdout.write(f"flushed {flush()} row(s)")
+            if opts["flush_only"]:
+                return
+        scale = DEFAULT_SCALE._replace(**{f: opts[f] for f in DEFAULT_SCALE._fields})
+        if scale.courses < 1 or scale.learners < 1:
+            raise CommandError("--courses and --learners must be at least 1.")
+        counts = seed(scale, rng_seed=opts["seed"], batch_size=opts["batch_size"],
+                      log=self.stdout.write)
+        for table, n in counts.items():
+            self.stdout.write(f"{table}: {n}")
@@ -0,0 +1,292 @@
+"""
+Synthetic, production-shaped data for local benchmarking.
+
+`seed()` bulk-inserts instructors, a catalog, enrollments with lesson and
+SCORM progress, and team organisations. Every row hangs off a user under
+SEED_DOMAIN, so `flush()` removes the lot by deleting those users. Signals
+don't fire for bulk inserts, so nothing is emailed and no certificates are
+issued; derived rows (CourseProgress, analytics snapshots) are written
+directly, consistent with the progress rows.
+"""
+import random
+from collections import Counter, namedtuple
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from auth_app.models import InstructorProfile, StudentProfile
+from courses.models import Category, Course, Lesson, Quiz, Question, Choice, Promotion
+from payments.models import Enrollment
+from progress.models import LessonProgress, CourseProgress
+from scorm_player.models import ScormPackage, Sco, RuntimeData
+from teams.models import Organization, TeamMember, BulkPurchase, TeamAnalyticsSnapshot
+
+User = get_user_model()
+
+SEED_DOMAIN = "seed.tem.test"
+SEED_PASSWORD = "seed-pass"
+CATEGORY_PREFIX = "seed-"
+
+Scale = namedtuple(
+    "Scale",
+    "instructors courses lessons_per_course learners enrollments_per_learner "
+    "completion scorm_share orgs org_size",
+)
+
+DEFAULT_SCALE = Scale(
+    instructors=200,
+    courses=2000,
+    lessons_per_course=12,
+    learners=20000,
+    enrollments_per_learner=10,
+    completion=0.4,       # share of an enrolled course's lessons a learner has started
+    scorm_share=0.25,     # share of courses shipping a SCORM package
+    orgs=20,
+    org_size=500,
+)
+
+SCOS_PER_PACKAGE = 3
+QUESTIONS_PER_QUIZ = 5
+CHOICES_PER_QUESTION = 4
+CATEGORIES = 12
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _bulk(model, rows, batch_size):
+    """bulk_create a (lazy) iterable in batches; returns the created objects."""
+    created = []
+    for chunk in _chunks(rows, batch_size):
+        created.extend(model.objects.bulk_create(chunk, batch_size=batch_size))
+    return created
+
+
+def _bulk_count(model, rows, batch_size):
+    """bulk_create without keeping the objects around; returns the row count."""
+    n = 0
+    for chunk in _chunks(rows, batch_size):
+        model.objects.bulk_create(chunk, batch_size=batch_size)
+        n += len(chunk)
+    return n
+
+
+def seed(scale=DEFAULT_SCALE, rng_seed=0, batch_size=2000, log=None):
+    """Insert a dataset of the given Scale; returns {table: rows created}."""
+    rng = random.Random(rng_seed)
+    log = log or (lambda message: None)
+    counts = Counter()
+    password = make_password(SEED_PASSWORD)   # hashed once, shared by every seeded user
+    now = timezone.now()
+
+    with transaction.atomic():
+        # ─── People ──────────────────────────────────────────────────────
+        instructors = _bulk(User, (
+            User(email=f"instructor{n}@{SEED_DOMAIN}", password=password,
+                 first_name="Instructor", last_name=str(n))
+            for n in range(scale.instructors)
+        ), batch_size)
+        learners = _bulk(User, (
+            User(email=f"learner{n}@{SEED_DOMAIN}", password=password,
+                 first_name="Learner", last_name=str(n))
+            for n in range(scale.learners)
+        ), batch_size)
+        _bulk_count(InstructorProfile, (InstructorProfile(user=u) for u in instructors), batch_size)
+        _bulk_count(StudentProfile, (StudentProfile(user=u) for u in learners), batch_size)
+        counts["users"] = len(instructors) + len(learners)
+        log(f"users: {counts['users']}")
+
+        # ─── Catalog ─────────────────────────────────────────────────────
+        categories = _bulk(Category, (
+            Category(name=f"Seed category {n}", slug=f"{CATEGORY_PREFIX}{n}")
+            for n in range(CATEGORIES)
+        ), batch_size)
+        courses = _bulk(Course, (
+            Course(
+                title=f"Seed course {n}",
+                description="Synthetic course.",
+                price=rng.choice((0, 5000, 9500, 15000, 25000)),
+                instructor=rng.choice(instructors),
+                difficulty=rng.choice(Course.DIFFICULTY_CHOICES)[0],
+                featured=rng.random() < 0.05,
+                default_access_days=rng.choice((None, None, 30, 90)),
+            )
+            for n in range(scale.courses)
+        ), batch_size)
+        through = Course.categories.through
+        _bulk_count(through, (
+            through(course_id=c.pk, category_id=rng.choice(categories).pk) for c in courses
+        ), batch_size)
+        today = timezone.localdate()
+        counts["promotions"] = _bulk_count(Promotion, (
+            Promotion(course=c, discount_percent=rng.choice((10, 20, 50)),
+                      start_date=today - timedelta(days=3), end_date=today + timedelta(days=7))
+            for c in courses if rng.random() < 0.1
+        ), batch_size)
+        counts["courses"] = len(courses)
+
+        lessons = _bulk(Lesson, (
+            Lesson(course=c, title=f"Lesson {i}", content="Synthetic lesson.", order=i)
+            for c in courses for i in range(scale.lessons_per_course)
+        ), batch_size)
+        lessons_by_course = {}
+        for lesson in lessons:
+            lessons_by_course.setdefault(lesson.course_id, []).append(lesson.pk)
+        counts["lessons"] = len(lessons)
+        log(f"courses: {len(courses)}, lessons: {len(lessons)}")
+
+        quizzes = _bulk(Quiz, (
+            Quiz(lesson_id=lessons_by_course[c.pk][0], title="Checkpoint")
+            for c in courses if lessons_by_course.get(c.pk)
+        ), batch_size)
+        questions = _bulk(Question, (
+            Question(quiz=q, text=f"Question {i}", order=i)
+            for q in quizzes for i in range(QUESTIONS_PER_QUIZ)
+        ), batch_size)
+        _bulk_count(Choice, (
+            Choice(question=q, text=f"Choice {i}", is_correct=(i == 0))
+            for q in questions for i in range(CHOICES_PER_QUESTION)
+        ), batch_size)
+        counts["quizzes"] = len(quizzes)
+
+        packages = _bulk(ScormPackage, (
+            ScormPackage(title=f"Package for {c.title}", course=c, file="scorm/zips/seed.zip",
+                         uploaded_by_id=c.instructor_id)
+            for c in courses if rng.random() < scale.scorm_share
+        ), batch_size)
+        scos = _bulk(Sco, (
+            Sco(package=p, identifier=f"sco-{i}", launch_url="index.html",
+                title=f"SCO {i}", sequence=i)
+            for p in packages for i in range(SCOS_PER_PACKAGE)
+        ), batch_size)
+        scos_by_course = {}
+        course_of_package = {p.pk: p.course_id for p in packages}
+        for sco in scos:
+            scos_by_course.setdefault(course_of_package[sco.package_id], []).append(sco.pk)
+        counts["scos"] = len(scos)
+
+        # ─── Enrollments and progress ────────────────────────────────────
+        per_learner = min(scale.enrollments_per_learner, len(courses))
+        pairs = [
+            (u.pk, c.pk) for u in learners for c in rng.sample(courses, per_learner)
+        ]
+        counts["enrollments"] = _bulk_count(Enrollment, (
+            Enrollment(user_id=uid, course_id=cid, is_active=True)
+            for uid, cid in pairs
+        ), batch_size)
+        log(f"enrollments: {counts['enrollments']}")
+
+        started = {}      # (user, course) → (started, completed)
+        def lesson_rows():
+            for uid, cid in pairs:
+                course_lessons = lessons_by_course.get(cid, ())
+                n = int(len(course_lessons) * scale.completion * rng.random() * 2)
+                n = min(n, len(course_lessons))
+                done = rng.randint(0, n)
+                started[uid, cid] = (n, done)
+                for i, lesson_id in enumerate(course_lessons[:n]):
+                    yield LessonProgress(user_id=uid, lesson_id=lesson_id, is_completed=i < done)
+        counts["lesson_progress"] = _bulk_count(LessonProgress, lesson_rows(), batch_size)
+
+        counts["course_progress"] = _bulk_count(CourseProgress, (
+            CourseProgress(
+                user_id=uid, course_id=cid,
+                completed_lessons=done, total_lessons=len(lessons_by_course.get(cid, ())),
+                percent=round(100 * done / len(lessons_by_course[cid]), 2) if lessons_by_course.get(cid) else 0,
+            )
+            for (uid, cid), (n, done) in started.items() if n
+        ), batch_size)
+
+        counts["runtime_data"] = _bulk_count(RuntimeData, (
+            RuntimeData(user_id=uid, sco_id=sco_id, attempt=1, data={
+                "cmi.core.lesson_status": rng.choice(("incomplete", "completed", "passed")),
+                "cmi.core.score.raw": str(rng.randint(40, 100)),
+                "cmi.suspend_data": "x" * rng.randint(16, 512),
+            })
+            for uid, cid in pairs for sco_id in scos_by_course.get(cid, ())
+        ), batch_size)
+        log(f"lesson progress: {counts['lesson_progress']}, runtime data: {counts['runtime_data']}")
+
+        # ─── Organisations ───────────────────────────────────────────────
+        admins = _bulk(User, (
+            User(email=f"orgadmin{n}@{SEED_DOMAIN}", password=password,
+                 first_name="Org", last_name=f"Admin {n}")
+            for n in range(scale.orgs)
+        ), batch_size)
+        orgs = _bulk(Organization, (
+            Organization(name=f"Seed org {n}", admin=admin, team_size=scale.org_size)
+            for n, admin in enumerate(admins)
+        ), batch_size)
+        member_rows = []
+        for org in orgs:
+            for user in rng.sample(learners, min(scale.org_size, len(learners))):
+                member_rows.append(TeamMember(
+                    organization=org, user=user, invited_by_id=org.admin_id,
+                    status=TeamMember.ACTIVE if rng.random() < 0.9 else TeamMember.PENDING,
+                    joined_at=now,
+                ))
+        counts["team_members"] = _bulk_count(TeamMember, member_rows, batch_size)
+        purchases = _bulk(BulkPurchase, (
+            BulkPurchase(organization=org, purchased_by_id=org.admin_id,
+                         seats=scale.org_size, order_reference=f"seed-{org.pk}")
+            for org in orgs
+        ), batch_size)
+        through = BulkPurchase.courses.through
+        _bulk_count(through, (
+            through(bulkpurchase_id=p.pk, course_id=c.pk)
+            for p in purchases for c in rng.sample(courses, min(5, len(courses)))
+        ), batch_size)
+        counts["users"] += len(admins)
+        counts["organizations"] = len(orgs)
+        counts["analytics_snapshots"] = _bulk_count(
+            TeamAnalyticsSnapshot, (_snapshot(org) for org in orgs), batch_size
+        )
+        log(f"organizations: {len(orgs)}, members: {counts['team_members']}")
+
+    return dict(counts)
+
+
+def _snapshot(org):
+    """Same shape as teams.tasks.snapshot_team_analytics, from one grouped query."""
+    members = org.members.values("status").annotate(n=Count("id"))
+    by_status = {row["status"]: row["n"] for row in members}
+    learning = [
+        {
+            "user_id": row["user_id"],
+            "email": row["user__email"],
+            "completed": row["done"],
+            "total": row["total"],
+            "percent": (100 * row["done"] // row["total"]) if row["total"] else 0,
+        }
+        for row in org.members.filter(status=TeamMember.ACTIVE)
+        .values("user_id", "user__email")
+        .annotate(
+            total=Count("user__lesson_progress"),
+            done=Count("user__lesson_progress", filter=Q(user__lesson_progress__is_completed=True)),
+        )
+    ]
+    return TeamAnalyticsSnapshot(
+        organization=org,
+        seat_usage={
+            "total_seats": org.team_size,
+            "used_seats": by_status.get(TeamMember.ACTIVE, 0),
+            "pending_invites": by_status.get(TeamMember.PENDING, 0),
+        },
+        learning_progress=learning,
+    )
+
+
+def flush():
+    """Delete everything seed() created; returns the number of rows removed."""
+    with transaction.atomic():
+        removed, _ = User.objects.filter(email__endswith=f"@{SEED_DOMAIN}").delete()
+        categories, _ = Category.objects.filter(slug__startswith=CATEGORY_PREFIX).delete()
+    return removed + categories
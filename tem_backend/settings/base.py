@@ -59,6 +59,8 @@ INSTALLED_APPS = [
     "payments",
     "notifications",
     "teams",
+    "outbox",
+    "tem_backend",     # project-wide management commands (seed_data, benchmark)
 ]
 
 SITE_ID = 1
@@ -79,6 +81,7 @@ ACCOUNT_SIGNUP_FIELDS = [
 
 
 MIDDLEWARE = [
+    "tem_backend.instrumentation.InstrumentationMiddleware",   # outermost: sees every query
     "corsheaders.middleware.CorsMiddleware",
     'allauth.account.middleware.AccountMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -110,6 +113,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'tem_backend.wsgi.application'
+ASGI_APPLICATION = 'tem_backend.asgi.application'
 
 
 # Database
@@ -142,12 +146,15 @@ AUTH_USER_MODEL = "auth_app.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ( 
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "auth_app.authentication.RoleJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_THROTTLE_RATES": {
+        "cert_verify": env("CERT_VERIFY_RATE", default="30/min"),   # per client IP
+    },
 }
 
 REST_AUTH = {
@@ -156,6 +163,7 @@ REST_AUTH = {
     'USER_DETAILS_SERIALIZER': 'auth_app.serializers.CustomUserDetailsSerializer',
     'SESSION_LOGIN': False,
     "TOKEN_MODEL": None,
+    "JWT_TOKEN_CLAIMS_SERIALIZER": "auth_app.tokens.RoleTokenObtainPairSerializer",
     }
 
 
@@ -166,14 +174,94 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # access tokens carry role/org claims (auth_app.tokens)
+    "TOKEN_OBTAIN_SERIALIZER": "auth_app.tokens.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "auth_app.tokens.RoleTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "auth_app.tokens.RoleTokenBlacklistSerializer",
 }
 
 
 
 
 
-CELERY_TASK_ALWAYS_EAGER = True
+# Paystack gateway client (payments.gateway)
+PAYSTACK_BASE_URL = env("PAYSTACK_BASE_URL", default="https://api.paystack.co")
+PAYSTACK_CONNECT_TIMEOUT = 3.05
+PAYSTACK_READ_TIMEOUT = 10
+PAYSTACK_MAX_RETRIES = 2          # idempotent (GET) calls only
+PAYSTACK_POOL_SIZE = 20
+PAYSTACK_CIRCUIT_FAILURES = 5     # consecutive failures before the breaker opens
+PAYSTACK_CIRCUIT_RESET = 30       # seconds before a half-open retry
+
+# Pending-payment reconciler (payments.reconcile)
+PAYSTACK_RECONCILE_AFTER_MINUTES = env.int("PAYSTACK_RECONCILE_AFTER_MINUTES", default=30)
+PAYSTACK_RECONCILE_ABANDON_AFTER_HOURS = 24   # unpaid this long → failed
+PAYSTACK_RECONCILE_CHUNK_SIZE = 200
+PAYSTACK_RECONCILE_PAGE_SIZE = 100            # perPage for the list API
+PAYSTACK_RECONCILE_CONCURRENCY = 4            # parallel gateway calls
+
+
+# Eager mode runs every .delay() inside the caller (the outbox relay included),
+# so it is for the test suite only; see settings/test.py
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
 CELERY_TASK_EAGER_PROPAGATES = True
+
+# Notification fan-out (new lesson → every enrollee)
+NOTIFICATION_FANOUT_CHUNK_SIZE = env.int("NOTIFICATION_FANOUT_CHUNK_SIZE", default=500)
+NOTIFICATION_EMAIL_BATCH_RATE_LIMIT = env("NOTIFICATION_EMAIL_BATCH_RATE_LIMIT", default="30/m")
+
+# Outbound mail queue (notifications.mail)
+OUTBOUND_EMAIL_BATCH_SIZE = env.int("OUTBOUND_EMAIL_BATCH_SIZE", default=200)
+OUTBOUND_EMAIL_DOMAIN_LIMITS = {"default": 100}   # max sends per domain per window
+OUTBOUND_EMAIL_DOMAIN_WINDOW = 60                 # seconds
+OUTBOUND_EMAIL_MAX_ATTEMPTS = 5
+OUTBOUND_EMAIL_RETRY_BACKOFF = 60                 # seconds, doubled on every attempt
+OUTBOUND_EMAIL_RETRY_BACKOFF_MAX = 60 * 60
+OUTBOUND_EMAIL_LEASE_SECONDS = 7 * 60            # past the drain's hard time limit (6 min)
+
+# Transactional outbox for signal side effects (outbox.relay)
+OUTBOX_BATCH_SIZE = env.int("OUTBOX_BATCH_SIZE", default=500)
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BACKOFF = 30                 # seconds, doubled on every attempt
+OUTBOX_RETRY_BACKOFF_MAX = 30 * 60
+OUTBOX_LEASE_SECONDS = 5 * 60
+OUTBOX_DISPATCH_LEASE_SECONDS = 60 * 60    # a chain's rows are requeued if not done by then
+
+# Real-time notification push (SSE, notifications.push)
+NOTIFICATIONS_PUSH_BACKEND = env("NOTIFICATIONS_PUSH_BACKEND", default="memory")   # "redis" | "memory"
+NOTIFICATIONS_PUSH_REDIS_URL = env("NOTIFICATIONS_PUSH_REDIS_URL", default="redis://localhost:6379/1")
+NOTIFICATIONS_PUSH_QUEUE_SIZE = 100       # per-connection buffer before a client is told to resync
+NOTIFICATIONS_PUSH_HEARTBEAT = 15         # seconds between keep-alive comments
+NOTIFICATIONS_PUSH_REPLAY_LIMIT = 100     # max items replayed for Last-Event-ID
+
+# Notification retention (notifications.retention)
+NOTIFICATION_RETENTION_DAYS = env.int("NOTIFICATION_RETENTION_DAYS", default=90)
+NOTIFICATION_MAX_PER_USER = env.int("NOTIFICATION_MAX_PER_USER", default=500)
+NOTIFICATION_ARCHIVE_CHUNK_SIZE = 1000
+
+# Lesson-milestone digests (notifications.digest)
+NOTIFICATION_DIGEST_WINDOW = 60 * 60             # seconds milestones collapse into one notification
+NOTIFICATION_DIGEST_EMAIL_PERIOD = 24 * 60 * 60  # at most one digest email per user/course per period
+
+# Learner dashboard snapshot (progress.entitlements); invalidated by signals
+PROGRESS_ENTITLEMENTS_CACHE_TTL = 5 * 60
+
+# Public certificate verification (progress.verification)
+CERT_VERIFY_CACHE_TTL = 24 * 60 * 60      # certificates are immutable
+CERT_VERIFY_NEGATIVE_TTL = 5 * 60         # unknown ids, to absorb enumeration
+
+# Refresh-token blacklist pruning and bloom filter (auth_app.blacklist)
+TOKEN_BLOOM_BACKEND = env("TOKEN_BLOOM_BACKEND", default="memory")   # "redis" | "memory"
+TOKEN_BLOOM_REDIS_URL = env("TOKEN_BLOOM_REDIS_URL", default="redis://localhost:6379/2")
+TOKEN_BLOOM_BUCKET_SECONDS = 60 * 60      # one filter per hour of token expiry
+TOKEN_BLOOM_CAPACITY = env.int("TOKEN_BLOOM_CAPACITY", default=100_000)   # blacklistings per bucket
+TOKEN_BLOOM_ERROR_RATE = 0.001            # share of clean tokens still checked in the database
+TOKEN_PRUNE_CHUNK_SIZE = 5000
+
+# Per-view query/latency histograms (tem_backend.instrumentation)
+INSTRUMENTATION_MAX_VIEWS = 500           # further views are pooled under "<other>"
+QUERY_BUDGET_ACTION = env("QUERY_BUDGET_ACTION", default="log")   # "log" | "raise"
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -7,6 +7,23 @@ DATABASES = {
     "default": env.db_url("DATABASE_URL")
 }
 
+# Every web and worker process must see the same cache: it holds the auth
+# versions that revoke token claims, price quotes, entitlement snapshots,
+# certificate lookups, throttle counts and the once-per-period guards that
+# other processes invalidate or check
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("CACHE_REDIS_URL", default="redis://localhost:6379/3"),
+    }
+}
+
+# SSE streams live in several processes — fan out through Redis
+NOTIFICATIONS_PUSH_BACKEND = env("NOTIFICATIONS_PUSH_BACKEND", default="redis")
+
+# Refreshes land on any process — share the blacklist filter through Redis
+TOKEN_BLOOM_BACKEND = env("TOKEN_BLOOM_BACKEND", default="redis")
+
 # Security hardening
 SECURE_SSL_REDIRECT = True
 SECURE_HSTS_SECONDS = 31536000
@@ -0,0 +1,12 @@
+import atexit
+import shutil
+import tempfile
+
+from .development import *
+
+# Tasks run inline, so a test sees their effects without a broker or worker
+CELERY_TASK_ALWAYS_EAGER = True
+
+# Uploads and rendered certificates go to a scratch directory, not the checkout
+MEDIA_ROOT = tempfile.mkdtemp(prefix="tem-test-media-")
+atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
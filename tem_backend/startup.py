@@ -0,0 +1,148 @@
+"""
+Cold-start profiling.
+
+`profile()` starts fresh interpreters under `python -X importtime`, brings
+each one up the way a web or worker process starts, and reports what that
+cost: per-module import time (self and cumulative, from the interpreter's own
+accounting), each app's ready() time and the phases around them. It has to
+be a fresh process — in this one everything is already imported. With
+several runs each figure is the minimum across them, the least noisy
+estimate of the cold cost.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict, namedtuple
+from pathlib import Path
+
+from django.conf import settings
+
+Import = namedtuple("Import", "module self_us cumulative_us depth")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TARGETS = ("web", "worker")
+
+
+def _probe(target):
+    """Child side: start up as `target` and print the timings as JSON."""
+    import time
+    from django.apps.config import AppConfig
+
+    ready = {}
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        config = create(cls, entry)
+        inner = config.ready
+
+        def timed_ready():
+            start = time.perf_counter()
+            inner()
+            ready[config.label] = time.perf_counter() - start
+
+        config.ready = timed_ready
+        return config
+
+    AppConfig.create = classmethod(timed_create)
+
+    phases = {}
+    start = time.perf_counter()
+    import django
+    django.setup()
+    phases["django.setup"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if target == "web":
+        from django.core.wsgi import get_wsgi_application
+        from django.urls import get_resolver
+
+        get_wsgi_application()           # settings, apps, middleware chain
+        get_resolver().url_patterns      # every urlconf and the views it imports
+        phases["wsgi + urls"] = time.perf_counter() - start
+    else:
+        from tem_backend.celery import app
+
+        app.loader.import_default_modules()   # what a worker imports before consuming
+        app.finalize()
+        phases["celery tasks"] = time.perf_counter() - start
+
+    print(json.dumps({"phases": phases, "ready": ready}))
+
+
+def parse_importtime(stderr):
+    """[Import] from `-X importtime` output, in the order the lines appear."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append(Import(name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def _run_once(target):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"from tem_backend.startup import _probe; _probe({target!r})"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"{target} startup failed:\n{proc.stderr[-2000:]}")
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return parse_importtime(proc.stderr), timings
+
+
+def _package(module):
+    return module.split(".", 1)[0]
+
+
+def profile(target="web", runs=1):
+    """
+    Returns {"target", "runs", "import_total_ms", "phases_ms", "ready_ms",
+    "modules": [{"module", "self_ms", "cumulative_ms"}], "packages": {name: self_ms}}.
+    """
+    if target not in TARGETS:
+        raise ValueError(f"unknown target {target!r}; expected one of {TARGETS}")
+    self_us, cumulative_us = {}, {}
+    phases, ready = defaultdict(list), defaultdict(list)
+    for _ in range(runs):
+        imports, timings = _run_once(target)
+        for imp in imports:
+            self_us[imp.module] = min(self_us.get(imp.module, imp.self_us), imp.self_us)
+            cumulative_us[imp.module] = min(
+                cumulative_us.get(imp.module, imp.cumulative_us), imp.cumulative_us
+            )
+        for name, seconds in timings["phases"].items():
+            phases[name].append(seconds)
+        for label, seconds in timings["ready"].items():
+            ready[label].append(seconds)
+
+    packages = defaultdict(int)
+    for module, us in self_us.items():
+        packages[_package(module)] += us
+
+    ms = lambda us: round(us / 1000, 2)
+    return {
+        "target": target,
+        "runs": runs,
+        "import_total_ms": ms(sum(self_us.values())),
+        "phases_ms": {name: round(min(v) * 1000, 2) for name, v in phases.items()},
+        "ready_ms": dict(sorted(
+            ((label, round(min(v) * 1000, 2)) for label, v in ready.items()),
+            key=lambda item: -item[1],
+        )),
+        "modules": [
+            {"module": m, "self_ms": ms(self_us[m]), "cumulative_ms": ms(cumulative_us[m])}
+            for m in sorted(self_us, key=lambda m: -cumulative_us[m])
+        ],
+        "packages": {p: ms(us) for p, us in sorted(packages.items(), key=lambda item: -item[1])},
+    }
+
+
+def first_party(report):
+    """The report's modules that belong to this project's apps."""
+    local = {_package(name) for name in settings.INSTALLED_APPS if (PROJECT_ROOT / _package(name)).is_dir()}
+    return [row for row in report["modules"] if _package(row["module"]) in local]
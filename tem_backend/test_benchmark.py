@@ -0,0 +1,71 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from courses.models import Course, Lesson
+from payments.models import Enrollment
+from progress.models import LessonProgress, CourseProgress
+from scorm_player.models import RuntimeData
+from teams.models import TeamMember, TeamAnalyticsSnapshot
+from tem_backend.benchmark import SCENARIOS, compare
+from tem_backend.seed import Scale, flush, seed
+
+SMALL = Scale(
+    instructors=2, courses=6, lessons_per_course=4, learners=10,
+    enrollments_per_learner=3, completion=0.5, scorm_share=0.5, orgs=2, org_size=4,
+)
+
+
+class SeedTests(TestCase):
+    def test_seed_is_consistent_and_flushable(self):
+        counts = seed(SMALL, rng_seed=1)
+        self.assertEqual(Course.objects.count(), 6)
+        self.assertEqual(Lesson.objects.count(), 24)
+        self.assertEqual(Enrollment.objects.count(), 30)
+        self.assertEqual(TeamMember.objects.count(), 8)
+        self.assertEqual(TeamAnalyticsSnapshot.objects.count(), 2)
+        self.assertEqual(counts["lesson_progress"], LessonProgress.objects.count())
+        self.assertEqual(counts["runtime_data"], RuntimeData.objects.count())
+        for cp in CourseProgress.objects.all():
+            done = LessonProgress.objects.filter(
+                user=cp.user, lesson__course=cp.course, is_completed=True
+            ).count()
+            self.assertEqual(cp.completed_lessons, done)
+
+        flush()
+        self.assertFalse(Course.objects.exists())
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_same_seed_same_data(self):
+        seed(SMALL, rng_seed=7)
+        first = sorted(Enrollment.objects.values_list("user__email", "course__title"))
+        flush()
+        seed(SMALL, rng_seed=7)
+        self.assertEqual(sorted(Enrollment.objects.values_list("user__email", "course__title")), first)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_runs_every_scenario_and_compares(self):
+        seed(SMALL, rng_seed=3)
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as out:
+            call_command("benchmark", iterations=2, warmup=1, output=out.name, stdout=StringIO())
+            report = json.load(out)
+
+        self.assertEqual(report["skipped"], {})
+        self.assertEqual(set(report["results"]), set(SCENARIOS))
+        for name, result in report["results"].items():
+            self.assertEqual(result["iterations"], 2)
+            self.assertTrue(all(code < 400 for code in result["status"]), (name, result["status"]))
+            self.assertGreater(result["queries"], 0)
+        self.assertEqual(report["dataset"]["courses.Course"], 6)
+
+        diff = compare(report, report)
+        self.assertEqual(diff["catalog"]["queries"][2], 0.0)
+
+    def test_scenarios_skip_on_empty_database(self):
+        call_command("benchmark", "dashboard", iterations=1, warmup=0,
+                     stdout=StringIO(), stderr=(err := StringIO()))
+        self.assertIn("skipped dashboard", err.getvalue())
@@ -0,0 +1,100 @@
+"""
+Routing harness: a Celery app on the in-memory broker, configured exactly like
+the real one, so published messages can be read back off each queue.
+"""
+from django.conf import settings
+from django.test import SimpleTestCase
+from celery import Celery
+from kombu.transport.memory import Channel
+
+from tem_backend.celery import WORKLOADS, configure_routing, workload_of
+
+EXPECTED = {
+    "payments.tasks.send_payment_receipt": "critical",
+    "payments.tasks.process_webhook_event": "critical",
+    "progress.tasks.recalc_course_progress": "interactive",
+    "outbox.tasks.relay_outbox": "interactive",
+    "notifications.tasks.drain_outbound_email": "default",
+    "notifications.tasks.fan_out_new_lesson": "bulk",
+    "payments.tasks.reconcile_pending_payments": "bulk",
+    "courses.tasks.transcode_lesson_video": "media",
+    "scorm_player.tasks.extract_and_notify": "media",
+}
+
+
+def make_app():
+    app = Celery("routing-harness", broker="memory://", set_as_current=False)
+    configure_routing(app)
+    app.conf.task_always_eager = False
+    app.autodiscover_tasks(lambda: settings.INSTALLED_APPS, force=True)
+    app.finalize()
+    return app
+
+
+class RoutingHarnessTest(SimpleTestCase):
+    def setUp(self):
+        Channel.queues.clear()
+        self.app = make_app()
+        self.conn = self.app.connection_for_write()
+        self.addCleanup(self.conn.release)
+        self.channel = self.conn.default_channel
+
+    def send(self, name, *args, **options):
+        self.app.send_task(name, args, connection=self.conn, **options)
+
+    def drain(self, queue):
+        """[(task name, priority)] in delivery order."""
+        out = []
+        while (message := self.channel.basic_get(queue, no_ack=True)) is not None:
+            out.append((message.headers["task"], message.properties.get("priority")))
+        return out
+
+    def test_every_task_declares_a_known_workload(self):
+        for name, task in self.app.tasks.items():
+            if not name.startswith("celery."):
+                self.assertIn(workload_of(task), WORKLOADS.values(), name)
+
+    def test_tasks_land_on_their_workload_queue(self):
+        for name in EXPECTED:
+            self.send(name, 1)
+        for queue in WORKLOADS:
+            expected = [n for n, q in EXPECTED.items() if q == queue]
+            self.assertEqual([name for name, _ in self.drain(queue)], expected, queue)
+
+    def test_media_backlog_does_not_delay_receipts(self):
+        for lesson_id in range(50):
+            self.send("courses.tasks.transcode_lesson_video", lesson_id)
+        self.send("payments.tasks.send_payment_receipt", 1)
+
+        self.assertEqual(
+            self.drain("critical"), [("payments.tasks.send_payment_receipt", WORKLOADS["critical"].priority)]
+        )
+        self.assertEqual(len(self.drain("media")), 50)
+
+    def test_queue_keeps_publish_order_and_explicit_priority_wins(self):
+        self.send("progress.tasks.recalc_course_progress", 1, 1)
+        self.send("progress.tasks.recalc_scorm_progress", 1, 1, priority=9)
+        self.send("outbox.tasks.relay_outbox")
+
+        default = WORKLOADS["interactive"].priority
+        self.assertEqual(self.drain("interactive"), [
+            ("progress.tasks.recalc_course_progress", default),
+            ("progress.tasks.recalc_scorm_progress", 9),
+            ("outbox.tasks.relay_outbox", default),
+        ])
+
+    def test_workload_time_limits_fill_in_unset_ones(self):
+        transcode = self.app.tasks["courses.tasks.transcode_lesson_video"]
+        self.assertEqual(transcode.time_limit, WORKLOADS["media"].time_limit)
+        self.assertTrue(transcode.acks_late)
+        self.assertTrue(transcode.reject_on_worker_lost)
+        receipt = self.app.tasks["payments.tasks.send_payment_receipt"]
+        self.assertEqual(receipt.soft_time_limit, WORKLOADS["critical"].soft_time_limit)
+        self.assertFalse(receipt.acks_late)
+        self.assertFalse(receipt.reject_on_worker_lost)
+
+    def test_priority_is_inverted_for_redis(self):
+        router = self.app.conf.task_routes[0]
+        self.app.conf.broker_url = "redis://localhost:6379/0"
+        route = router("payments.tasks.send_payment_receipt", (1,), {}, {})
+        self.assertEqual(route, {"queue": "critical", "priority": 0})   # step 0 is popped first
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from courses.models import Course
+from tem_backend.instrumentation import (
+    Histogram, Registry, RequestStats, QueryBudgetExceeded, OVERFLOW_VIEW, registry,
+)
+
+User = get_user_model()
+
+
+class HistogramTests(SimpleTestCase):
+    def test_quantiles_report_bucket_bounds(self):
+        h = Histogram((1, 5, 10))
+        for value in (0.5, 0.7, 3, 4, 8, 50):
+            h.observe(value)
+        snap = h.snapshot()
+        self.assertEqual(snap["count"], 6)
+        self.assertEqual(snap["buckets"], {"1": 2, "5": 2, "10": 1, "+Inf": 1})
+        self.assertEqual(snap["p50"], 5)
+        self.assertEqual(snap["p99"], 50)   # overflow bucket reports the max
+
+    def test_registry_caps_distinct_views(self):
+        reg = Registry(max_views=2)
+        for view in ("a", "b", "c", "d"):
+            reg.record(view, RequestStats(), 1.0, False)
+        snap = reg.snapshot()
+        self.assertEqual(sorted(snap), ["<other>", "a", "b"])
+        self.assertEqual(snap[OVERFLOW_VIEW]["total_ms"]["count"], 2)
+
+
+class MiddlewareTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(email="m@x.com", password="pass")
+        self.staff = User.objects.create_user(email="s@x.com", password="pass", is_staff=True)
+        Course.objects.create(title="C", description="d", price=0, instructor=self.user)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(reverse("courses:courses-list"))
+        self.assertGreater(res.wsgi_request.instrumentation.queries, 0)
+        self.assertGreater(res.wsgi_request.instrumentation.serializer_ms, 0)
+
+        self.client.force_authenticate(self.staff)
+        metrics = self.client.get(reverse("metrics")).data
+        self.assertEqual(metrics["courses:courses-list"]["queries"]["count"], 1)
+        self.assertEqual(metrics["courses:courses-list"]["budget_exceeded"], 0)
+
+    def test_metrics_are_staff_only(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reset(self):
+        self.client.force_authenticate(self.staff)
+        self.client.get(reverse("courses:courses-list"))
+        self.assertEqual(self.client.delete(reverse("metrics")).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertNotIn("courses:courses-list", registry.snapshot())
+
+    @override_settings(QUERY_BUDGET_ACTION="raise")
+    def test_exceeding_budget_raises_when_configured(self):
+        self.client.force_authenticate(self.user)
+        from courses.views import CourseViewSet
+        CourseViewSet.query_budget, original = {"list": 1}, CourseViewSet.query_budget
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("courses:courses-list"))
+        finally:
+            CourseViewSet.query_budget = original
+        self.assertEqual(registry.snapshot()["courses:courses-list"]["budget_exceeded"], 1)
+
+    def test_exceeding_budget_logs_by_default(self):
+        self.client.force_authenticate(self.user)
+        from courses.views import CourseViewSet
+        CourseViewSet.query_budget, original = {"list": 1}, CourseViewSet.query_budget
+        try:
+            with self.assertLogs("tem_backend.instrumentation", "WARNING"):
+                res = self.client.get(reverse("courses:courses-list"))
+        finally:
+            CourseViewSet.query_budget = original
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
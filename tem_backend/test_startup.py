@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+
+from tem_backend.startup import parse_importtime, profile
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     reportlab.lib
+import time:       300 |        420 |   reportlab.pdfgen.canvas
+import time:        50 |        470 | progress.certificates
+some unrelated stderr line
+"""
+
+
+class ParseImporttimeTest(SimpleTestCase):
+    def test_rows_keep_timings_and_nesting(self):
+        rows = parse_importtime(IMPORTTIME)
+        self.assertEqual([r.module for r in rows],
+                         ["reportlab.lib", "reportlab.pdfgen.canvas", "progress.certificates"])
+        self.assertEqual((rows[1].self_us, rows[1].cumulative_us, rows[1].depth), (300, 420, 1))
+        self.assertEqual(rows[2].depth, 0)
+
+
+class StartupProfileTest(SimpleTestCase):
+    def test_web_start_reports_ready_times_and_skips_pdf_rendering(self):
+        report = profile("web")
+        modules = {row["module"] for row in report["modules"]}
+        self.assertIn("progress.views", modules)
+        self.assertNotIn("reportlab.pdfgen.canvas", modules)   # imported on first render
+        self.assertIn("auth_app", report["ready_ms"])
+        self.assertIn("wsgi + urls", report["phases_ms"])
+
+    def test_worker_start_does_not_import_the_views(self):
+        report = profile("worker")
+        modules = {row["module"] for row in report["modules"]}
+        self.assertIn("payments.tasks", modules)
+        self.assertNotIn("progress.views", modules)
@@ -0,0 +1,24 @@
+"""
+Test helpers shared across apps.
+"""
+from .instrumentation import budget_for
+
+
+class QueryBudgetMixin:
+    """
+    Mix into a TestCase to check a response against its view's `query_budget`
+    (measured by InstrumentationMiddleware, so it sees exactly what production does).
+    """
+
+    def assertWithinQueryBudget(self, response, budget=None):
+        request = getattr(response, "wsgi_request", None) or response.asgi_request
+        stats = getattr(request, "instrumentation", None)
+        self.assertIsNotNone(stats, "InstrumentationMiddleware did not run")
+        if budget is None:
+            budget = budget_for(request.resolver_match.func, request.method)
+        self.assertIsNotNone(budget, f"{request.resolver_match.view_name} declares no query_budget for {request.method}")
+        self.assertLessEqual(
+            stats.queries, budget,
+            f"{request.resolver_match.view_name} ran {stats.queries} queries (budget {budget})",
+        )
+        return stats.queries
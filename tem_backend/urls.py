@@ -1,14 +1,17 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenBlacklistView
 
+from .views import metrics_view
+
 
 
 api_v1_patterns = [
     path('auth/login/',  TokenObtainPairView.as_view(),      name='token_obtain_pair'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(),  name='token_refresh'),
+    # ahead of dj_rest_auth's slash-optional route, so every refresh re-stamps role claims
+    re_path(r'^auth/token/refresh/?$', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/logout/', TokenBlacklistView.as_view(),    name='token_blacklist'),
     path('auth/', include("dj_rest_auth.urls")),
     path('auth/registration/', include("dj_rest_auth.registration.urls")),
@@ -19,6 +22,7 @@ api_v1_patterns = [
     path("payments/", include(("payments.urls","payments"), namespace="payments")),
     path("notifications/", include("notifications.urls", namespace="notifications")),
     path('teams/', include(('teams.urls', 'teams'), namespace='teams')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 urlpatterns = [
@@ -0,0 +1,15 @@
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .instrumentation import registry
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([permissions.IsAdminUser])
+def metrics_view(request):
+    """Per-view query/latency histograms for this process. DELETE resets them."""
+    if request.method == "DELETE":
+        registry.reset()
+        return Response(status=204)
+    return Response(registry.snapshot())